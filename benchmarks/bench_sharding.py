@@ -0,0 +1,56 @@
+"""
+Revocation lookup throughput as shards are added.
+
+Start one redis-server per node, then:
+    python benchmarks/bench_sharding.py [--workers N] redis://localhost:6379/0 redis://localhost:6380/0 ...
+Each step uses the first N URLs and reports batched is_revoked_many lookups/s,
+summed over the client worker processes. A single Python client saturates
+long before Redis does, so use roughly one worker per core to see scaling.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.routing import ReplicaRouter
+
+BATCH = 500
+BATCHES = 200
+CONCURRENCY = 16
+
+async def run(urls):
+    shards = {url: ReplicaRouter.from_urls(url) for url in urls}
+    store = RevocationStore(urls[0], shards=shards, local_cache_size=0)
+    jtis = [str(uuid.uuid4()) for _ in range(BATCH * 4)]
+    await store.revoke_many([(j, time.time() + 300) for j in jtis[::2]])
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def lookup(i):
+        async with semaphore:
+            await store.is_revoked_many(jtis[(i % 4) * BATCH:(i % 4 + 1) * BATCH])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(lookup(i) for i in range(BATCHES)))
+    elapsed = time.perf_counter() - started
+    for shard in shards.values():
+        await shard.primary.aclose()
+    return BATCH * BATCHES / elapsed
+
+def worker(urls):
+    return asyncio.run(run(urls))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("urls", nargs="*", default=["redis://localhost:6379/0"])
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(args.workers) as pool:
+        for n in range(1, len(args.urls) + 1):
+            rates = pool.map(worker, [args.urls[:n]] * args.workers)
+            print(f"{n} node(s): {sum(rates):,.0f} lookups/s")
+
+if __name__ == "__main__":
+    main()
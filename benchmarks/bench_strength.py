@@ -0,0 +1,48 @@
+"""
+Password strength estimation cost.
+
+    python benchmarks/bench_strength.py [--rounds N]
+Reports the one-off trie build (first call) and the mean time per estimate
+over a mix of weak and strong passwords.
+"""
+import argparse
+import time
+
+SAMPLES = [
+    "Password1234",
+    "p@ssw0rd!2020",
+    "qwertyuiop",
+    "zaq12wsx",
+    "dragonmonkey2019",
+    "15031987",
+    "Tr0ub4dor&3",
+    "kX9$vQ2!mZ7p",
+    "correct-horse-battery-staple-7!",
+    "an extremely long passphrase with many words in it 42",
+]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    from zenithauth.core.strength import estimate
+    imported = time.perf_counter()
+    estimate("warm-up")
+    loaded = time.perf_counter()
+    print(f"import: {(imported - started) * 1e3:.2f} ms, first call (trie build): {(loaded - imported) * 1e3:.2f} ms")
+
+    print(f"{'password':<56} {'score':>5} {'us/call':>8}")
+    total = 0.0
+    for password in SAMPLES:
+        t = time.perf_counter()
+        for _ in range(args.rounds):
+            result = estimate(password)
+        per_call = (time.perf_counter() - t) / args.rounds * 1e6
+        total += per_call
+        print(f"{password:<56} {result.score:>5} {per_call:>8.1f}")
+    print(f"mean: {total / len(SAMPLES):.1f} us per estimate")
+
+if __name__ == "__main__":
+    main()
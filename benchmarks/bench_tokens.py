@@ -0,0 +1,67 @@
+"""
+Token size and sign/verify throughput: JWT (python-jose) vs PASETO v4.
+
+    python benchmarks/bench_tokens.py [--rounds N]
+Every engine encodes the same access-token claims that ZenithAuth issues.
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
+
+from zenithauth.config import ZenithSettings
+from zenithauth.core.paseto import PasetoV4Local, PasetoV4Public
+from zenithauth.core.tokens import TokenManager
+
+def jwt_engine(key, verify_key, algorithm):
+    return (
+        lambda claims: jwt.encode(claims, key, algorithm=algorithm),
+        lambda token: jwt.decode(token, verify_key, algorithms=[algorithm]),
+    )
+
+def engines():
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    ec_pem = ec_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    ec_pub = ec_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    public = PasetoV4Public(private_key=b"\x01" * 32)
+    local = PasetoV4Local(b"\x02" * 32)
+    return {
+        "JWT HS256": jwt_engine("secret-key", "secret-key", "HS256"),
+        "JWT ES256": jwt_engine(ec_pem, ec_pub, "ES256"),
+        "PASETO v4.public": (public.encode, public.decode),
+        "PASETO v4.local": (local.encode, local.decode),
+    }
+
+def rate(fn, arg, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(arg)
+    return rounds / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5000)
+    args = parser.parse_args()
+
+    manager = TokenManager(ZenithSettings(ZENITH_SECRET_KEY="bench"))
+    claims = manager.build_claims(
+        "user-1234", timedelta(minutes=15), scopes=["admin", "reader"],
+        family_id="3f0c1a52-6f55-4a3e-9d1e-5b1f6c7f3d21", extra_claims={"typ": "access"},
+    )
+    print(f"{'engine':<18} {'bytes':>6} {'sign/s':>10} {'verify/s':>10}")
+    for name, (encode, decode) in engines().items():
+        token = encode(claims)
+        print(
+            f"{name:<18} {len(token):>6} {rate(encode, claims, args.rounds):>10.0f} "
+            f"{rate(decode, token, args.rounds):>10.0f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+TOTP verification: pyotp vs the cached TOTPVerifier.
+
+    python benchmarks/bench_totp.py [--users N] [--rounds N]
+Each round verifies one valid code per user (±1 step window), as a busy
+MFA endpoint would, then the same batch through verify_many.
+"""
+import argparse
+import time
+
+import pyotp
+
+from zenithauth.core.totp import TOTPVerifier
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    now = time.time()
+    secrets = [pyotp.random_base32() for _ in range(args.users)]
+    # Codes from the previous step, so both paths have to scan the window
+    items = [(s, pyotp.TOTP(s).at(now - 30)) for s in secrets]
+    total = args.users * args.rounds
+
+    t = time.perf_counter()
+    for _ in range(args.rounds):
+        for secret, code in items:
+            assert pyotp.TOTP(secret).verify(code, for_time=now, valid_window=1)
+    baseline = (time.perf_counter() - t) / total * 1e6
+
+    verifier = TOTPVerifier(cache_size=args.users)
+    t = time.perf_counter()
+    for _ in range(args.rounds):
+        for secret, code in items:
+            assert verifier.verify(secret, code, for_time=now)
+    cached = (time.perf_counter() - t) / total * 1e6
+
+    t = time.perf_counter()
+    for _ in range(args.rounds):
+        assert all(verifier.verify_many(items, for_time=now))
+    batched = (time.perf_counter() - t) / total * 1e6
+
+    print(f"pyotp TOTP.verify:        {baseline:7.2f} us/code")
+    print(f"TOTPVerifier.verify:      {cached:7.2f} us/code ({baseline / cached:.1f}x)")
+    print(f"TOTPVerifier.verify_many: {batched:7.2f} us/code ({baseline / batched:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,25 @@
 from typing import Optional, List
-from fastapi import Request, Depends, HTTPException, status
+from fastapi import Request, Response, Depends, HTTPException, status, Body
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from zenithauth.manager import ZenithAuth
 from zenithauth.core.exceptions import ZenithAuthError, RevokedTokenError
+from zenithauth.core.context import auth_context, ensure_auth_context
+from zenithauth.core.revocation import Consistency
+
+class AuthContextMiddleware:
+    """
+    ASGI middleware that scopes a fresh AuthContext to every request.
+    Usage: app.add_middleware(AuthContextMiddleware)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+        with auth_context():
+            await self.app(scope, receive, send)
 
 class ZenithAuthFastAPI:
     """FastAPI Integration for ZenithAuth."""
@@ -19,8 +36,100 @@ class ZenithAuthFastAPI:
         Dependency that validates the JWT and checks Redis revocation.
         Usage: user = Depends(zenith_fastapi.get_current_user)
         """
+        return await self._authorize(auth.credentials, None)
+
+    def guard(self, consistency: Optional[Consistency] = None):
+        """
+        Dependency factory with a per-route revocation consistency level.
+        Usage: Depends(zenith_fastapi.guard(Consistency.bounded(30)))
+        """
+        async def checker(
+            auth: HTTPAuthorizationCredentials = Depends(HTTPBearer())
+        ) -> dict:
+            return await self._authorize(auth.credentials, consistency)
+        return checker
+
+    def require_role(self, role: str, consistency: Optional[Consistency] = None):
+        """
+        Dependency factory for role-based access.
+        Usage: Depends(zenith_fastapi.require_role("admin"))
+        """
+        async def role_checker(payload: dict = Depends(self.guard(consistency))):
+            if not self.manager.authorizer.has_role(payload, role):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Missing required role: {role}",
+                )
+            return payload
+        return role_checker
+
+    def refresh_route(self):
+        """
+        Endpoint factory for refresh-token rotation.
+        Usage: app.post("/auth/refresh")(zenith_fastapi.refresh_route())
+        """
+        async def refresh_endpoint(refresh_token: str = Body(..., embed=True)) -> dict:
+            try:
+                tokens = await self.manager.refresh(refresh_token)
+            except ZenithAuthError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail=str(e),
+                )
+            return {
+                "access_token": tokens.access_token,
+                "refresh_token": tokens.refresh_token,
+                "token_type": tokens.token_type,
+            }
+        return refresh_endpoint
+
+    def cookie_session(self, consistency: Optional[Consistency] = None):
+        """
+        Dependency factory for browser routes authenticated by the signed
+        session cookie. Cookies past half their lifetime are re-issued on the
+        response (sliding expiry).
+        Usage: user = Depends(zenith_fastapi.cookie_session())
+        """
+        async def cookie_checker(request: Request, response: Response) -> dict:
+            cookie = request.cookies.get(self.manager.settings.COOKIE_NAME)
+            if not cookie:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Not authenticated",
+                )
+            # Memoize per request so stacked cookie guards verify it once
+            ensure_auth_context()
+            try:
+                payload, fresh = await self.manager.authorize_cookie(cookie, consistency)
+            except ZenithAuthError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail=str(e),
+                )
+            if fresh:
+                self.set_session_cookie(response, fresh)
+            return payload
+        return cookie_checker
+
+    def set_session_cookie(self, response: Response, cookie: str):
+        settings = self.manager.settings
+        response.set_cookie(
+            settings.COOKIE_NAME,
+            cookie,
+            max_age=settings.COOKIE_MAX_AGE_SECONDS,
+            httponly=True,
+            secure=settings.COOKIE_SECURE,
+            samesite="lax",
+        )
+
+    def clear_session_cookie(self, response: Response):
+        response.delete_cookie(self.manager.settings.COOKIE_NAME)
+
+    async def _authorize(self, token: str, consistency: Optional[Consistency]) -> dict:
+        # Memoize per request so stacked guards verify the token once
+        ensure_auth_context()
         try:
-            payload = await self.manager.authorize(auth.credentials)
+            payload = await self.manager.authorize(token, consistency)
             return payload
         except RevokedTokenError:
             raise HTTPException(
@@ -32,17 +141,3 @@ class ZenithAuthFastAPI:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=str(e),
             )
-
-    def require_role(self, role: str):
-        """
-        Dependency factory for role-based access.
-        Usage: Depends(zenith_fastapi.require_role("admin"))
-        """
-        async def role_checker(payload: dict = Depends(self.get_current_user)):
-            if not self.manager.authorizer.has_role(payload, role):
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Missing required role: {role}",
-                )
-            return payload
-        return role_checker
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,11 +12,98 @@ class ZenithSettings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # "jwt", "paseto" (v4, self-contained) or "opaque" (reference handles resolved via Redis)
+    TOKEN_FORMAT: str = "jwt"
+    # "public" (Ed25519) or "local" (XChaCha20 + BLAKE2b). The 32-byte key is
+    # hex-encoded (Ed25519 seed or symmetric key); derived from SECRET_KEY if unset.
+    PASETO_PURPOSE: str = "public"
+    PASETO_KEY: Optional[str] = None
+    OPAQUE_CACHE_TTL_SECONDS: float = 5.0
+    OPAQUE_CACHE_SIZE: int = 10_000
     MIN_PASSWORD_LENGTH: int = 12
     REQUIRE_NON_ALPHA: bool = True
+    # zxcvbn-style score (0-4) a new password must reach; 0 disables the check
+    PASSWORD_MIN_STRENGTH: int = 0
+    # Index built with `python -m zenithauth.core.breach` (offline HIBP screening)
+    BREACHED_PASSWORDS_PATH: Optional[str] = None
 
     # Redis Settings
     REDIS_URL: str = Field("redis://localhost:6379/0", validation_alias="ZENITH_REDIS_URL")
+    # Revocation reads go to replicas, writes to REDIS_URL (the primary)
+    REDIS_REPLICA_URLS: List[str] = Field(default_factory=list)
+    REDIS_HEDGE_AFTER_MS: Optional[float] = None
+    # Sentinel discovery ("host:port" entries) or Redis Cluster instead of fixed URLs
+    REDIS_SENTINELS: List[str] = Field(default_factory=list)
+    REDIS_SENTINEL_SERVICE: str = "mymaster"
+    REDIS_CLUSTER: bool = False
+    # Spread revocation keys over several independent nodes (consistent hashing)
+    REDIS_SHARD_URLS: List[str] = Field(default_factory=list)
+
+    # Session registry (Redis backend only); 0 means no per-user limit
+    TRACK_SESSIONS: bool = False
+    MAX_SESSIONS_PER_USER: int = 0
+
+    # Write-behind last-seen tracking (Redis backend only)
+    TRACK_ACTIVITY: bool = False
+    ACTIVITY_FLUSH_SECONDS: float = 10.0
+    ACTIVITY_BUFFER_SIZE: int = 10_000
+
+    # HyperLogLog active-user analytics (Redis backend only)
+    TRACK_ACTIVE_USERS: bool = False
+    ACTIVE_USERS_ON_AUTHORIZE: bool = False
+    ANALYTICS_BUCKET_SECONDS: int = 300
+    ANALYTICS_RETENTION_DAYS: int = 30
+    ANALYTICS_FLUSH_SECONDS: float = 10.0
+
+    # Argon2id parameters (see `python -m zenithauth.core.calibration`);
+    # memory cost is in KiB. Existing hashes are upgraded on the next login.
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+
+    # Admission control for password hashing
+    HASH_MEMORY_BUDGET_MIB: int = 512
+    HASH_QUEUE_SIZE: int = 100
+    HASH_QUEUE_PER_CLIENT: int = 10
+    HASH_QUEUE_TIMEOUT_SECONDS: float = 2.0
+
+    # Login throttling (GCRA per client IP and per account, Redis backend)
+    LOGIN_THROTTLE: bool = False
+    LOGIN_RATE_PER_IP: float = 30  # attempts per minute
+    LOGIN_BURST_PER_IP: int = 10
+    LOGIN_RATE_PER_ACCOUNT: float = 10
+    LOGIN_BURST_PER_ACCOUNT: int = 5
+    # Failures before an account is locked; the lock doubles per further failure
+    LOCKOUT_THRESHOLD: int = 5
+    LOCKOUT_BASE_SECONDS: float = 30
+    LOCKOUT_MAX_SECONDS: float = 3600
+    # Credential-stuffing detection: failed logins counted in an in-memory sketch;
+    # offenders go to a shared Redis blocklist checked by the throttle
+    FAILED_LOGIN_MONITOR: bool = False
+    FAILED_LOGIN_WINDOW_SECONDS: float = 300
+    FAILED_LOGIN_IP_THRESHOLD: int = 100
+    FAILED_LOGIN_ACCOUNT_THRESHOLD: int = 20
+    BLOCKLIST_SECONDS: int = 900
+    # Bloom filter of known emails; unknown emails skip the repository lookup
+    USER_FILTER: bool = False
+    USER_FILTER_CAPACITY: int = 1_000_000
+    USER_FILTER_ERROR_RATE: float = 0.01
+    USER_FILTER_PATH: Optional[str] = None
+
+    # Signed cookie sessions for browser clients
+    COOKIE_NAME: str = "zenith_session"
+    COOKIE_MAX_AGE_SECONDS: int = 12 * 3600
+    # Roles that can be carried in a cookie (bit position = list index; append only)
+    COOKIE_ROLES: List[str] = []
+    COOKIE_SECURE: bool = True
+
+    # Revocation backend: "redis", or "file" for edge nodes without Redis
+    REVOCATION_BACKEND: str = "redis"
+    REVOCATION_FILE_PATH: str = "zenithauth-revocations"
+
+    # Per-subject request limit enforced during authorize (0 disables it)
+    AUTHORIZE_RATE_LIMIT: int = 0
+    AUTHORIZE_RATE_WINDOW_SECONDS: int = 60
     
     # Password Policy
     MIN_PASSWORD_LENGTH: int = 12
@@ -0,0 +1,103 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from zenithauth.core.background import PeriodicFlusher
+
+class ActivityTracker(PeriodicFlusher):
+    """
+    Write-behind "last active" timestamps per user and per session.
+
+    Hits are recorded in a local dict keyed by (user, session); repeated hits
+    within one flush interval collapse into a single entry. A background task
+    writes the buffer in one pipeline per flush. The buffer is bounded: when
+    it is full, hits for new sessions are dropped rather than queued. A
+    failed write puts its hits back while there is room (counted in
+    `dropped` otherwise).
+    """
+    USER_KEY = "last_seen:users"
+    SESSION_PREFIX = "last_seen:sessions:"
+
+    def __init__(
+        self,
+        client,
+        flush_interval: float = 10.0,
+        max_buffer: int = 10_000,
+        session_ttl: int = 7 * 24 * 3600,
+    ):
+        super().__init__(flush_interval)
+        self.client = client
+        self.max_buffer = max_buffer
+        self.session_ttl = session_ttl
+        self._pending: Dict[Tuple[str, str], float] = {}
+        # Counters: every hit would be one write if done naively
+        self.hits = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.writes = 0
+
+    def record(self, user_id: str, session_id: str, timestamp: Optional[float] = None):
+        self.hits += 1
+        key = (user_id, session_id)
+        if key in self._pending:
+            self.coalesced += 1
+        elif len(self._pending) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self._pending[key] = timestamp or time.time()
+        self.ensure_started()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            await self._push(pending)
+        except Exception:
+            self._restore(pending)
+            raise
+
+    def _restore(self, pending: Dict[Tuple[str, str], float]):
+        # Hits recorded during the failed write are newer and stay; the rest
+        # come back while the buffer has room
+        for key, ts in pending.items():
+            if key in self._pending:
+                self._pending[key] = max(ts, self._pending[key])
+            elif len(self._pending) < self.max_buffer:
+                self._pending[key] = ts
+            else:
+                self.dropped += 1
+
+    async def _push(self, pending: Dict[Tuple[str, str], float]):
+        users: Dict[str, float] = {}
+        sessions: Dict[str, Dict[str, float]] = {}
+        for (user_id, session_id), ts in pending.items():
+            users[user_id] = max(ts, users.get(user_id, 0.0))
+            sessions.setdefault(user_id, {})[session_id] = ts
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(self.USER_KEY, mapping=users)
+        for user_id, seen in sessions.items():
+            key = f"{self.SESSION_PREFIX}{user_id}"
+            pipe.hset(key, mapping=seen)
+            pipe.expire(key, self.session_ttl)
+        await pipe.execute()
+        self.writes += 1 + len(sessions)
+
+    def stats(self) -> Dict[str, int]:
+        """Redis writes issued vs. one write per recorded hit."""
+        return {
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "writes": self.writes,
+            "writes_saved": self.hits - self.writes,
+            "buffered": len(self._pending),
+        }
+
+    async def last_seen(self, user_id: str) -> Optional[float]:
+        value = await self.client.hget(self.USER_KEY, user_id)
+        return float(value) if value is not None else None
+
+    async def sessions_last_seen(self, user_id: str) -> Dict[str, float]:
+        seen = await self.client.hgetall(f"{self.SESSION_PREFIX}{user_id}")
+        return {sid: float(ts) for sid, ts in seen.items()}
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, TypeVar
+
+from zenithauth.core.exceptions import AuthOverloadedError
+
+T = TypeVar("T")
+
+class HashScheduler:
+    """
+    Admission control for memory-hard hashing (Argon2).
+
+    Concurrency is capped by a memory budget: each hash holds `memory_cost`
+    KiB, so at most `budget // memory_cost` run at once. The rest wait in a
+    bounded queue with a deadline. Free slots are handed out round-robin
+    across client keys (IP, email, ...), and each key may hold only
+    `max_per_key` queue places, so one noisy client cannot starve the
+    others. A full queue sheds the request immediately with
+    AuthOverloadedError. Work runs on a thread pool sized to the slots;
+    argon2-cffi releases the GIL while hashing.
+    """
+    def __init__(
+        self,
+        memory_budget_kib: int,
+        memory_cost_kib: int,
+        max_queue: int = 100,
+        max_per_key: int = 10,
+        queue_timeout: float = 2.0,
+    ):
+        self.slots = max(1, memory_budget_kib // max(1, memory_cost_kib))
+        self.max_queue = max_queue
+        self.max_per_key = max_per_key
+        self.queue_timeout = queue_timeout
+        self.executor = ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix="zenith-hash")
+        self._active = 0
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self._depth = 0
+        # Metrics
+        self.admitted = 0
+        self.shed = 0
+        self.timeouts = 0
+        self.peak_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._depth
+
+    async def run(self, key: Hashable, fn: Callable[..., T], *args: Any) -> T:
+        """Runs fn(*args) on the hashing pool once the memory budget allows."""
+        started = time.perf_counter()
+        await self._acquire(key)
+        waited = time.perf_counter() - started
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self._release()
+
+    async def _acquire(self, key: Hashable):
+        if self._active < self.slots and not self._depth:
+            self._active += 1
+            return
+        queue = self._queues.get(key)
+        if self._depth >= self.max_queue or (queue is not None and len(queue) >= self.max_per_key):
+            self.shed += 1
+            raise AuthOverloadedError("Authentication is overloaded; try again shortly.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        if queue is None:
+            queue = self._queues[key] = deque()
+        queue.append(waiter)
+        self._depth += 1
+        self.peak_depth = max(self.peak_depth, self._depth)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up
+                if isinstance(e, asyncio.TimeoutError):
+                    return
+                self._release()
+                raise
+            waiter.cancel()
+            self._discard(key, waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.timeouts += 1
+            raise AuthOverloadedError("Timed out waiting for a hashing slot.")
+
+    def _discard(self, key: Hashable, waiter: asyncio.Future):
+        queue = self._queues.get(key)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._depth -= 1
+            if not queue:
+                del self._queues[key]
+
+    def _release(self):
+        # Hand the slot straight to the next client in round-robin order
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._depth -= 1
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "active": self._active,
+            "queue_depth": self._depth,
+            "peak_depth": self.peak_depth,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timeouts": self.timeouts,
+            "avg_wait": self.wait_total / self.admitted if self.admitted else 0.0,
+            "max_wait": self.wait_max,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
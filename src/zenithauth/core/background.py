@@ -0,0 +1,43 @@
+import asyncio
+from typing import Optional
+
+from zenithauth.core.logger import logger
+
+class PeriodicFlusher:
+    """
+    Base for write-behind components: buffers locally and calls `flush()`
+    every `interval` seconds on a background task. The task is started
+    lazily from inside the event loop; `stop()` performs a final flush.
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def flush(self):
+        raise NotImplementedError
+
+    def ensure_started(self):
+        if self._task is None or self._task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # no loop yet; callers may flush() manually
+            self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"{type(self).__name__} flush failed: {e}")
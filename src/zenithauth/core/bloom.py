@@ -0,0 +1,215 @@
+"""
+User-existence Bloom filter.
+
+Answers "might this email have an account?" from memory. A "no" is
+definite, so logins for unknown emails skip the repository lookup.
+A "yes" is wrong at most `error_rate` of the time and falls through to
+the database as usual.
+
+A false "no" would lock a real user out, so the filter must see every new
+user. With a `path`, `add()` also appends the email to `<path>.journal`
+before the user is saved. The saved filter records how much of the journal
+it covers (a high-water mark). Loading it replays the rest, and a negative
+answer first catches up on lines other processes appended. A crash between
+saves, or a user created by another worker sharing the path, is therefore
+never turned away. A file whose journal is missing or shorter than its mark
+is not trusted until the next `build()`. ZenithAuth therefore requires
+USER_FILTER_PATH. Users written around `ZenithAuth.save_user` (straight
+to the repository, migrations) are rejected until a rebuild.
+"""
+import hashlib
+import math
+import os
+import struct
+from typing import AsyncIterator, Iterable, List, Optional
+
+from zenithauth.core.exceptions import ZenithAuthError
+from zenithauth.core.logger import logger
+
+MAGIC = b"ZABLOOM\x00"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQQQQ")  # magic, version, hashes, bits, items, bits set, journal offset
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+class BloomFilter:
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        # Optimal sizing: m = -n ln p / (ln 2)^2, k = (m / n) ln 2
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.items = 0
+        self.bits_set = 0
+        # Bytes of the user journal already folded in (see UserFilter)
+        self.journal_offset = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        bits = self._bits
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                self.bits_set += 1
+        self.items += 1
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def false_positive_rate(self) -> float:
+        """Current probability that an absent key tests positive (fill ratio ** k)."""
+        return (self.bits_set / self.size) ** self.hashes
+
+    def save(self, path: str):
+        """Writes the filter atomically (temp file + rename)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION, self.hashes, self.size, self.items, self.bits_set, self.journal_offset
+            ))
+            f.write(self._bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            bits = bytearray(f.read())
+        if len(header) < HEADER.size:
+            raise ZenithAuthError(f"Not a Bloom filter file: {path}")
+        magic, version, hashes, size, items, bits_set, journal_offset = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or len(bits) != (size + 7) // 8:
+            raise ZenithAuthError(f"Not a Bloom filter file: {path}")
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hashes, bloom.items, bloom.bits_set = size, hashes, items, bits_set
+        bloom.journal_offset = journal_offset
+        bloom._bits = bits
+        return bloom
+
+class UserFilter:
+    """Bloom filter of normalized emails, built from a repository scan."""
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01, path: Optional[str] = None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.path = path
+        self.journal_path = f"{path}.journal" if path else None
+        self.bloom: Optional[BloomFilter] = None
+        # Emails added while a rebuild is scanning (no journal), replayed into the new filter
+        self._added_during_build: Optional[List[str]] = None
+        # Lookups answered "certainly unknown" (repository round trips saved)
+        self.negatives = 0
+        if path and os.path.exists(path):
+            self._warm_start()
+
+    def _warm_start(self):
+        try:
+            bloom = BloomFilter.load(self.path)
+        except ZenithAuthError:
+            logger.warning(f"Ignoring unreadable user filter {self.path}; waiting for a rebuild.")
+            return
+        if self._journal_size() < bloom.journal_offset:
+            logger.warning(f"User filter {self.path} is ahead of its journal; waiting for a rebuild.")
+            return
+        self.bloom = bloom
+        self._catch_up()
+
+    @property
+    def ready(self) -> bool:
+        return self.bloom is not None
+
+    def _journal_size(self) -> int:
+        if not self.journal_path:
+            return 0
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
+    def _catch_up(self):
+        """Folds in journal lines appended since the filter's high-water mark."""
+        bloom = self.bloom
+        if bloom is None or not self.journal_path or self._journal_size() <= bloom.journal_offset:
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(bloom.journal_offset)
+            tail = f.read()
+        # A line still being written by another process is picked up next time
+        complete = tail.rfind(b"\n") + 1
+        for line in tail[:complete].splitlines():
+            if line:
+                bloom.add(line.decode())
+        bloom.journal_offset += complete
+
+    async def build(self, users: AsyncIterator) -> int:
+        """Builds a fresh filter from a user stream, then swaps it in. Returns the user count."""
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        # Journal lines from here on may be missing from the scan; they are replayed below
+        bloom.journal_offset = self._journal_size()
+        self._added_during_build = []
+        try:
+            async for user in users:
+                bloom.add(normalize_email(user.email))
+            bloom.update(self._added_during_build)
+        finally:
+            self._added_during_build = None
+        self.bloom = bloom
+        self._catch_up()
+        if self.path:
+            bloom.save(self.path)
+        return bloom.items
+
+    def add(self, email: str):
+        """Records a new user; call before the user is saved."""
+        email = normalize_email(email)
+        if self.journal_path:
+            # O_APPEND keeps concurrent writers' lines whole
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, f"{email}\n".encode())
+            finally:
+                os.close(fd)
+        if self.bloom is not None:
+            self.bloom.add(email)
+        if self._added_during_build is not None:
+            self._added_during_build.append(email)
+
+    def might_exist(self, email: str) -> bool:
+        """False only if the email is certainly unknown; True until a trusted filter exists."""
+        if self.bloom is None:
+            return True
+        email = normalize_email(email)
+        if email in self.bloom:
+            return True
+        self._catch_up()
+        if email in self.bloom:
+            return True
+        self.negatives += 1
+        return False
+
+    def save(self):
+        if self.bloom is not None and self.path:
+            self.bloom.save(self.path)
+
+    def stats(self) -> dict:
+        if self.bloom is None:
+            return {"ready": False}
+        return {
+            "ready": True,
+            "items": self.bloom.items,
+            "bits": self.bloom.size,
+            "hashes": self.bloom.hashes,
+            "negatives": self.negatives,
+            "false_positive_rate": self.bloom.false_positive_rate(),
+        }
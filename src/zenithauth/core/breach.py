@@ -0,0 +1,145 @@
+"""
+Offline breached-password screening.
+
+The index file is laid out as follows:
+- A header (`<8sIIQI4x`): magic, version, digest bytes per record, record
+  count, and prefix bits.
+- A prefix table of 2**bits + 1 little-endian uint64 record offsets.
+- The sorted, fixed-width SHA-1 digests, optionally truncated.
+
+Lookups mmap the file, read two table entries and binary-search one bucket
+(about 14 probes for the full HIBP set with 16 prefix bits). Startup costs
+one mmap, and every worker process shares the same page cache.
+
+Build from the HIBP "ordered by hash" SHA-1 dump:
+
+    python -m zenithauth.core.breach pwned-passwords-sha1-ordered-by-hash.txt breached.idx
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+from typing import IO, Iterable, Optional
+
+from zenithauth.core.exceptions import ZenithAuthError
+from zenithauth.core.policy import WeakPasswordError
+
+MAGIC = b"ZABREACH"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQI4x")
+# Bucket prefixes come from the first 4 bytes, so every record must hold them
+MIN_DIGEST_SIZE = 4
+
+class BreachIndex:
+    """Read-only view of a breach index file."""
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.digest_size, self.count, self.prefix_bits = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION or not MIN_DIGEST_SIZE <= self.digest_size <= 20:
+            raise ZenithAuthError(f"Not a breach index: {path}")
+        self._table = HEADER.size
+        self._records = self._table + 8 * ((1 << self.prefix_bits) + 1)
+
+    def __contains__(self, digest: bytes) -> bool:
+        digest = digest[:self.digest_size]
+        prefix = int.from_bytes(digest[:4], "big") >> (32 - self.prefix_bits)
+        lo, hi = struct.unpack_from("<QQ", self._mm, self._table + 8 * prefix)
+        mm, size, base = self._mm, self.digest_size, self._records
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = base + mid * size
+            probe = mm[offset:offset + size]
+            if probe < digest:
+                lo = mid + 1
+            elif probe > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains_password(self, password: str) -> bool:
+        return hashlib.sha1(password.encode()).digest() in self
+
+    def close(self):
+        self._mm.close()
+
+def build_index(
+    digests: Iterable[bytes],
+    path: str,
+    digest_size: int = 10,
+    prefix_bits: int = 16,
+) -> int:
+    """
+    Writes an index from SHA-1 digests in ascending order (duplicates are
+    dropped). Streams records, so memory stays flat. Returns the record count.
+    """
+    if not MIN_DIGEST_SIZE <= digest_size <= 20 or not 1 <= prefix_bits <= 24:
+        raise ZenithAuthError("Invalid breach index parameters.")
+    table = [0] * ((1 << prefix_bits) + 1)
+    tmp = f"{path}.tmp"
+    count = 0
+    previous = b""
+    with open(tmp, "wb") as f:
+        records_at = HEADER.size + 8 * len(table)
+        f.seek(records_at)
+        for digest in digests:
+            record = digest[:digest_size]
+            if record <= previous:
+                if record == previous:
+                    continue
+                raise ZenithAuthError("Input digests must be sorted ascending.")
+            f.write(record)
+            table[(int.from_bytes(digest[:4], "big") >> (32 - prefix_bits)) + 1] += 1
+            previous = record
+            count += 1
+        for i in range(1, len(table)):
+            table[i] += table[i - 1]
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, digest_size, count, prefix_bits))
+        f.write(struct.pack(f"<{len(table)}Q", *table))
+    os.replace(tmp, path)
+    return count
+
+def build_from_passwords(passwords: Iterable[str], path: str, **kwargs) -> int:
+    """Builds an index from plain passwords (custom deny lists); sorts in memory."""
+    return build_index(sorted(hashlib.sha1(p.encode()).digest() for p in passwords), path, **kwargs)
+
+def read_hibp(f: IO[str], min_count: int = 1) -> Iterable[bytes]:
+    """Parses `HEXSHA1:COUNT` lines of the HIBP ordered-by-hash dump."""
+    for line in f:
+        hex_digest, _, count = line.strip().partition(":")
+        if hex_digest and (min_count <= 1 or int(count or 0) >= min_count):
+            yield bytes.fromhex(hex_digest)
+
+class BreachedPasswordRule:
+    """PasswordPolicy rule that rejects passwords found in a breach index."""
+    def __init__(self, path: str):
+        self.path = path
+        self._index: Optional[BreachIndex] = None
+
+    def check(self, password: str) -> None:
+        if self._index is None:
+            self._index = BreachIndex(self.path)
+        if self._index.contains_password(password):
+            raise WeakPasswordError("This password has appeared in a data breach; choose another.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a breach index from the HIBP SHA-1 dump.")
+    parser.add_argument("source", help="pwned-passwords-sha1-ordered-by-hash text file")
+    parser.add_argument("output")
+    parser.add_argument("--digest-bytes", type=int, default=10, help="bytes kept per hash (4-20)")
+    parser.add_argument("--prefix-bits", type=int, default=16)
+    parser.add_argument("--min-count", type=int, default=1, help="skip hashes seen fewer times")
+    args = parser.parse_args()
+
+    with open(args.source, encoding="ascii") as f:
+        count = build_index(
+            read_hibp(f, args.min_count), args.output,
+            digest_size=args.digest_bytes, prefix_bits=args.prefix_bits,
+        )
+    print(f"{count} hashes written to {args.output}")
+
+if __name__ == "__main__":
+    main()
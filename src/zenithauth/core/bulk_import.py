@@ -0,0 +1,222 @@
+import asyncio
+import csv
+import json
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from argon2 import PasswordHasher
+from pydantic import ValidationError
+
+from zenithauth.core.bloom import normalize_email
+from zenithauth.core.exceptions import ZenithAuthError
+from zenithauth.core.identity import UserInDB
+from zenithauth.core.logger import logger
+from zenithauth.core.security import SecurityHandler
+
+# One hasher per worker process, built on first use
+_worker_hasher: Optional[PasswordHasher] = None
+
+def _hash_chunk(params: Tuple[int, int, int], passwords: List[str]) -> List[str]:
+    global _worker_hasher
+    if _worker_hasher is None:
+        time_cost, memory_cost, parallelism = params
+        _worker_hasher = PasswordHasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+    return [_worker_hasher.hash(p) for p in passwords]
+
+class RowError:
+    def __init__(self, line: int, email: Optional[str], reason: str):
+        self.line = line
+        self.email = email
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"RowError(line={self.line}, email={self.email!r}, reason={self.reason!r})"
+
+Row = Union[Dict[str, Any], RowError]
+
+def read_rows(path: str) -> Iterator[Tuple[int, Row]]:
+    """
+    Streams (line number, row) from a .csv (header row required) or .jsonl
+    file, one row in memory at a time. CSV `roles` are `;`-separated.
+    A JSONL line that is not a JSON object is yielded as a RowError.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                row["roles"] = [r for r in (row.get("roles") or "").split(";") if r]
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, RowError(line_no, None, f"Invalid JSON: {e.msg}.")
+                    continue
+                if not isinstance(row, dict):
+                    yield line_no, RowError(line_no, None, "Row is not a JSON object.")
+                    continue
+                yield line_no, row
+
+class ImportReport:
+    """Outcome of a bulk import; `errors` lists every rejected row."""
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors: List[RowError] = []
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+class BulkImporter:
+    """
+    Imports users from CSV/JSONL in constant memory.
+
+    Rows are read lazily and handled `batch_size` at a time. Each row's email
+    and password policy are validated up front, and bad rows are reported,
+    not raised. Passwords are hashed with Argon2 across a process pool, and
+    users are written with `repository.save_users`. Rows that already carry a
+    `hashed_password` (e.g. bcrypt from the old system) are stored as-is and
+    upgraded on first login.
+
+    ordered=True writes each batch in input order. ordered=False writes each
+    hashed chunk as soon as it is ready.
+
+    With `checkpoint_path`, progress is saved after every batch. A re-run on
+    the same file skips the rows that were already committed. The batch in
+    flight when an import dies may be written again, so `save_users` must be
+    an upsert by id. Rows without an `id` get a uuid5 of their normalized
+    email, so a re-written row keeps the same id.
+    """
+    def __init__(
+        self,
+        repository,
+        security: SecurityHandler,
+        batch_size: int = 1000,
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        checkpoint_path: Optional[str] = None,
+    ):
+        self.repository = repository
+        self.security = security
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.ordered = ordered
+        self.checkpoint_path = checkpoint_path
+        ph = security.ph
+        self._params = (ph.time_cost, ph.memory_cost, ph.parallelism)
+
+    async def run(self, path: str) -> ImportReport:
+        report = ImportReport()
+        done = self._load_checkpoint(path)
+        position = 0
+        batch: List[Tuple[int, Row]] = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for line, row in read_rows(path):
+                position += 1
+                if position <= done:
+                    report.skipped += 1
+                    continue
+                batch.append((line, row))
+                if len(batch) >= self.batch_size:
+                    await self._process(pool, batch, report)
+                    self._save_checkpoint(path, position)
+                    batch = []
+            if batch:
+                await self._process(pool, batch, report)
+                self._save_checkpoint(path, position)
+        logger.info(
+            f"Bulk import of {path}: {report.imported} imported, "
+            f"{report.failed} failed, {report.skipped} skipped (resumed)"
+        )
+        return report
+
+    def _validate(self, line: int, row: Row, report: ImportReport) -> Optional[UserInDB]:
+        if isinstance(row, RowError):
+            report.errors.append(row)
+            return None
+        email = row.get("email")
+        try:
+            if not row.get("hashed_password"):
+                if not row.get("password"):
+                    raise ZenithAuthError("Missing password.")
+                self.security.policy.validate(row["password"])
+            fields = {
+                "email": email,
+                "roles": row.get("roles") or [],
+                "hashed_password": row.get("hashed_password") or "",
+            }
+            if row.get("id"):
+                fields["id"] = str(row["id"])
+            elif isinstance(email, str):
+                fields["id"] = str(uuid.uuid5(uuid.NAMESPACE_URL, f"mailto:{normalize_email(email)}"))
+            return UserInDB(**fields)
+        except ValidationError as e:
+            report.errors.append(RowError(line, email, e.errors()[0]["msg"]))
+        except ZenithAuthError as e:
+            report.errors.append(RowError(line, email, str(e)))
+        return None
+
+    async def _process(self, pool, batch: List[Tuple[int, Row]], report: ImportReport):
+        # slots[i] holds row i's user once it is ready to write
+        slots: List[Optional[UserInDB]] = [None] * len(batch)
+        pending: List[Tuple[int, str]] = []
+        for i, (line, row) in enumerate(batch):
+            user = self._validate(line, row, report)
+            if user is None:
+                continue
+            slots[i] = user
+            if not user.hashed_password:
+                pending.append((i, row["password"]))
+
+        loop = asyncio.get_running_loop()
+        size = max(1, -(-len(pending) // self.workers))
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+
+        async def hash_chunk(chunk: List[Tuple[int, str]]) -> List[UserInDB]:
+            hashes = await loop.run_in_executor(
+                pool, _hash_chunk, self._params, [password for _, password in chunk]
+            )
+            users = []
+            for (i, _), hashed in zip(chunk, hashes):
+                slots[i] = slots[i].model_copy(update={"hashed_password": hashed})
+                users.append(slots[i])
+            return users
+
+        tasks = [asyncio.ensure_future(hash_chunk(chunk)) for chunk in chunks]
+        if self.ordered:
+            await asyncio.gather(*tasks)
+            await self._save([u for u in slots if u is not None], report)
+        else:
+            await self._save([u for u in slots if u is not None and u.hashed_password], report)
+            for finished in asyncio.as_completed(tasks):
+                await self._save(await finished, report)
+
+    async def _save(self, users: List[UserInDB], report: ImportReport):
+        if users:
+            await self.repository.save_users(users)
+            report.imported += len(users)
+
+    def _load_checkpoint(self, path: str) -> int:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("source") != os.path.abspath(path):
+            return 0
+        return int(state.get("rows", 0))
+
+    def _save_checkpoint(self, path: str, rows: int):
+        if not self.checkpoint_path:
+            return
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"source": os.path.abspath(path), "rows": rows}, f)
+        os.replace(tmp, self.checkpoint_path)
@@ -0,0 +1,76 @@
+"""
+Picks Argon2id parameters for the current host.
+
+    python -m zenithauth.core.calibration --target-ms 250 --memory-mib 64
+
+Prints ZenithSettings lines (ARGON2_TIME_COST, ARGON2_MEMORY_COST,
+ARGON2_PARALLELISM) to put in the environment or .env file.
+"""
+import argparse
+import os
+import time
+from typing import Dict, Optional
+
+from argon2 import PasswordHasher
+
+SAMPLE_PASSWORD = "calibration-sample-password"
+MIN_MEMORY_KIB = 19 * 1024  # OWASP floor for Argon2id
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, rounds: int = 3) -> float:
+    """Median hash latency in milliseconds."""
+    ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        ph.hash(SAMPLE_PASSWORD)
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+def calibrate(
+    target_ms: float = 250.0,
+    memory_budget_mib: int = 64,
+    parallelism: Optional[int] = None,
+    max_time_cost: int = 10,
+) -> Dict[str, float]:
+    """
+    Memory is the stronger defence, so the full per-verification budget is
+    used and time_cost is raised until the target latency is reached. If
+    even time_cost=1 is too slow, memory is halved down to MIN_MEMORY_KIB.
+    Returns the largest parameters that stay within the target.
+    """
+    parallelism = parallelism or min(os.cpu_count() or 1, 4)
+    memory_cost = max(MIN_MEMORY_KIB, memory_budget_mib * 1024)
+
+    elapsed = measure(1, memory_cost, parallelism)
+    while elapsed > target_ms and memory_cost // 2 >= MIN_MEMORY_KIB:
+        memory_cost //= 2
+        elapsed = measure(1, memory_cost, parallelism)
+
+    time_cost = 1
+    while time_cost < max_time_cost:
+        candidate = measure(time_cost + 1, memory_cost, parallelism)
+        if candidate > target_ms:
+            break
+        time_cost, elapsed = time_cost + 1, candidate
+
+    return {
+        "ARGON2_TIME_COST": time_cost,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": parallelism,
+        "measured_ms": round(elapsed, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--memory-mib", type=int, default=64, help="memory budget per verification")
+    parser.add_argument("--parallelism", type=int, default=None)
+    args = parser.parse_args()
+
+    result = calibrate(args.target_ms, args.memory_mib, args.parallelism)
+    print(f"# measured {result.pop('measured_ms')} ms per hash")
+    for name, value in result.items():
+        print(f"{name}={value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, Optional, Tuple
+from zenithauth.core.revocation import Consistency, STRICT
+
+
+class AuthContext:
+    """
+    Per-request memo of verified tokens.
+    Lets several guards in the same request share one decode + revocation check.
+    """
+    def __init__(self):
+        self._verified: Dict[str, Tuple[Dict[str, Any], Consistency]] = {}
+        self.principal: Optional[Dict[str, Any]] = None
+
+    def get(self, token: str, consistency: Consistency = STRICT) -> Optional[Dict[str, Any]]:
+        """Returns the memoized payload if it was verified at least as strictly."""
+        entry = self._verified.get(token)
+        if entry is None or not entry[1].satisfies(consistency):
+            return None
+        return entry[0]
+
+    def remember(self, token: str, payload: Dict[str, Any], consistency: Consistency = STRICT):
+        self._verified[token] = (payload, consistency)
+        self.principal = payload
+
+    def forget(self, token: str):
+        entry = self._verified.pop(token, None)
+        if entry is not None and self.principal is entry[0]:
+            self.principal = None
+
+
+_auth_context: ContextVar[Optional[AuthContext]] = ContextVar(
+    "zenithauth_context", default=None
+)
+
+
+def get_auth_context() -> Optional[AuthContext]:
+    """Returns the active request context, or None outside of a request."""
+    return _auth_context.get()
+
+
+def ensure_auth_context() -> AuthContext:
+    """
+    Returns the active context, creating one if needed.
+    Integrations call this at the start of a request; the value lives
+    only as long as the current task's context.
+    """
+    ctx = _auth_context.get()
+    if ctx is None:
+        ctx = AuthContext()
+        _auth_context.set(ctx)
+    return ctx
+
+
+@contextmanager
+def auth_context() -> Iterator[AuthContext]:
+    """Explicitly scopes a fresh AuthContext (e.g. in middleware or workers)."""
+    token: Token = _auth_context.set(AuthContext())
+    try:
+        yield _auth_context.get()
+    finally:
+        _auth_context.reset(token)
+
+
+def current_principal() -> Optional[Dict[str, Any]]:
+    """The most recently verified payload in this request, without re-verifying."""
+    ctx = _auth_context.get()
+    return ctx.principal if ctx else None
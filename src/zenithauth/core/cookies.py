@@ -0,0 +1,107 @@
+import base64
+import hashlib
+import hmac
+import struct
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from zenithauth.core.exceptions import TokenExpiredError, ZenithAuthError
+
+class CookieSession:
+    """A decoded browser session: who, which session, when, which roles."""
+    __slots__ = ("user_id", "session_id", "issued_at", "roles")
+
+    def __init__(self, user_id: str, session_id: str, issued_at: int, roles: List[str]):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.issued_at = issued_at
+        self.roles = roles
+
+class CookieSessionCodec:
+    """
+    Compact HMAC-signed session cookies for browser clients.
+
+    Layout (before base64url): version (1 byte), issued-at (uint32), role
+    bitmask (uint32), session ID (16 raw UUID bytes), subject (UTF-8), then
+    a 16-byte truncated HMAC-SHA256 tag. Roles are bits indexed by their
+    position in `roles`, so only configured roles fit in a cookie.
+
+    The keyed HMAC state is computed once and copied per cookie.
+    """
+    VERSION = 1
+    HEADER = struct.Struct("<BII16s")
+    TAG_SIZE = 16
+
+    def __init__(self, key: bytes, roles: List[str], max_age: int):
+        if len(roles) > 32:
+            raise ZenithAuthError("Cookie sessions support at most 32 roles.")
+        self.roles = list(roles)
+        self._bits = {role: 1 << i for i, role in enumerate(self.roles)}
+        self.max_age = max_age
+        self._mac = hmac.new(key, digestmod=hashlib.sha256)
+
+    def _tag(self, data: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(data)
+        return mac.digest()[:self.TAG_SIZE]
+
+    def encode(
+        self,
+        user_id: str,
+        roles: List[str],
+        session_id: Optional[str] = None,
+        issued_at: Optional[int] = None,
+    ) -> str:
+        mask = 0
+        for role in roles:
+            if role not in self._bits:
+                raise ZenithAuthError(f"Role not configured for cookie sessions: {role}")
+            mask |= self._bits[role]
+        sid = uuid.UUID(session_id) if session_id else uuid.uuid4()
+        data = self.HEADER.pack(
+            self.VERSION, issued_at or int(time.time()), mask, sid.bytes
+        ) + user_id.encode()
+        return base64.urlsafe_b64encode(data + self._tag(data)).rstrip(b"=").decode()
+
+    def decode(self, cookie: str) -> CookieSession:
+        try:
+            raw = base64.urlsafe_b64decode(cookie + "=" * (-len(cookie) % 4))
+        except ValueError:
+            raise ZenithAuthError("Invalid session cookie.")
+        if len(raw) < self.HEADER.size + self.TAG_SIZE:
+            raise ZenithAuthError("Invalid session cookie.")
+        data, tag = raw[:-self.TAG_SIZE], raw[-self.TAG_SIZE:]
+        if not hmac.compare_digest(tag, self._tag(data)):
+            raise ZenithAuthError("Invalid session cookie.")
+        version, issued_at, mask, sid = self.HEADER.unpack_from(data)
+        if version != self.VERSION:
+            raise ZenithAuthError("Invalid session cookie.")
+        if time.time() >= issued_at + self.max_age:
+            raise TokenExpiredError("Session has expired.")
+        roles = [role for role, bit in self._bits.items() if mask & bit]
+        return CookieSession(
+            data[self.HEADER.size:].decode(), str(uuid.UUID(bytes=sid)), issued_at, roles
+        )
+
+    def needs_reissue(self, session: CookieSession) -> bool:
+        """Sliding expiry: re-sign only once a cookie is past half its lifetime."""
+        return time.time() - session.issued_at >= self.max_age / 2
+
+    def reissue(self, session: CookieSession) -> str:
+        return self.encode(session.user_id, session.roles, session.session_id)
+
+    def claims(self, session: CookieSession) -> Dict[str, Any]:
+        """
+        The session as token claims, so `RevocationStore.check` and
+        `Authorizer` apply unchanged; the session ID acts as the token family.
+        """
+        return {
+            "sub": session.user_id,
+            "jti": session.session_id,
+            "fid": session.session_id,
+            "iat": session.issued_at,
+            "exp": session.issued_at + self.max_age,
+            "scopes": session.roles,
+            "typ": "cookie",
+        }
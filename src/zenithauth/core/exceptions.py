@@ -11,5 +11,22 @@ class TokenExpiredError(ZenithAuthError):
 class RevokedTokenError(ZenithAuthError):
     pass
 
+class RefreshTokenReuseError(RevokedTokenError):
+    """A rotated refresh token was presented again; its family has been revoked."""
+    pass
+
 class InsufficientPermissionsError(ZenithAuthError):
-    pass
\ No newline at end of file
+    pass
+
+class RateLimitedError(ZenithAuthError):
+    pass
+
+class AuthOverloadedError(ZenithAuthError):
+    """Password hashing is at capacity; the request was shed rather than queued."""
+    pass
+
+class LoginThrottledError(RateLimitedError):
+    """Too many login or MFA attempts; `retry_after` is in seconds."""
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,392 @@
+import asyncio
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from zenithauth.core.exceptions import ZenithAuthError
+from zenithauth.core.logger import logger
+from zenithauth.core.revocation import Consistency, RefreshState, RevocationMetrics
+from zenithauth.core.scripts import AuthStatus
+
+# Index header: magic, version, reserved, capacity, count, generation, log_offset
+HEADER = struct.Struct("<8sIIQQQQ")
+HEADER_SIZE = 64
+MAGIC = b"ZAREVIX1"
+# One slot / log record: 16-byte key digest, expiry (unix ts), value (epoch ts or 0)
+RECORD = struct.Struct("<16sdd")
+EMPTY = bytes(16)
+MAX_LOAD = 0.7
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+def _now() -> float:
+    return datetime.now(timezone.utc).timestamp()
+
+class FileRevocationStore:
+    """
+    Redis-free revocation store for edge nodes.
+
+    Layout on disk (all under `path`):
+    - `<path>.<generation>.log`: append-only log of fixed-size records, the
+      durable history of every revocation.
+    - `<path>.idx`: open-addressing hash table of key digests -> expiry, mapped
+      with mmap. It is updated in place on every write, so a restart only
+      replays log records past the offset stored in its header.
+    - `<path>.lock`: flock'd by writers; readers never take it.
+
+    Any number of local processes may map the same files. Compaction writes a
+    new generation (log + index) without expired records and atomically swaps
+    the index in; other processes notice the new inode and re-map. It runs
+    every `compaction_interval` seconds on a background task, started on
+    first use from inside the event loop.
+    """
+    def __init__(
+        self,
+        path: str,
+        initial_capacity: int = 1 << 16,
+        readonly: bool = False,
+        compaction_interval: float = 300.0,
+        fsync: bool = False,
+    ):
+        self.path = path
+        self.idx_path = f"{path}.idx"
+        self.lock_path = f"{path}.lock"
+        self.readonly = readonly
+        self.compaction_interval = compaction_interval
+        self.fsync = fsync
+        self.metrics = RevocationMetrics()
+        self._rate: Dict[str, Tuple[float, int]] = {}
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._ino = None
+        self._compactor: Optional[asyncio.Task] = None
+
+        if not os.path.exists(self.idx_path):
+            if readonly:
+                raise ZenithAuthError(f"No revocation index at {self.idx_path}.")
+            with self._locked():
+                if not os.path.exists(self.idx_path):
+                    self._write_generation(1, initial_capacity, [])
+        self._open()
+        if not readonly:
+            with self._locked():
+                self._replay_tail()
+
+    # --- Public API (same contract as RevocationStore) ---
+
+    async def is_revoked(self, jti: str, consistency: Optional[Consistency] = None) -> bool:
+        level = Consistency.parse(consistency)
+        self.ensure_started()
+        self.metrics.record(level.label, hit_store=level.mode != Consistency.STATELESS)
+        if level.mode == Consistency.STATELESS:
+            return False
+        return self._live(f"jti:{jti}") is not None
+
+    async def is_revoked_many(
+        self, jtis: Iterable[str], consistency: Optional[Consistency] = None
+    ) -> Dict[str, bool]:
+        return {jti: await self.is_revoked(jti, consistency) for jti in jtis}
+
+    async def check(
+        self,
+        payload: Dict[str, Any],
+        consistency: Optional[Consistency] = None,
+        rate_limit: int = 0,
+        rate_window: int = 60,
+    ) -> int:
+        """Same status codes as the Redis script; rate limits are per process."""
+        level = Consistency.parse(consistency)
+        self.ensure_started()
+        self.metrics.record(level.label, hit_store=level.mode != Consistency.STATELESS)
+        if level.mode == Consistency.STATELESS:
+            return AuthStatus.OK
+
+        if self._live(f"jti:{payload['jti']}") is not None:
+            return AuthStatus.REVOKED
+        fid = payload.get("fid")
+        if fid and self._live(f"family:{fid}") is not None:
+            return AuthStatus.REVOKED
+        sub = payload.get("sub", "")
+        epoch = self._live(f"epoch:{sub}")
+        if epoch is not None and float(payload.get("iat", 0)) < epoch:
+            return AuthStatus.STALE_EPOCH
+        if rate_limit and not self._count_hit(sub, rate_limit, rate_window):
+            return AuthStatus.RATE_LIMITED
+        return AuthStatus.OK
+
+    async def revoke(self, jti: str, expires_at: int):
+        if expires_at > _now():
+            self._put([(f"jti:{jti}", float(expires_at), 0.0)])
+
+    async def revoke_many(self, items: Iterable[Tuple[str, int]]):
+        now = _now()
+        self._put([(f"jti:{jti}", float(exp), 0.0) for jti, exp in items if exp > now])
+
+    async def revoke_family(self, family_id: str, ttl: int):
+        self._put([(f"family:{family_id}", _now() + ttl, 0.0)])
+
+    async def revoke_user(self, user_id: str, ttl: int):
+        # Whole seconds, like `iat` (see RevocationStore.revoke_user)
+        now = float(int(_now()))
+        self._put([(f"epoch:{user_id}", now + ttl, now)])
+
+    async def revoke_roles(self, user_id: str, ttl: int):
+        now = float(int(_now()))
+        self._put([(f"roles:{user_id}", now + ttl, now)])
+
+    async def consume_refresh(self, payload: Dict[str, Any]) -> RefreshState:
+        jti, sub, fid = payload["jti"], payload.get("sub", ""), payload.get("fid")
+        with self._locked():
+            # Check-and-set under the writer lock so two processes can't both win
+            self._refresh()
+            first_use = self._live(f"used:{jti}") is None
+            if first_use:
+                self._put_locked([(f"used:{jti}", float(payload["exp"]), 0.0)])
+        user_epoch = self._live(f"epoch:{sub}")
+        role_epoch = self._live(f"roles:{sub}")
+        return RefreshState(
+            reused=not first_use,
+            revoked=self._live(f"jti:{jti}") is not None
+            or bool(fid and self._live(f"family:{fid}") is not None),
+            stale_epoch=user_epoch is not None and float(payload.get("iat", 0)) < user_epoch,
+            stale_roles=role_epoch is not None and float(payload.get("rv", 0)) < role_epoch,
+        )
+
+    # --- Maintenance ---
+
+    def compact(self) -> int:
+        """Rewrites log + index without expired records. Returns records kept."""
+        with self._locked():
+            self._refresh()
+            now = _now()
+            live = [rec for rec in self._entries() if rec[1] > now]
+            capacity = self._capacity_for(len(live), self._header()[3])
+            generation = self._header()[5]
+            self._write_generation(generation + 1, capacity, live)
+            self._refresh()
+            self._remove_log(generation)
+            logger.info(f"Revocation file compacted: {len(live)} live records kept.")
+            return len(live)
+
+    def ensure_started(self):
+        """Starts periodic compaction on the running event loop (once)."""
+        if self.readonly or (self._compactor is not None and not self._compactor.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop yet; compact() can be called manually
+        self._compactor = loop.create_task(self._compact_loop())
+
+    def start(self):
+        self.ensure_started()
+
+    async def stop(self):
+        if self._compactor is not None:
+            self._compactor.cancel()
+            try:
+                await self._compactor
+            except asyncio.CancelledError:
+                pass
+            self._compactor = None
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    async def _compact_loop(self):
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            try:
+                self.compact()
+            except OSError as e:
+                logger.warning(f"Revocation file compaction failed: {e}")
+
+    # --- Index internals ---
+
+    def _log_path(self, generation: int) -> str:
+        return f"{self.path}.{generation}.log"
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _open(self):
+        self.close()
+        self._file = open(self.idx_path, "rb" if self.readonly else "r+b")
+        access = mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=access)
+        self._ino = os.fstat(self._file.fileno()).st_ino
+        if self._header()[0] != MAGIC:
+            raise ZenithAuthError(f"{self.idx_path} is not a revocation index.")
+
+    def _refresh(self):
+        """Re-maps the index if another process compacted or grew it."""
+        if os.stat(self.idx_path).st_ino != self._ino:
+            self._open()
+
+    def _header(self) -> tuple:
+        return HEADER.unpack_from(self._mm, 0)
+
+    def _set_header(self, count: int, log_offset: int):
+        magic, version, reserved, capacity, _, generation, _ = self._header()
+        HEADER.pack_into(
+            self._mm, 0, magic, version, reserved, capacity, count, generation, log_offset
+        )
+
+    def _probe(self, digest: bytes) -> Tuple[int, Optional[tuple]]:
+        """Linear probing: returns (slot, record) for the key or the first empty slot."""
+        capacity = self._header()[3]
+        slot = int.from_bytes(digest[:8], "little") % capacity
+        while True:
+            record = RECORD.unpack_from(self._mm, HEADER_SIZE + slot * RECORD.size)
+            if record[0] == digest:
+                return slot, record
+            if record[0] == EMPTY:
+                return slot, None
+            slot = (slot + 1) % capacity
+
+    def _live(self, key: str) -> Optional[float]:
+        """Returns the record value if the key is present and unexpired."""
+        self._refresh()
+        _, record = self._probe(_digest(key))
+        if record is None or record[1] <= _now():
+            return None
+        return record[2]
+
+    def _entries(self) -> List[tuple]:
+        capacity = self._header()[3]
+        records = (
+            RECORD.unpack_from(self._mm, HEADER_SIZE + i * RECORD.size)
+            for i in range(capacity)
+        )
+        return [r for r in records if r[0] != EMPTY]
+
+    def _apply(self, digest: bytes, expires_at: float, value: float) -> bool:
+        """Upserts one slot in place. Returns True if a new key was added."""
+        slot, record = self._probe(digest)
+        if record is not None:
+            expires_at = max(expires_at, record[1])
+            value = max(value, record[2])
+        offset = HEADER_SIZE + slot * RECORD.size
+        # Payload first, digest last: a concurrent reader never sees a key without its data
+        self._mm[offset + 16:offset + RECORD.size] = RECORD.pack(EMPTY, expires_at, value)[16:]
+        self._mm[offset:offset + 16] = digest
+        return record is None
+
+    def _put(self, items: List[Tuple[str, float, float]]):
+        if not items:
+            return
+        if self.readonly:
+            raise ZenithAuthError("Revocation store was opened read-only.")
+        self.ensure_started()
+        with self._locked():
+            self._refresh()
+            self._put_locked(items)
+
+    def _put_locked(self, items: List[Tuple[str, float, float]]):
+        """Appends to the log and updates the index; caller holds the writer lock."""
+        records = [(_digest(key), exp, value) for key, exp, value in items]
+        _, _, _, capacity, count, generation, log_offset = self._header()
+        if (count + len(records)) > capacity * MAX_LOAD:
+            self._grow(count + len(records))
+            _, _, _, capacity, count, generation, log_offset = self._header()
+
+        data = b"".join(RECORD.pack(*rec) for rec in records)
+        with open(self._log_path(generation), "ab") as log:
+            log.write(data)
+            log.flush()
+            if self.fsync:
+                os.fsync(log.fileno())
+        added = sum(self._apply(*rec) for rec in records)
+        self._set_header(count + added, log_offset + len(data))
+
+    def _grow(self, needed: int):
+        now = _now()
+        live = [rec for rec in self._entries() if rec[1] > now]
+        generation = self._header()[5]
+        capacity = self._capacity_for(max(needed, len(live)), self._header()[3])
+        self._write_generation(generation + 1, capacity, live)
+        self._refresh()
+        self._remove_log(generation)
+
+    @staticmethod
+    def _capacity_for(count: int, current: int) -> int:
+        capacity = max(current, 1024)
+        while count > capacity * MAX_LOAD:
+            capacity *= 2
+        return capacity
+
+    def _replay_tail(self):
+        """Applies log records written after the index's last recorded offset."""
+        _, _, _, _, count, generation, log_offset = self._header()
+        log_path = self._log_path(generation)
+        if not os.path.exists(log_path):
+            return
+        size = os.path.getsize(log_path)
+        torn = size % RECORD.size
+        if torn:
+            # A crash mid-append; drop the partial record so new appends stay aligned
+            os.truncate(log_path, size - torn)
+            size -= torn
+            logger.warning(f"Revocation file: dropped a torn {torn}-byte trailing record.")
+        if size <= log_offset:
+            return
+        with open(log_path, "rb") as log:
+            log.seek(log_offset)
+            tail = log.read(size - log_offset)
+        added = sum(self._apply(*rec) for rec in RECORD.iter_unpack(tail))
+        self._set_header(count + added, size)
+        logger.info(f"Revocation file: replayed {len(tail) // RECORD.size} log records.")
+
+    def _write_generation(self, generation: int, capacity: int, records: List[tuple]):
+        """Writes a fresh log + index for `generation` and swaps the index in atomically."""
+        log_data = b"".join(RECORD.pack(*rec) for rec in records)
+        with open(self._log_path(generation), "wb") as log:
+            log.write(log_data)
+            log.flush()
+            os.fsync(log.fileno())
+
+        tmp_path = f"{self.idx_path}.tmp"
+        with open(tmp_path, "w+b") as f:
+            f.truncate(HEADER_SIZE + capacity * RECORD.size)
+            mm = mmap.mmap(f.fileno(), 0)
+            HEADER.pack_into(mm, 0, MAGIC, 1, 0, capacity, 0, generation, len(log_data))
+            previous, self._mm = self._mm, mm
+            try:
+                count = sum(self._apply(*rec) for rec in records)
+                self._set_header(count, len(log_data))
+                mm.flush()
+            finally:
+                self._mm = previous
+                mm.close()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.idx_path)
+
+    def _remove_log(self, generation: int):
+        try:
+            os.remove(self._log_path(generation))
+        except FileNotFoundError:
+            pass
+
+    def _count_hit(self, sub: str, limit: int, window: int) -> bool:
+        now = time.monotonic()
+        started, hits = self._rate.get(sub, (now, 0))
+        if now - started >= window:
+            started, hits = now, 0
+        self._rate[sub] = (started, hits + 1)
+        return hits + 1 <= limit
@@ -0,0 +1,91 @@
+import base64
+import hashlib
+import hmac
+from typing import Callable, Dict
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+from zenithauth.core.exceptions import ZenithAuthError
+
+Verifier = Callable[[str, str], bool]
+
+class UnknownHashFormatError(ZenithAuthError):
+    pass
+
+def scheme_of(hashed: str) -> str:
+    """
+    The format tag of a stored hash, found without scanning the whole string:
+    `$argon2id$...` / `$2b$...` -> "argon2id" / "2b";
+    `pbkdf2_sha256$...` / `scrypt$...` (Django style) -> "pbkdf2_sha256" / "scrypt".
+    """
+    if hashed.startswith("$"):
+        end = hashed.find("$", 1)
+        return hashed[1:end] if end > 0 else ""
+    end = hashed.find("$")
+    return hashed[:end] if end > 0 else ""
+
+def verify_pbkdf2_sha256(hashed: str, plain: str) -> bool:
+    # pbkdf2_sha256$<iterations>$<salt>$<base64 hash>
+    _, iterations, salt, expected = hashed.split("$", 3)
+    derived = hashlib.pbkdf2_hmac("sha256", plain.encode(), salt.encode(), int(iterations))
+    return hmac.compare_digest(base64.b64encode(derived).decode(), expected)
+
+def verify_scrypt(hashed: str, plain: str) -> bool:
+    # scrypt$<n>$<salt>$<r>$<p>$<base64 hash> (64-byte key)
+    _, n, salt, r, p, expected = hashed.split("$", 5)
+    n, r, p = int(n), int(r), int(p)
+    derived = hashlib.scrypt(
+        plain.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=256 * n * r, dklen=64
+    )
+    return hmac.compare_digest(base64.b64encode(derived).decode(), expected)
+
+def verify_bcrypt(hashed: str, plain: str) -> bool:
+    try:
+        import bcrypt
+    except ImportError:
+        raise ZenithAuthError("bcrypt hashes need the optional dependency: pip install zenithauth[legacy]")
+    return bcrypt.checkpw(plain.encode(), hashed.encode())
+
+class HashRegistry:
+    """
+    Maps a hash format tag to its verifier (one dict lookup per login).
+    Verifiers return True/False, and raise only for malformed hashes.
+    Argon2id (with the configured parameters) is the only "current" format;
+    everything else is verified once and then upgraded by the caller.
+    """
+    CURRENT = "argon2id"
+
+    def __init__(self, ph: PasswordHasher):
+        self.ph = ph
+        self._verifiers: Dict[str, Verifier] = {
+            "argon2id": self._verify_argon2,
+            "argon2i": self._verify_argon2,
+            "argon2d": self._verify_argon2,
+            "2b": verify_bcrypt,
+            "2a": verify_bcrypt,
+            "2y": verify_bcrypt,
+            "pbkdf2_sha256": verify_pbkdf2_sha256,
+            "scrypt": verify_scrypt,
+        }
+
+    def register(self, scheme: str, verifier: Verifier):
+        self._verifiers[scheme] = verifier
+
+    def _verify_argon2(self, hashed: str, plain: str) -> bool:
+        try:
+            return self.ph.verify(hashed, plain)
+        except VerificationError:
+            return False
+
+    def verify(self, hashed: str, plain: str) -> bool:
+        verifier = self._verifiers.get(scheme_of(hashed))
+        if verifier is None:
+            raise UnknownHashFormatError("Unsupported password hash format.")
+        try:
+            return verifier(hashed, plain)
+        except (ValueError, InvalidHashError):
+            raise UnknownHashFormatError("Malformed password hash.")
+
+    def is_legacy(self, hashed: str) -> bool:
+        return scheme_of(hashed) != self.CURRENT
@@ -20,7 +20,7 @@ class UserCreate(UserBase):
 class UserRead(UserBase):
     """Schema for returning user data (sanitized)."""
     id: str = Field(default_factory=lambda: str(uuid4()))
-    created_at: datetime = Field(default_factory=datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class UserInDB(UserRead):
     """Internal schema that includes the sensitive hash."""
@@ -3,8 +3,9 @@ import qrcode
 import io
 import base64
 from qrcode.image.pil import PilImage
-from typing import Optional
+from typing import Iterable, List, Tuple
 from zenithauth.core.exceptions import ZenithAuthError
+from zenithauth.core.totp import TOTPVerifier
 
 class InvalidMFACodeError(ZenithAuthError):
     pass
@@ -12,6 +13,8 @@ class InvalidMFACodeError(ZenithAuthError):
 class MFAHandler:
     def __init__(self, issuer_name: str = "ZenithAuth"):
         self.issuer_name = issuer_name
+        # window=1 allows for 30 seconds of clock drift
+        self.verifier = TOTPVerifier(window=1)
 
     def generate_secret(self) -> str:
         """Generates a random base32 OTP secret."""
@@ -26,9 +29,11 @@ class MFAHandler:
 
     def verify_code(self, secret: str, code: str) -> bool:
         """Verifies a 6-digit TOTP code."""
-        totp = pyotp.totp.TOTP(secret)
-        # valid_window=1 allows for 30 seconds of clock drift
-        return totp.verify(code, valid_window=1)
+        return self.verifier.verify(secret, code)
+
+    def verify_many(self, items: Iterable[Tuple[str, str]]) -> List[bool]:
+        """Verifies a batch of (secret, code) pairs, e.g. from an OTP gateway."""
+        return self.verifier.verify_many(items)
 
     def generate_qr_base64(self, uri: str) -> str:
         """Generates a QR code image as a base64 string for the frontend."""
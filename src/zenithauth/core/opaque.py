@@ -0,0 +1,135 @@
+import asyncio
+import base64
+import hashlib
+import json
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+ACCESS_PREFIX = "zat_"
+REFRESH_PREFIX = "zrt_"
+
+def is_opaque(token: str) -> bool:
+    """Format detection by prefix alone; JWTs always start with `ey`."""
+    return token.startswith((ACCESS_PREFIX, REFRESH_PREFIX))
+
+class OpaqueTokenStore:
+    """
+    Reference tokens: a prefix-tagged random 128-bit handle that maps to a
+    compact JSON claims record in Redis. Clients see no claims, and deleting
+    the record revokes the handle without a blacklist entry.
+
+    Only a digest of the handle is used as the Redis key, so a dump of the
+    keyspace yields no usable tokens. Introspection results are cached locally
+    for `cache_ttl` seconds (the bound on how long a deleted handle may still
+    be accepted by other processes); misses issued in the same event-loop
+    tick are resolved together with one MGET.
+    """
+    KEY_PREFIX = "opaque:"
+
+    def __init__(self, client, cache_ttl: float = 5.0, cache_size: int = 10_000):
+        self.client = client
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._batch: Dict[str, "asyncio.Future"] = {}
+        self._tasks: set = set()
+        self.batches = 0
+
+    @staticmethod
+    def _key(handle: str) -> str:
+        return OpaqueTokenStore.KEY_PREFIX + hashlib.blake2b(handle.encode(), digest_size=16).hexdigest()
+
+    async def issue_many(self, records: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Stores (prefix, claims) records in one pipeline; returns their handles."""
+        now = int(time.time())
+        handles = []
+        pipe = self.client.pipeline(transaction=False)
+        for prefix, claims in records:
+            handle = prefix + base64.urlsafe_b64encode(secrets.token_bytes(16)).rstrip(b"=").decode()
+            pipe.set(
+                self._key(handle),
+                json.dumps(claims, separators=(",", ":")),
+                ex=max(1, claims["exp"] - now),
+            )
+            handles.append(handle)
+        await pipe.execute()
+        return handles
+
+    async def introspect(self, handle: str) -> Optional[Dict[str, Any]]:
+        """Claims for a live handle, or None if unknown, deleted or expired."""
+        cached = self._cached(handle)
+        if cached is not None:
+            return cached
+        future = self._batch.get(handle)
+        if future is None:
+            if not self._batch:
+                asyncio.get_running_loop().call_soon(self._flush_batch)
+            future = asyncio.get_running_loop().create_future()
+            self._batch[handle] = future
+        return await asyncio.shield(future)
+
+    async def introspect_many(self, handles: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Cache first, then one MGET for every miss."""
+        results: List[Optional[Dict[str, Any]]] = [self._cached(h) for h in handles]
+        misses = [h for h, r in zip(handles, results) if r is None]
+        if misses:
+            found = dict(zip(misses, await self._fetch(misses)))
+            results = [r if r is not None else found[h] for h, r in zip(handles, results)]
+        return results
+
+    async def revoke(self, handle: str):
+        self._cache.pop(handle, None)
+        await self.client.delete(self._key(handle))
+
+    def _flush_batch(self):
+        batch, self._batch = self._batch, {}
+        task = asyncio.ensure_future(self._resolve(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch: Dict[str, "asyncio.Future"]):
+        handles = list(batch)
+        try:
+            records = await self._fetch(handles)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for handle, record in zip(handles, records):
+            if not batch[handle].done():
+                batch[handle].set_result(record)
+
+    async def _fetch(self, handles: List[str]) -> List[Optional[Dict[str, Any]]]:
+        self.batches += 1
+        raw = await self.client.mget([self._key(h) for h in handles])
+        records = []
+        for handle, value in zip(handles, raw):
+            record = json.loads(value) if value is not None else None
+            if record is not None:
+                self._remember(handle, record)
+            records.append(record)
+        return records
+
+    def _cached(self, handle: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(handle)
+        if entry is None:
+            return None
+        record, until = entry
+        if time.monotonic() >= until:
+            del self._cache[handle]
+            return None
+        self._cache.move_to_end(handle)
+        return record
+
+    def _remember(self, handle: str, record: Dict[str, Any]):
+        # Never cache past the token's own expiry
+        ttl = min(self.cache_ttl, record["exp"] - time.time())
+        if ttl <= 0:
+            return
+        self._cache[handle] = (record, time.monotonic() + ttl)
+        self._cache.move_to_end(handle)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,179 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from zenithauth.core.exceptions import ZenithAuthError
+
+# PASETO registered claims are ISO-8601 strings on the wire; ZenithAuth
+# payloads use integer timestamps like the JWT engine does.
+_TIME_CLAIMS = ("exp", "iat", "nbf")
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def pae(*pieces: bytes) -> bytes:
+    """Pre-Authentication Encoding: count and lengths as LE64, then the pieces."""
+    out = [struct.pack("<Q", len(pieces))]
+    for piece in pieces:
+        out.append(struct.pack("<Q", len(piece)))
+        out.append(piece)
+    return b"".join(out)
+
+def _serialize(claims: Dict[str, Any]) -> bytes:
+    wire = dict(claims)
+    for name in _TIME_CLAIMS:
+        if isinstance(wire.get(name), (int, float)):
+            wire[name] = datetime.fromtimestamp(wire[name], timezone.utc).isoformat()
+    return json.dumps(wire, separators=(",", ":")).encode()
+
+def _deserialize(message: bytes) -> Dict[str, Any]:
+    try:
+        claims = json.loads(message)
+        for name in _TIME_CLAIMS:
+            if isinstance(claims.get(name), str):
+                claims[name] = int(datetime.fromisoformat(claims[name]).timestamp())
+    except ValueError:
+        raise ZenithAuthError("Invalid token.")
+    return claims
+
+def _split(token: str, header: str) -> bytes:
+    """Body bytes of a footer-less token with the given header."""
+    if not token.startswith(header) or "." in token[len(header):]:
+        raise ZenithAuthError("Invalid token.")
+    try:
+        return _b64decode(token[len(header):])
+    except ValueError:
+        raise ZenithAuthError("Invalid token.")
+
+class PasetoV4Public:
+    """
+    v4.public: Ed25519 signature over PAE(header, message, footer, implicit).
+    The header is fixed, so there is no algorithm negotiation. Tokens carry
+    no footer. Construct with only `public_key` for verify-only services.
+    """
+    HEADER = "v4.public."
+    SIG_SIZE = 64
+
+    def __init__(self, private_key: Optional[bytes] = None, public_key: Optional[bytes] = None):
+        if private_key is None and public_key is None:
+            raise ZenithAuthError("PASETO v4.public needs a private or a public key.")
+        self._signer = Ed25519PrivateKey.from_private_bytes(private_key) if private_key else None
+        self._verifier = (
+            self._signer.public_key() if self._signer else Ed25519PublicKey.from_public_bytes(public_key)
+        )
+        self._header = self.HEADER.encode()
+
+    @property
+    def public_key(self) -> bytes:
+        return self._verifier.public_bytes(Encoding.Raw, PublicFormat.Raw)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        if self._signer is None:
+            raise ZenithAuthError("This PASETO engine is verify-only.")
+        message = _serialize(claims)
+        signature = self._signer.sign(pae(self._header, message, b"", b""))
+        return self.HEADER + _b64encode(message + signature)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        body = _split(token, self.HEADER)
+        if len(body) <= self.SIG_SIZE:
+            raise ZenithAuthError("Invalid token.")
+        message, signature = body[:-self.SIG_SIZE], body[-self.SIG_SIZE:]
+        try:
+            self._verifier.verify(signature, pae(self._header, message, b"", b""))
+        except InvalidSignature:
+            raise ZenithAuthError("Invalid token.")
+        return _deserialize(message)
+
+def _qr(a: int, b: int, c: int, d: int):
+    a = (a + b) & 0xFFFFFFFF; d ^= a; d = ((d << 16) & 0xFFFFFFFF) | (d >> 16)
+    c = (c + d) & 0xFFFFFFFF; b ^= c; b = ((b << 12) & 0xFFFFFFFF) | (b >> 20)
+    a = (a + b) & 0xFFFFFFFF; d ^= a; d = ((d << 8) & 0xFFFFFFFF) | (d >> 24)
+    c = (c + d) & 0xFFFFFFFF; b ^= c; b = ((b << 7) & 0xFFFFFFFF) | (b >> 25)
+    return a, b, c, d
+
+def hchacha20(key: bytes, nonce: bytes) -> bytes:
+    """HChaCha20 subkey derivation (the XChaCha20 extended-nonce step)."""
+    x0, x1, x2, x3 = 0x61707865, 0x3320646E, 0x79622D32, 0x6B206574
+    x4, x5, x6, x7, x8, x9, x10, x11 = struct.unpack("<8I", key)
+    x12, x13, x14, x15 = struct.unpack("<4I", nonce)
+    for _ in range(10):
+        x0, x4, x8, x12 = _qr(x0, x4, x8, x12)
+        x1, x5, x9, x13 = _qr(x1, x5, x9, x13)
+        x2, x6, x10, x14 = _qr(x2, x6, x10, x14)
+        x3, x7, x11, x15 = _qr(x3, x7, x11, x15)
+        x0, x5, x10, x15 = _qr(x0, x5, x10, x15)
+        x1, x6, x11, x12 = _qr(x1, x6, x11, x12)
+        x2, x7, x8, x13 = _qr(x2, x7, x8, x13)
+        x3, x4, x9, x14 = _qr(x3, x4, x9, x14)
+    return struct.pack("<8I", x0, x1, x2, x3, x12, x13, x14, x15)
+
+def xchacha20(key: bytes, nonce: bytes, data: bytes) -> bytes:
+    """XChaCha20 stream (block counter 0) via HChaCha20 + the library's ChaCha20."""
+    subkey = hchacha20(key, nonce[:16])
+    # cryptography takes a 16-byte nonce: LE32 counter || 96-bit IETF nonce
+    full_nonce = b"\x00" * 8 + nonce[16:24]
+    return Cipher(algorithms.ChaCha20(subkey, full_nonce), mode=None).encryptor().update(data)
+
+class PasetoV4Local:
+    """
+    v4.local: XChaCha20 encryption with a BLAKE2b-MAC (encrypt-then-MAC).
+    Both derivation keys come from one 32-byte symmetric key. The keyed
+    BLAKE2b states are built once and copied for each token.
+    """
+    HEADER = "v4.local."
+    NONCE_SIZE = 32
+    TAG_SIZE = 32
+
+    def __init__(self, key: bytes):
+        if len(key) != 32:
+            raise ZenithAuthError("PASETO v4.local keys must be 32 bytes.")
+        self._enc = hashlib.blake2b(key=key, digest_size=56)
+        self._enc.update(b"paseto-encryption-key")
+        self._auth = hashlib.blake2b(key=key, digest_size=32)
+        self._auth.update(b"paseto-auth-key-for-aead")
+        self._header = self.HEADER.encode()
+
+    def _keys(self, nonce: bytes):
+        enc = self._enc.copy()
+        enc.update(nonce)
+        tmp = enc.digest()
+        auth = self._auth.copy()
+        auth.update(nonce)
+        return tmp[:32], tmp[32:], auth.digest()
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        nonce = os.urandom(self.NONCE_SIZE)
+        enc_key, enc_nonce, auth_key = self._keys(nonce)
+        ciphertext = xchacha20(enc_key, enc_nonce, _serialize(claims))
+        tag = hashlib.blake2b(
+            pae(self._header, nonce, ciphertext, b"", b""), key=auth_key, digest_size=32
+        ).digest()
+        return self.HEADER + _b64encode(nonce + ciphertext + tag)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        body = _split(token, self.HEADER)
+        if len(body) <= self.NONCE_SIZE + self.TAG_SIZE:
+            raise ZenithAuthError("Invalid token.")
+        nonce = body[:self.NONCE_SIZE]
+        ciphertext, tag = body[self.NONCE_SIZE:-self.TAG_SIZE], body[-self.TAG_SIZE:]
+        enc_key, enc_nonce, auth_key = self._keys(nonce)
+        expected = hashlib.blake2b(
+            pae(self._header, nonce, ciphertext, b"", b""), key=auth_key, digest_size=32
+        ).digest()
+        if not hmac.compare_digest(tag, expected):
+            raise ZenithAuthError("Invalid token.")
+        return _deserialize(xchacha20(enc_key, enc_nonce, ciphertext))
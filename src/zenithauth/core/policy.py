@@ -1,12 +1,25 @@
+from typing import List, Optional, Protocol
 from zenithauth.core.exceptions import ZenithAuthError
 
 class WeakPasswordError(ZenithAuthError):
     pass
 
+class PasswordRule(Protocol):
+    """An extra policy check; raises WeakPasswordError to reject a password."""
+    def check(self, password: str) -> None:
+        ...
+
 class PasswordPolicy:
-    def __init__(self, min_length: int = 12, require_non_alpha: bool = True):
+    def __init__(
+        self,
+        min_length: int = 12,
+        require_non_alpha: bool = True,
+        rules: Optional[List[PasswordRule]] = None,
+    ):
         self.min_length = min_length
         self.require_non_alpha = require_non_alpha
+        # Run in order after the built-in checks (cheapest first)
+        self.rules = list(rules or [])
 
     def validate(self, password: str) -> bool:
         if len(password) < self.min_length:
@@ -17,4 +30,6 @@ class PasswordPolicy:
                 raise WeakPasswordError(
                     "Password is too simple. Use a mix of letters, numbers, or symbols."
                 )
-        return True
\ No newline at end of file
+        for rule in self.rules:
+            rule.check(password)
+        return True
@@ -1,22 +1,471 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 import redis.asyncio as redis
 from datetime import datetime, timezone
-from zenithauth.core.exceptions import RevokedTokenError
+from zenithauth.core.exceptions import RevokedTokenError, ZenithAuthError
+from zenithauth.core.scripts import AUTH_CHECK_SCRIPT, AuthStatus
+from zenithauth.core.singleflight import SingleFlight
+from zenithauth.core.routing import ReplicaRouter
+from zenithauth.core.sharding import HashRing, migrate_keys, plan_moves, scan_keys
+
+class Consistency:
+    """
+    How fresh the revocation answer for a single authorize call must be.
+    - strict: always query the store's primary (read-your-writes after logout).
+    - bounded(max_staleness): reuse a local answer up to max_staleness seconds old.
+    - stateless: signature and expiry only, no revocation lookup.
+    """
+    STRICT = "strict"
+    BOUNDED = "bounded"
+    STATELESS = "stateless"
+
+    def __init__(self, mode: str, max_staleness: float = 0.0):
+        if mode not in (self.STRICT, self.BOUNDED, self.STATELESS):
+            raise ZenithAuthError(f"Unknown consistency level: {mode}")
+        self.mode = mode
+        self.max_staleness = float(max_staleness) if mode == self.BOUNDED else 0.0
+
+    @classmethod
+    def bounded(cls, max_staleness: float) -> "Consistency":
+        return cls(cls.BOUNDED, max_staleness)
+
+    @classmethod
+    def parse(cls, value: Union["Consistency", str, None]) -> "Consistency":
+        if value is None:
+            return STRICT
+        if isinstance(value, Consistency):
+            return value
+        return cls(value)
+
+    @property
+    def label(self) -> str:
+        return self.mode
+
+    def satisfies(self, other: "Consistency") -> bool:
+        """True if an answer obtained at this level is good enough for `other`."""
+        if self.mode == self.STRICT or other.mode == self.STATELESS:
+            return True
+        if self.mode == self.BOUNDED and other.mode == self.BOUNDED:
+            return self.max_staleness <= other.max_staleness
+        return False
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Consistency)
+            and (self.mode, self.max_staleness) == (other.mode, other.max_staleness)
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.mode, self.max_staleness))
+
+    def __repr__(self) -> str:
+        if self.mode == self.BOUNDED:
+            return f"Consistency.bounded({self.max_staleness})"
+        return f"Consistency({self.mode!r})"
+
+STRICT = Consistency(Consistency.STRICT)
+STATELESS = Consistency(Consistency.STATELESS)
+bounded = Consistency.bounded
+
+class RevocationMetrics:
+    """Counts revocation checks and actual store round trips per consistency level."""
+    def __init__(self):
+        self.checks: Dict[str, int] = {}
+        self.store_calls: Dict[str, int] = {}
+
+    def record(self, level: str, hit_store: bool):
+        self.checks[level] = self.checks.get(level, 0) + 1
+        if hit_store:
+            self.store_calls[level] = self.store_calls.get(level, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Per level: checks, store_calls and the store calls saved vs. strict."""
+        result = {}
+        for level, checks in self.checks.items():
+            calls = self.store_calls.get(level, 0)
+            result[level] = {"checks": checks, "store_calls": calls, "saved": checks - calls}
+        return result
+
+class RefreshState:
+    """Result of RevocationStore.consume_refresh."""
+    def __init__(self, reused: bool, revoked: bool, stale_epoch: bool, stale_roles: bool):
+        self.reused = reused
+        self.revoked = revoked
+        self.stale_epoch = stale_epoch
+        self.stale_roles = stale_roles
 
 class RevocationStore:
-    def __init__(self, redis_url: str):
-        # Using the async redis client
-        self.client = redis.from_url(redis_url, decode_responses=True)
+    def __init__(
+        self,
+        redis_url: str,
+        local_cache_size: int = 10_000,
+        client: Optional[redis.Redis] = None,
+        router: Optional[ReplicaRouter] = None,
+        shards: Optional[Dict[str, ReplicaRouter]] = None,
+        vnodes: int = 160,
+    ):
+        # Writes always go to the primary; reads go through the router
+        if shards is None:
+            if router is None:
+                router = ReplicaRouter(client or redis.from_url(redis_url, decode_responses=True))
+            shards = {redis_url: router}
+        # JTIs are spread over the shards with a consistent-hash ring
+        self.shards: Dict[str, ReplicaRouter] = dict(shards)
+        self.ring = HashRing(self.shards, vnodes=vnodes)
+        self.router = next(iter(self.shards.values()))
+        self.client = self.router.primary
+        # jti -> (AuthStatus, monotonic time of the answer); used by bounded reads
+        self._local: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._local_cache_size = local_cache_size
+        # fid -> expiry of families revoked by this process, answered without a lookup
+        self._revoked_families: "OrderedDict[str, float]" = OrderedDict()
+        self.metrics = RevocationMetrics()
+        # Identical concurrent lookups share one round trip
+        self._flights = SingleFlight()
+
+    @classmethod
+    def from_settings(cls, settings) -> "RevocationStore":
+        """Builds the store (and its replica/Sentinel/Cluster topology) from ZenithSettings."""
+        hedge = settings.REDIS_HEDGE_AFTER_MS
+        router = ReplicaRouter.from_urls(
+            settings.REDIS_URL,
+            replica_urls=settings.REDIS_REPLICA_URLS,
+            sentinels=settings.REDIS_SENTINELS,
+            sentinel_service=settings.REDIS_SENTINEL_SERVICE,
+            cluster=settings.REDIS_CLUSTER,
+            hedge_after=hedge / 1000 if hedge else None,
+        )
+        if settings.REDIS_SHARD_URLS:
+            shards = {
+                url: ReplicaRouter.from_urls(url, hedge_after=router.hedge_after)
+                for url in settings.REDIS_SHARD_URLS
+            }
+            return cls(settings.REDIS_URL, shards=shards)
+        return cls(settings.REDIS_URL, router=router)
+
+    def _shard(self, jti: str) -> ReplicaRouter:
+        if len(self.shards) == 1:
+            return self.router
+        return self.shards[self.ring.node_for(jti)]
 
-    async def is_revoked(self, jti: str) -> bool:
+    @staticmethod
+    async def _read(shard: ReplicaRouter, level: Consistency, fn):
+        """Strict reads go to the primary; weaker levels may use a (lagging) replica."""
+        if level.mode == Consistency.STRICT:
+            return await fn(shard.primary)
+        return await shard.read(fn)
+
+    async def is_revoked(self, jti: str, consistency: Optional[Consistency] = None) -> bool:
         """Check if the Token ID exists in the blacklist."""
-        return await self.client.exists(f"revoked:{jti}") > 0
+        level = Consistency.parse(consistency)
+        cached = self._cached(jti, level)
+        if cached is not None:
+            return cached != AuthStatus.OK
+
+        key = f"revoked:{jti}"
+        shard = self._shard(jti)
+        revoked = await self._flights.do(
+            (key, level.mode), lambda: self._read(shard, level, lambda c: c.exists(key))
+        ) > 0
+        self._remember(jti, AuthStatus.REVOKED if revoked else AuthStatus.OK)
+        return revoked
+
+    async def check(
+        self,
+        payload: Dict[str, Any],
+        consistency: Optional[Consistency] = None,
+        rate_limit: int = 0,
+        rate_window: int = 60,
+    ) -> int:
+        """
+        Full per-request check in one round trip: JTI and token-family
+        blacklist, user epoch and (optionally) a per-subject request counter.
+        Returns an AuthStatus.
+        """
+        level = Consistency.parse(consistency)
+        jti = payload["jti"]
+        fid = payload.get("fid")
+        if fid and level.mode != Consistency.STATELESS and self._family_revoked_locally(fid):
+            self.metrics.record(level.label, hit_store=False)
+            return AuthStatus.REVOKED
+        cached = self._cached(jti, level)
+        if cached is not None:
+            return cached
+
+        sub = payload.get("sub", "")
+
+        keys = (
+            f"revoked:{jti}",
+            f"user_epoch:{sub}",
+            f"ratelimit:{sub}",
+            f"revoked_family:{fid}" if fid else f"revoked:{jti}",
+        )
+        args = (payload.get("iat", 0), rate_limit, rate_window)
+
+        shard = self._shard(jti)
+
+        def run(client):
+            if shard.cluster:
+                return self._check_pipelined(client, keys, args)
+            return AUTH_CHECK_SCRIPT(client, keys=keys, args=args)
+
+        if rate_limit:
+            # Counting writes, so it runs on the primary and is never shared.
+            # With several shards the counter is kept per shard.
+            status = int(await run(shard.primary))
+        else:
+            status = int(await self._flights.do(
+                ("check", jti, level.mode), lambda: self._read(shard, level, run)
+            ))
+        # Rate limiting is transient; don't pin it in the local cache
+        if status != AuthStatus.RATE_LIMITED:
+            self._remember(jti, status)
+        return status
 
     async def revoke(self, jti: str, expires_at: int):
         """
-        Add JTI to blacklist. 
+        Add JTI to blacklist.
         The record expires automatically when the token would have expired.
         """
         now = datetime.now(timezone.utc).timestamp()
         ttl = int(expires_at - now)
         if ttl > 0:
-            await self.client.setex(f"revoked:{jti}", ttl, "true")
\ No newline at end of file
+            await self._shard(jti).primary.setex(f"revoked:{jti}", ttl, "true")
+            self._remember(jti, AuthStatus.REVOKED)
+
+    async def is_revoked_many(
+        self, jtis: Iterable[str], consistency: Optional[Consistency] = None
+    ) -> Dict[str, bool]:
+        """Batch lookup: one pipelined EXISTS round trip per shard, shards in parallel."""
+        level = Consistency.parse(consistency)
+        result: Dict[str, bool] = {}
+        missing: List[str] = []
+        for jti in jtis:
+            cached = self._cached(jti, level)
+            if cached is None:
+                missing.append(jti)
+            else:
+                result[jti] = cached != AuthStatus.OK
+
+        async def lookup(node: str, batch: List[str]):
+            async def run(client):
+                pipe = client.pipeline(transaction=False)
+                for jti in batch:
+                    pipe.exists(f"revoked:{jti}")
+                return await pipe.execute()
+            return batch, await self._read(self.shards[node], level, run)
+
+        groups = self.ring.group(missing)
+        for batch, found in await asyncio.gather(*(lookup(n, b) for n, b in groups.items())):
+            for jti, exists in zip(batch, found):
+                result[jti] = exists > 0
+                self._remember(jti, AuthStatus.REVOKED if exists else AuthStatus.OK)
+        return result
+
+    async def revoke_many(self, items: Iterable[Tuple[str, int]]):
+        """Batch revoke of (jti, expires_at) pairs; one pipeline per shard."""
+        now = datetime.now(timezone.utc).timestamp()
+        ttls = {jti: int(expires_at - now) for jti, expires_at in items}
+        ttls = {jti: ttl for jti, ttl in ttls.items() if ttl > 0}
+
+        async def write(node: str, batch: List[str]):
+            pipe = self.shards[node].primary.pipeline(transaction=False)
+            for jti in batch:
+                pipe.set(f"revoked:{jti}", "true", ex=ttls[jti])
+            await pipe.execute()
+
+        await asyncio.gather(*(write(n, b) for n, b in self.ring.group(ttls).items()))
+        for jti in ttls:
+            self._remember(jti, AuthStatus.REVOKED)
+
+    async def add_shard(
+        self, url: str, router: Optional[ReplicaRouter] = None, concurrency: int = 8
+    ) -> int:
+        """
+        Adds a node to the ring and copies over the records it now owns.
+        Keys are copied before the ring switches over, then a second pass
+        picks up anything written to the old owners during the copy. Source
+        keys are left to expire by TTL, so processes still on the old ring
+        keep seeing every revocation.
+
+        Rollout: call this from one process, restart the others with the new
+        REDIS_SHARD_URLS, then call `rebalance()` once. Until then, records
+        written by old-ring processes reach only the old shards.
+        Returns the number of revocation keys moved.
+        """
+        router = router or ReplicaRouter.from_urls(url)
+        new_ring = self.ring.copy()
+        new_ring.add(url)
+        shards = dict(self.shards)
+        shards[url] = router
+
+        await self._replicate({url: router}, concurrency)
+        copied: Set[str] = set()
+        moved = await self._rebalance(new_ring, shards, concurrency, copied)
+        self.shards, self.ring = shards, new_ring
+        await self._replicate({url: router}, concurrency)
+        moved += await self._rebalance(new_ring, shards, concurrency, copied)
+        return moved
+
+    async def rebalance(self, concurrency: int = 8) -> int:
+        """
+        Copies every record to where the current ring expects it: replicated
+        keys to every shard (newer epochs already there are kept) and JTI
+        keys to their owner. Run after all processes share the same ring.
+        Returns the number of revocation keys moved.
+        """
+        await self._replicate(self.shards, concurrency)
+        return await self._rebalance(self.ring, self.shards, concurrency, set())
+
+    async def _replicate(self, shards: Dict[str, ReplicaRouter], concurrency: int):
+        # User epochs and family revocations live on every shard; the first
+        # shard predates any added one, so it holds them all
+        for pattern in ("user_epoch:*", "role_epoch:*", "revoked_family:*"):
+            keys = await scan_keys(self.client, pattern)
+            for shard in shards.values():
+                if shard.primary is not self.client:
+                    await migrate_keys(self.client, shard.primary, keys, concurrency, merge=True)
+
+    async def _rebalance(
+        self,
+        ring: HashRing,
+        shards: Dict[str, ReplicaRouter],
+        concurrency: int,
+        copied: Set[str],
+    ) -> int:
+        moved = 0
+        # Keys routed by JTI; `moved` reports revocations only. Keys in
+        # `copied` never change once written, so they are not copied again.
+        for prefix in ("revoked:", "used_refresh:"):
+            keys_by_node = {
+                node: await scan_keys(shard.primary, f"{prefix}*")
+                for node, shard in shards.items()
+            }
+            for src, dst, keys in plan_moves(ring, keys_by_node, prefix):
+                keys = [key for key in keys if key not in copied]
+                count = await migrate_keys(shards[src].primary, shards[dst].primary, keys, concurrency)
+                copied.update(keys)
+                if prefix == "revoked:":
+                    moved += count
+        return moved
+
+    async def revoke_family(self, family_id: str, ttl: int):
+        """
+        Revokes every token of a login lineage with a single record.
+        `ttl` should cover the refresh token lifetime. Replicated to every
+        shard so the check stays a single node-local lookup.
+        """
+        await asyncio.gather(*(
+            shard.primary.set(f"revoked_family:{family_id}", "true", ex=ttl)
+            for shard in self.shards.values()
+        ))
+        self._revoked_families[family_id] = time.time() + ttl
+        while len(self._revoked_families) > self._local_cache_size:
+            self._revoked_families.popitem(last=False)
+
+    def _family_revoked_locally(self, family_id: str) -> bool:
+        expires = self._revoked_families.get(family_id)
+        return expires is not None and expires > time.time()
+
+    async def revoke_user(self, user_id: str, ttl: int):
+        """
+        Bumps the user's epoch: every token issued before the current second
+        is rejected. Epochs are whole seconds like `iat`, and `iat == epoch`
+        stays valid, so a login right after this call is accepted.
+        `ttl` should cover the longest token lifetime (the refresh token).
+        """
+        now = int(datetime.now(timezone.utc).timestamp())
+        # Replicated to every shard so the single-script check stays local
+        await asyncio.gather(*(
+            shard.primary.set(f"user_epoch:{user_id}", now, ex=ttl)
+            for shard in self.shards.values()
+        ))
+
+    async def revoke_roles(self, user_id: str, ttl: int):
+        """
+        Marks the user's roles as changed: refresh tokens carrying roles read
+        before the current second can no longer be rotated, forcing a fresh
+        login. Whole seconds like `rv`; `rv == epoch` stays valid.
+        """
+        now = int(datetime.now(timezone.utc).timestamp())
+        await asyncio.gather(*(
+            shard.primary.set(f"role_epoch:{user_id}", now, ex=ttl)
+            for shard in self.shards.values()
+        ))
+
+    async def consume_refresh(self, payload: Dict[str, Any]) -> RefreshState:
+        """
+        Marks a refresh token as used and reads everything needed to rotate
+        it, in one pipelined round trip on the primary:
+        SET used_refresh:<jti> NX, EXISTS on the JTI/family blacklist and the
+        user/role epochs.
+        """
+        jti, sub, fid = payload["jti"], payload.get("sub", ""), payload.get("fid")
+        ttl = max(int(payload["exp"] - datetime.now(timezone.utc).timestamp()), 1)
+        pipe = self._shard(jti).primary.pipeline(transaction=False)
+        pipe.set(f"used_refresh:{jti}", "1", nx=True, ex=ttl)
+        # Single-key EXISTS: a cluster pipeline splits multi-key commands by slot
+        pipe.exists(f"revoked:{jti}")
+        pipe.exists(f"revoked_family:{fid}" if fid else f"revoked:{jti}")
+        pipe.get(f"user_epoch:{sub}")
+        pipe.get(f"role_epoch:{sub}")
+        first_use, revoked, family_revoked, user_epoch, role_epoch = await pipe.execute()
+        return RefreshState(
+            reused=not first_use,
+            revoked=revoked + family_revoked > 0,
+            stale_epoch=user_epoch is not None and float(payload.get("iat", 0)) < float(user_epoch),
+            stale_roles=role_epoch is not None and float(payload.get("rv", 0)) < float(role_epoch),
+        )
+
+    @staticmethod
+    async def _check_pipelined(client, keys, args) -> int:
+        """
+        Cluster fallback for AUTH_CHECK_SCRIPT: the keys live in different
+        slots, so the same checks are issued as plain (non-atomic) commands.
+        """
+        revoked_key, epoch_key, rate_key, family_key = keys
+        iat, limit, window = args
+        pipe = client.pipeline(transaction=False)
+        # Single-key EXISTS: a cluster pipeline splits multi-key commands by slot
+        pipe.exists(revoked_key)
+        pipe.exists(family_key)
+        pipe.get(epoch_key)
+        revoked, family_revoked, epoch = await pipe.execute()
+        if revoked or family_revoked:
+            return AuthStatus.REVOKED
+        if epoch is not None and float(iat) < float(epoch):
+            return AuthStatus.STALE_EPOCH
+        if limit:
+            hits = await client.incr(rate_key)
+            if hits == 1:
+                await client.expire(rate_key, window)
+            if hits > limit:
+                return AuthStatus.RATE_LIMITED
+        return AuthStatus.OK
+
+    def _cached(self, jti: str, level: Consistency) -> Optional[int]:
+        """Returns a local answer if the consistency level allows one, else None."""
+        if level.mode == Consistency.STATELESS:
+            self.metrics.record(level.label, hit_store=False)
+            return AuthStatus.OK
+
+        if level.mode == Consistency.BOUNDED:
+            cached = self._local.get(jti)
+            # A revocation never un-happens, so a cached rejection is always fresh
+            if cached is not None and (
+                cached[0] != AuthStatus.OK
+                or time.monotonic() - cached[1] <= level.max_staleness
+            ):
+                self.metrics.record(level.label, hit_store=False)
+                return cached[0]
+
+        self.metrics.record(level.label, hit_store=True)
+        return None
+
+    def _remember(self, jti: str, status: int):
+        self._local[jti] = (status, time.monotonic())
+        self._local.move_to_end(jti)
+        while len(self._local) > self._local_cache_size:
+            self._local.popitem(last=False)
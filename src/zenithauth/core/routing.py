@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+import redis.asyncio as redis
+from zenithauth.core.logger import logger
+
+T = TypeVar("T")
+
+class ReplicaNode:
+    """A read replica plus an EWMA of its observed latency (seconds)."""
+    def __init__(self, client: Any, name: str, alpha: float = 0.2):
+        self.client = client
+        self.name = name
+        self.alpha = alpha
+        self.ewma = 0.0
+        self.samples = 0
+
+    def observe(self, elapsed: float):
+        if self.samples == 0:
+            self.ewma = elapsed
+        else:
+            self.ewma = self.alpha * elapsed + (1 - self.alpha) * self.ewma
+        self.samples += 1
+
+class ReplicaRouter:
+    """
+    Routes reads to the fastest replica (lowest latency EWMA) and writes to
+    the primary. With `hedge_after` set, a read still pending after that many
+    seconds is re-sent to the next-best replica and the first answer wins.
+    A failing replica is penalised and the read falls back to the primary.
+    """
+    ERROR_PENALTY = 1.0
+
+    def __init__(
+        self,
+        primary: Any,
+        replicas: Optional[List[Any]] = None,
+        hedge_after: Optional[float] = None,
+        alpha: float = 0.2,
+    ):
+        self.primary = primary
+        self.replicas = [
+            ReplicaNode(client, name=f"replica-{i}", alpha=alpha)
+            for i, client in enumerate(replicas or [])
+        ]
+        self.hedge_after = hedge_after
+        # Multi-key scripts can't span cluster slots; callers check this flag
+        self.cluster = False
+        self.hedged = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_urls(
+        cls,
+        primary_url: str,
+        replica_urls: Optional[List[str]] = None,
+        sentinels: Optional[List[str]] = None,
+        sentinel_service: str = "mymaster",
+        cluster: bool = False,
+        hedge_after: Optional[float] = None,
+    ) -> "ReplicaRouter":
+        """
+        Builds the topology:
+        - cluster: one RedisCluster client, which routes reads to replicas itself.
+        - sentinels ("host:port"): primary and replica clients discovered via Sentinel.
+        - otherwise: primary_url plus explicit replica_urls.
+        """
+        if cluster:
+            from redis.asyncio.cluster import RedisCluster
+            client = RedisCluster.from_url(
+                primary_url, decode_responses=True, read_from_replicas=True
+            )
+            router = cls(client, hedge_after=hedge_after)
+            router.cluster = True
+            return router
+
+        if sentinels:
+            from redis.asyncio.sentinel import Sentinel
+            hosts = [(h.rsplit(":", 1)[0], int(h.rsplit(":", 1)[1])) for h in sentinels]
+            sentinel = Sentinel(hosts, decode_responses=True)
+            return cls(
+                sentinel.master_for(sentinel_service),
+                [sentinel.slave_for(sentinel_service)],
+                hedge_after=hedge_after,
+            )
+
+        return cls(
+            redis.from_url(primary_url, decode_responses=True),
+            [redis.from_url(url, decode_responses=True) for url in replica_urls or []],
+            hedge_after=hedge_after,
+        )
+
+    def ranked(self) -> List[ReplicaNode]:
+        """Replicas ordered by EWMA; unsampled replicas go first so they get measured."""
+        return sorted(self.replicas, key=lambda n: (n.samples > 0, n.ewma))
+
+    async def read(self, fn: Callable[[Any], Awaitable[T]]) -> T:
+        nodes = self.ranked()
+        if not nodes:
+            return await fn(self.primary)
+        try:
+            if self.hedge_after is None or len(nodes) < 2:
+                return await self._timed(nodes[0], fn)
+            return await self._hedged(nodes[0], nodes[1], fn)
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Replica read failed, falling back to primary: {e}")
+            self.fallbacks += 1
+            return await fn(self.primary)
+
+    async def _hedged(self, first: ReplicaNode, second: ReplicaNode, fn) -> Any:
+        first_try = asyncio.ensure_future(self._timed(first, fn))
+        done, _ = await asyncio.wait({first_try}, timeout=self.hedge_after)
+        if done:
+            return first_try.result()
+
+        self.hedged += 1
+        hedge = asyncio.ensure_future(self._timed(second, fn))
+        pending = {first_try, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed(self, node: ReplicaNode, fn) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await fn(node.client)
+        except asyncio.CancelledError:
+            # The losing side of a hedge was at least this slow
+            node.observe(time.perf_counter() - started)
+            raise
+        except Exception:
+            node.observe(self.ERROR_PENALTY)
+            raise
+        node.observe(time.perf_counter() - started)
+        return result
@@ -0,0 +1,53 @@
+import hashlib
+from typing import Any, Sequence
+from redis.exceptions import NoScriptError
+
+class RedisScript:
+    """
+    A Lua script registered once per server (SCRIPT LOAD) and invoked via EVALSHA.
+    The SHA is computed locally, so a server that already knows the script
+    never sees the source again; a NOSCRIPT reply triggers one re-load.
+    """
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    async def __call__(self, client, keys: Sequence[str] = (), args: Sequence[Any] = ()):
+        try:
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await client.script_load(self.source)
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+
+class AuthStatus:
+    """Compact status codes returned by AUTH_CHECK_SCRIPT."""
+    OK = 0
+    REVOKED = 1
+    STALE_EPOCH = 2
+    RATE_LIMITED = 3
+
+# KEYS[1] revoked:<jti>
+# KEYS[2] user_epoch:<sub>
+# KEYS[3] ratelimit:<sub>        (only read when ARGV[2] > 0)
+# KEYS[4] revoked_family:<fid>   (repeat KEYS[1] for tokens without a family)
+# ARGV[1] token iat, ARGV[2] request limit (0 = off), ARGV[3] window in seconds
+AUTH_CHECK_SCRIPT = RedisScript("""
+if redis.call('EXISTS', KEYS[1], KEYS[4]) > 0 then
+    return 1
+end
+local epoch = redis.call('GET', KEYS[2])
+if epoch and tonumber(ARGV[1]) < tonumber(epoch) then
+    return 2
+end
+local limit = tonumber(ARGV[2])
+if limit > 0 then
+    local hits = redis.call('INCR', KEYS[3])
+    if hits == 1 then
+        redis.call('EXPIRE', KEYS[3], ARGV[3])
+    end
+    if hits > limit then
+        return 3
+    end
+end
+return 0
+""")
@@ -1,14 +1,28 @@
+import secrets
 from typing import Optional
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
 from zenithauth.core.exceptions import InvalidCredentialsError
+from zenithauth.core.hashers import HashRegistry, UnknownHashFormatError
 from zenithauth.core.policy import PasswordPolicy # Import Policy
 
 class SecurityHandler:
-    def __init__(self, policy: Optional[PasswordPolicy] = None):
-        self.ph = PasswordHasher()
+    def __init__(
+        self,
+        policy: Optional[PasswordPolicy] = None,
+        time_cost: int = 3,
+        memory_cost: int = 65536,
+        parallelism: int = 4,
+    ):
+        # memory_cost is in KiB (argon2-cffi convention)
+        self.ph = PasswordHasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+        # Verifies argon2, bcrypt, pbkdf2_sha256 and scrypt hashes by prefix
+        self.hashers = HashRegistry(self.ph)
         # Default to a 12-character policy if none provided
         self.policy = policy or PasswordPolicy(min_length=12)
+        self._dummy_hash: Optional[str] = None
 
     def hash_password(self, password: str) -> str:
         """Validates policy THEN hashes."""
@@ -17,6 +31,36 @@ class SecurityHandler:
 
     def verify_password(self, hashed: str, plain: str) -> bool:
         try:
-            return self.ph.verify(hashed, plain)
+            valid = self.hashers.verify(hashed, plain)
+        except UnknownHashFormatError:
+            valid = False
+        if not valid:
+            raise InvalidCredentialsError("Invalid password.")
+        return True
+
+    def dummy_verify(self, plain: str) -> bool:
+        """
+        Does the work of a real verification against a throwaway hash and
+        returns False. Used for unknown accounts so timing does not reveal
+        whether an account exists.
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = self.ph.hash(secrets.token_urlsafe(16))
+        try:
+            self.ph.verify(self._dummy_hash, plain)
         except VerifyMismatchError:
-            raise InvalidCredentialsError("Invalid password.")
\ No newline at end of file
+            pass
+        return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True for legacy formats and for Argon2 hashes with outdated parameters."""
+        if self.hashers.is_legacy(hashed):
+            return True
+        try:
+            return self.ph.check_needs_rehash(hashed)
+        except InvalidHashError:
+            return True
+
+    def rehash(self, password: str) -> str:
+        """Hashes an already-verified password with current parameters (no policy check)."""
+        return self.ph.hash(password)
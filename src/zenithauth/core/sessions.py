@@ -0,0 +1,94 @@
+import time
+from typing import Dict, List, Tuple
+
+from zenithauth.core.scripts import RedisScript
+
+# KEYS[1] sessions:<sub>
+# ARGV[1] now, ARGV[2] session id, ARGV[3] session expiry, ARGV[4] limit (0 = none)
+# Trims expired sessions, adds the new one and pops the oldest past the limit.
+# Returns the evicted session IDs.
+SESSION_REGISTER_SCRIPT = RedisScript("""
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[2])
+local evicted = {}
+local limit = tonumber(ARGV[4])
+if limit > 0 then
+    local excess = redis.call('ZCARD', KEYS[1]) - limit
+    if excess > 0 then
+        local popped = redis.call('ZPOPMIN', KEYS[1], excess)
+        for i = 1, #popped, 2 do
+            evicted[#evicted + 1] = popped[i]
+        end
+    end
+end
+local newest = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+redis.call('EXPIREAT', KEYS[1], math.ceil(tonumber(newest[2])))
+return evicted
+""")
+
+class SessionRegistry:
+    """
+    Active sessions per user: one sorted set `sessions:<sub>` whose members
+    are session (token family) IDs scored by expiry. Expired members are
+    trimmed lazily whenever the set is written or listed.
+    """
+    PREFIX = "sessions:"
+
+    def __init__(self, client, max_sessions: int = 0):
+        self.client = client
+        self.max_sessions = max_sessions
+
+    async def register(self, user_id: str, session_id: str, expires_at: float) -> List[str]:
+        """Adds a session atomically, enforcing the limit. Returns evicted session IDs."""
+        evicted = await SESSION_REGISTER_SCRIPT(
+            self.client,
+            keys=(f"{self.PREFIX}{user_id}",),
+            args=(time.time(), session_id, expires_at, self.max_sessions),
+        )
+        return list(evicted or [])
+
+    async def touch(self, user_id: str, session_id: str, expires_at: float):
+        """Extends a live session (e.g. after refresh rotation); no-op if it was evicted."""
+        key = f"{self.PREFIX}{user_id}"
+        pipe = self.client.pipeline(transaction=False)
+        # A refreshed session always has the latest expiry, so it bounds the key's TTL
+        pipe.zadd(key, {session_id: expires_at}, xx=True)
+        pipe.expireat(key, int(expires_at) + 1)
+        await pipe.execute()
+
+    async def remove(self, user_id: str, session_id: str):
+        await self.client.zrem(f"{self.PREFIX}{user_id}", session_id)
+
+    async def clear(self, user_id: str):
+        await self.client.delete(f"{self.PREFIX}{user_id}")
+
+    async def list_sessions(self, user_id: str) -> List[Dict[str, float]]:
+        """Live sessions of one user, oldest first."""
+        key = f"{self.PREFIX}{user_id}"
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.zrange(key, 0, -1, withscores=True)
+        _, members = await pipe.execute()
+        return [{"session_id": sid, "expires_at": score} for sid, score in members]
+
+    async def scan_sessions(
+        self, cursor: int = 0, count: int = 100
+    ) -> Tuple[int, Dict[str, List[Dict[str, float]]]]:
+        """
+        One page of the admin-wide listing. Uses cursor-based SCAN, so it
+        never blocks Redis; call again with the returned cursor until it is 0.
+        """
+        cursor, keys = await self.client.scan(cursor=cursor, match=f"{self.PREFIX}*", count=count)
+        if not keys:
+            return cursor, {}
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.zrangebyscore(key, now, "+inf", withscores=True)
+        pages = await pipe.execute()
+        return cursor, {
+            key[len(self.PREFIX):]: [{"session_id": sid, "expires_at": score} for sid, score in members]
+            for key, members in zip(keys, pages)
+            if members
+        }
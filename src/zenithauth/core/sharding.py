@@ -0,0 +1,132 @@
+import asyncio
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Tuple
+
+from zenithauth.core.scripts import RedisScript
+
+# KEYS[1] the key, ARGV[1] value, ARGV[2] remaining PTTL (<= 0: none)
+# Writes unless the target already holds a value at least as new: numeric
+# values (epochs) keep the larger one, anything else keeps the target's.
+MERGE_SCRIPT = RedisScript("""
+local current = redis.call('GET', KEYS[1])
+if current then
+    local new, old = tonumber(ARGV[1]), tonumber(current)
+    if not new or not old or old >= new then
+        return 0
+    end
+end
+if tonumber(ARGV[2]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+return 1
+""")
+
+class HashRing:
+    """
+    Consistent-hash ring with virtual nodes.
+    Adding a node only moves ~1/N of the keys, and vnodes keep the spread even.
+    """
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 160):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self.nodes: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+    def add(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for i in range(self.vnodes):
+            point = self._hash(f"{node}#{i}")
+            idx = bisect.bisect(self._points, point)
+            self._points.insert(idx, point)
+            self._owners.insert(idx, node)
+
+    def copy(self) -> "HashRing":
+        ring = HashRing(vnodes=self.vnodes)
+        ring._points = list(self._points)
+        ring._owners = list(self._owners)
+        ring.nodes = list(self.nodes)
+        return ring
+
+    def node_for(self, key: str) -> str:
+        if not self._points:
+            raise LookupError("HashRing has no nodes.")
+        idx = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[idx]
+
+    def group(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Buckets keys by owning node (used to build one pipeline per node)."""
+        groups: Dict[str, List[str]] = {}
+        for key in keys:
+            groups.setdefault(self.node_for(key), []).append(key)
+        return groups
+
+async def migrate_keys(
+    source,
+    target,
+    keys: List[str],
+    concurrency: int = 8,
+    batch_size: int = 100,
+    merge: bool = False,
+) -> int:
+    """
+    Copies keys (value + remaining TTL) from source to target in pipelined
+    batches, with at most `concurrency` batches in flight. Returns keys copied.
+    merge=True never replaces a newer value already on the target (see
+    MERGE_SCRIPT), so keys that are still being written can be re-copied.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    if merge and keys:
+        await target.script_load(MERGE_SCRIPT.source)
+
+    async def move(batch: List[str]) -> int:
+        async with semaphore:
+            read = source.pipeline(transaction=False)
+            for key in batch:
+                read.get(key)
+                read.pttl(key)
+            values = await read.execute()
+
+            write = target.pipeline(transaction=False)
+            copied = 0
+            for key, value, pttl in zip(batch, values[::2], values[1::2]):
+                if value is None or pttl == -2:
+                    continue  # expired while we were scanning
+                if merge:
+                    write.evalsha(MERGE_SCRIPT.sha, 1, key, value, pttl)
+                elif pttl > 0:
+                    write.set(key, value, px=pttl)
+                else:
+                    write.set(key, value)
+                copied += 1
+            results = await write.execute()
+            return sum(results) if merge else copied
+
+    batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+    return sum(await asyncio.gather(*(move(b) for b in batches)))
+
+async def scan_keys(client, pattern: str, count: int = 1000) -> List[str]:
+    """Collects keys with cursor-based SCAN so Redis is never blocked."""
+    return [key async for key in client.scan_iter(match=pattern, count=count)]
+
+def plan_moves(
+    ring: HashRing, keys_by_node: Dict[str, List[str]], prefix: str
+) -> List[Tuple[str, str, List[str]]]:
+    """Lists (from_node, to_node, keys) for keys that `ring` assigns to another node."""
+    moves: Dict[Tuple[str, str], List[str]] = {}
+    for node, keys in keys_by_node.items():
+        for key in keys:
+            owner = ring.node_for(key[len(prefix):])
+            if owner != node:
+                moves.setdefault((node, owner), []).append(key)
+    return [(src, dst, keys) for (src, dst), keys in moves.items()]
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Deduplicates concurrent awaitables per key.
+    The first caller starts the work; callers arriving while it is in flight
+    await the same result (or exception). The work runs in its own task, so
+    one waiter being cancelled does not cancel it for the others; it is only
+    cancelled once every waiter has gone away.
+    """
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.started += 1
+        else:
+            self.shared += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every interested caller was cancelled; stop the shared work
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
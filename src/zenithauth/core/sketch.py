@@ -0,0 +1,97 @@
+import hashlib
+import os
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+class HeavyHitterSketch:
+    """
+    Sliding-window Count-Min sketch with a top-K of the heaviest keys.
+
+    Counts live in `windows` slots of `window_seconds` each. When a slot
+    ages out it is zeroed and subtracted from a running per-row total, so
+    an estimate is one lookup per row. Every row is incremented (no
+    conservative update): with per-slot expiry, skipping rows could let a
+    key's count age out of a slot it never reached, undercounting it.
+    Memory is fixed at (windows + 1) * depth * width counters, however many
+    distinct keys arrive.
+    """
+    def __init__(
+        self,
+        width: int = 2048,
+        depth: int = 4,
+        k: int = 50,
+        window_seconds: float = 60.0,
+        windows: int = 5,
+    ):
+        self.width = width
+        self.depth = depth
+        self.k = k
+        self.window_seconds = window_seconds
+        self.windows = windows
+        # Keyed hash: clients cannot pick keys that collide on purpose
+        self._salt = os.urandom(16)
+        self._slots = [[array("I", bytes(4 * width)) for _ in range(depth)] for _ in range(windows)]
+        self._totals = [array("I", bytes(4 * width)) for _ in range(depth)]
+        self._epoch: Optional[int] = None
+        self._top: Dict[str, int] = {}
+        self._floor = 0
+
+    def _indexes(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=8, key=self._salt).digest()
+        h1 = int.from_bytes(digest[:4], "little")
+        h2 = int.from_bytes(digest[4:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def _advance(self, now: float):
+        epoch = int(now // self.window_seconds)
+        if self._epoch is None:
+            self._epoch = epoch
+            return
+        if epoch <= self._epoch:
+            return
+        for e in range(self._epoch + 1, min(epoch, self._epoch + self.windows) + 1):
+            slot = self._slots[e % self.windows]
+            for row, total in zip(slot, self._totals):
+                for i, count in enumerate(row):
+                    if count:
+                        total[i] -= count
+                        row[i] = 0
+        self._epoch = epoch
+        # Refresh the top-K against the decayed counts
+        self._top = {key: est for key in self._top if (est := self.estimate(key)) > 0}
+        self._floor = min(self._top.values(), default=0)
+
+    def add(self, key: str, count: int = 1, now: Optional[float] = None) -> int:
+        """Counts `key` and returns its new windowed estimate."""
+        self._advance(now if now is not None else time.time())
+        slot = self._slots[self._epoch % self.windows]
+        estimate = None
+        for row, total, i in zip(slot, self._totals, self._indexes(key)):
+            row[i] += count
+            total[i] += count
+            estimate = total[i] if estimate is None else min(estimate, total[i])
+        self._track(key, estimate)
+        return estimate
+
+    def _track(self, key: str, estimate: int):
+        top = self._top
+        if key in top or len(top) < self.k:
+            top[key] = estimate
+        elif estimate > self._floor:
+            del top[min(top, key=top.__getitem__)]
+            top[key] = estimate
+        else:
+            return
+        if len(top) >= self.k:
+            self._floor = min(top.values())
+
+    def estimate(self, key: str) -> int:
+        """Upper-bound count of `key` over the window (never an undercount)."""
+        return min(total[i] for total, i in zip(self._totals, self._indexes(key)))
+
+    def top(self, n: Optional[int] = None, now: Optional[float] = None) -> List[Tuple[str, int]]:
+        """The heaviest keys in the window, largest first."""
+        self._advance(now if now is not None else time.time())
+        ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:n] if n is not None else ranked
@@ -0,0 +1,393 @@
+"""
+zxcvbn-style password strength estimation.
+
+Finds guessable patterns (common words, keyboard walks, sequences, repeats,
+dates) in one left-to-right pass, then picks the cheapest way to cover the
+password with them: guesses = product of pattern guesses, where uncovered
+characters cost 10 each. The score follows zxcvbn: 0 (< 1e3 guesses) to
+4 (>= 1e10).
+
+Words come from a prebuilt lexicon, `data/lexicon.idx`: about 94k ranked
+entries merged from zxcvbn's frequency lists (leaked passwords, English
+Wikipedia, US TV and film, first names, surnames). The file is laid out as:
+- A header (`<8sII`): magic, version, word count.
+- count + 1 little-endian uint32 offsets into the word blob.
+- count uint32 ranks (a word keeps its best rank across lists).
+- The words, sorted bytewise and concatenated.
+
+Matching is exact up to case, reversal and l33t substitutions, as in
+zxcvbn: a misspelled word ("Tr0ub4dor" for "troubadour") is not found.
+
+It is mmapped on first use and searched in place: each password character
+narrows a sorted range of words sharing the prefix, so nothing is parsed
+at startup and worker processes share the page cache. Rebuild it with:
+
+    python -m zenithauth.core.strength lexicon.idx passwords.txt english.txt names.txt
+"""
+import argparse
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from zenithauth.core.exceptions import ZenithAuthError
+from zenithauth.core.policy import WeakPasswordError
+
+BRUTEFORCE_LOG10 = 1.0  # 10 guesses per uncovered character
+MIN_MATCH_GUESSES = 50
+SCORE_THRESHOLDS = (3, 6, 8, 10)  # log10(guesses) for scores 1..4
+
+L33T = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "3": "e", "6": "g", "1": "il",
+    "!": "i", "|": "il", "0": "o", "$": "s", "5": "s", "+": "t", "7": "t",
+    "2": "z", "%": "x",
+}
+KEYBOARD_ROWS = ("`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./")
+SHIFTED = dict(zip('~!@#$%^&*()_+{}|:"<>?', "`1234567890-=[]\\;',./"))
+KEYBOARD_STARTS = 94
+KEYBOARD_DEGREE = 4.6
+DATE_SEPARATED = re.compile(r"(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})")
+
+Match = Tuple[int, int, str, float]  # start, end (exclusive), pattern, log10 guesses
+
+MAGIC = b"ZALEXICN"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+
+def _uint32s(view: memoryview) -> memoryview:
+    if sys.byteorder == "little":
+        return view.cast("I")
+    values = array("I", view.tobytes())
+    values.byteswap()
+    return memoryview(values)
+
+class Lexicon:
+    """Read-only view of a lexicon file (see the module docstring)."""
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            raise ZenithAuthError(f"Not a lexicon file: {path}")
+        view = memoryview(self._mm)
+        ranks = HEADER.size + 4 * (self.count + 1)
+        blob = ranks + 4 * self.count
+        self._offsets = _uint32s(view[HEADER.size:ranks])
+        self._ranks = _uint32s(view[ranks:blob])
+        self._blob = view[blob:]
+
+    def narrow(self, lo: int, hi: int, depth: int, ch: str) -> Optional[Tuple[int, int]]:
+        """
+        Given words [lo, hi) sharing a `depth`-character prefix, the sub-range
+        whose next character is `ch` (None if empty).
+        """
+        code = ord(ch)
+        if code > 127:
+            return None
+        offsets, blob = self._offsets, self._blob
+
+        def char_at(i: int) -> int:
+            pos = offsets[i] + depth
+            return blob[pos] if pos < offsets[i + 1] else -1
+
+        a, b = lo, hi
+        while a < b:
+            mid = (a + b) // 2
+            if char_at(mid) < code:
+                a = mid + 1
+            else:
+                b = mid
+        start, b = a, hi
+        while a < b:
+            mid = (a + b) // 2
+            if char_at(mid) <= code:
+                a = mid + 1
+            else:
+                b = mid
+        return (start, a) if start < a else None
+
+    def rank(self, lo: int, length: int) -> Optional[int]:
+        """Rank of the prefix itself, if it is a word: it sorts first in its range."""
+        if self._offsets[lo + 1] - self._offsets[lo] == length:
+            return self._ranks[lo]
+        return None
+
+def build_lexicon(lists: Iterable[Iterable[str]], path: str) -> int:
+    """
+    Writes a lexicon from frequency lists, each most common first. Words
+    are lowercased; a word in several lists keeps its best rank. Returns
+    the word count.
+    """
+    ranks: Dict[str, int] = {}
+    for words in lists:
+        for rank, word in enumerate(words, start=1):
+            word = word.strip().lower()
+            if word.isascii() and word and rank < ranks.get(word, rank + 1):
+                ranks[word] = rank
+    words = sorted(ranks)
+    offsets = array("I", [0])
+    for word in words:
+        offsets.append(offsets[-1] + len(word))
+    ordered = array("I", (ranks[word] for word in words))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        ordered.byteswap()
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(words)))
+        f.write(offsets.tobytes())
+        f.write(ordered.tobytes())
+        f.write("".join(words).encode("ascii"))
+    os.replace(tmp, path)
+    return len(words)
+
+_lexicon: Optional[Lexicon] = None
+_keyboard: Optional[Dict[str, Tuple[int, int]]] = None
+
+def _load_lexicon() -> Lexicon:
+    global _lexicon
+    if _lexicon is None:
+        from importlib import resources
+        _lexicon = Lexicon(str(resources.files("zenithauth").joinpath("data/lexicon.idx")))
+    return _lexicon
+
+def _load_keyboard() -> Dict[str, Tuple[int, int]]:
+    global _keyboard
+    if _keyboard is None:
+        _keyboard = {ch: (r, c) for r, row in enumerate(KEYBOARD_ROWS) for c, ch in enumerate(row)}
+    return _keyboard
+
+def _key_step(a: str, b: str, keys: Dict[str, Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+    """Direction from key a to an adjacent key b on a staggered QWERTY layout."""
+    pa, pb = keys.get(SHIFTED.get(a, a.lower())), keys.get(SHIFTED.get(b, b.lower()))
+    if pa is None or pb is None or pa == pb:
+        return None
+    step = (pb[0] - pa[0], pb[1] - pa[1])
+    return step if step in ((0, -1), (0, 1), (-1, 0), (-1, 1), (1, -1), (1, 0)) else None
+
+def _uppercase_log10(word: str) -> float:
+    upper = sum(1 for ch in word if ch.isupper())
+    if upper == 0:
+        return 0.0
+    lower = sum(1 for ch in word if ch.islower())
+    if lower == 0 or (upper == 1 and (word[0].isupper() or word[-1].isupper())):
+        return math.log10(2)
+    return math.log10(sum(math.comb(upper + lower, i) for i in range(1, min(upper, lower) + 1)))
+
+def _char_space(ch: str) -> int:
+    if ch.isdigit():
+        return 10
+    if ch.isalpha():
+        return 26
+    return 33
+
+def _dictionary_matches(
+    password: str, start: int, lexicon: Lexicon, out: List[Match], reversed_: bool
+):
+    """Prefix walk from `start`, following l33t alternatives for each character."""
+    frontier = [(0, lexicon.count, 0)]  # (word range lo, hi, substitutions so far)
+    n = len(password)
+    for end in range(start, n):
+        ch = password[end]
+        depth = end - start
+        nxt = []
+        for lo, hi, subs in frontier:
+            child = lexicon.narrow(lo, hi, depth, ch.lower())
+            if child is not None:
+                nxt.append((*child, subs))
+            for letter in L33T.get(ch, ""):
+                child = lexicon.narrow(lo, hi, depth, letter)
+                if child is not None:
+                    nxt.append((*child, subs + 1))
+        if not nxt:
+            return
+        frontier = nxt
+        if depth < 2:
+            continue
+        for lo, _, subs in frontier:
+            rank = lexicon.rank(lo, depth + 1)
+            if rank is not None:
+                word = password[start:end + 1]
+                log_guesses = math.log10(rank) + _uppercase_log10(word) + subs * math.log10(2)
+                if reversed_:
+                    out.append((n - end - 1, n - start, "dictionary", log_guesses + math.log10(2)))
+                else:
+                    out.append((start, end + 1, "dictionary", log_guesses))
+
+def _date_log10(year: int, separated: bool) -> Optional[float]:
+    if not 1900 <= year <= 2099:
+        return None
+    space = max(abs(year - datetime.now().year), 20)
+    return math.log10(space * 365 * (4 if separated else 1))
+
+def _digit_run_dates(password: str, start: int, end: int, out: List[Match]):
+    digits = password[start:end]
+    if len(digits) == 4:
+        year = int(digits)
+        if 1900 <= year <= 2099:
+            out.append((start, end, "date", math.log10(max(abs(year - datetime.now().year), 20))))
+    if 6 <= len(digits) <= 8:
+        # ddmmyy(yy) / mmddyy(yy) / yyyymmdd
+        candidates = [digits[-4:], digits[:4]] if len(digits) == 8 else ["19" + digits[-2:], "20" + digits[-2:]]
+        for year in candidates:
+            log_guesses = _date_log10(int(year), False)
+            if log_guesses is not None:
+                out.append((start, end, "date", log_guesses))
+                return
+
+def _same_class(a: str, b: str) -> bool:
+    return (a.isdigit() and b.isdigit()) or (a.islower() and b.islower()) or (a.isupper() and b.isupper())
+
+def _sequence_log10(password: str, start: int, end: int, delta: int) -> float:
+    first = password[start]
+    base = 4 if first in "aAzZ019" else (10 if first.isdigit() else 26)
+    return math.log10(base * (end - start) * (2 if delta < 0 else 1))
+
+def _separated_year(match) -> int:
+    first, last = match.group(1), match.group(4)
+    if len(first) == 4:
+        return int(first)
+    if len(last) == 4:
+        return int(last)
+    yy = int(last)
+    return 2000 + yy if yy < 50 else 1900 + yy
+
+def find_matches(password: str) -> List[Match]:
+    """All pattern matches, collected in a single left-to-right scan."""
+    if not password:
+        return []
+    lexicon, keys = _load_lexicon(), _load_keyboard()
+    reversed_password = password[::-1]
+    n = len(password)
+    matches: List[Match] = []
+
+    repeat_start = digit_start = 0
+    seq_start, seq_delta = 0, 0
+    key_start, key_dir, key_turns = -1, None, 0
+    for i in range(n + 1):
+        if i < n:
+            _dictionary_matches(password, i, lexicon, matches, False)
+            _dictionary_matches(reversed_password, i, lexicon, matches, True)
+            if i == 0:
+                continue
+        ch = password[i] if i < n else ""
+        prev = password[i - 1]
+
+        # Repeats: "aaaa"
+        if ch != prev:
+            if i - repeat_start >= 3:
+                matches.append((repeat_start, i, "repeat", math.log10(_char_space(prev) * (i - repeat_start))))
+            repeat_start = i
+
+        # Sequences: "abcd", "9753" (same character class, constant step up to 5)
+        delta = ord(ch) - ord(prev) if ch and _same_class(ch, prev) else 0
+        if not (delta and abs(delta) <= 5):
+            delta = 0
+        if not delta or delta != seq_delta:
+            if seq_delta and i - seq_start >= 3:
+                matches.append((seq_start, i, "sequence", _sequence_log10(password, seq_start, i, seq_delta)))
+            seq_start, seq_delta = (i - 1, delta) if delta else (i, 0)
+
+        # Keyboard walks: "qwerty", "zxcvbn", "1qaz2wsx"
+        step = _key_step(prev, ch, keys) if ch else None
+        if step is not None:
+            if key_start < 0:
+                key_start, key_dir, key_turns = i - 1, step, 1
+            elif step != key_dir:
+                key_dir, key_turns = step, key_turns + 1
+        elif key_start >= 0:
+            if i - key_start >= 3:
+                matches.append((key_start, i, "keyboard", _keyboard_log10(i - key_start, key_turns)))
+            key_start = -1
+
+        # Digit runs that read as years or dates
+        if not ch.isdigit():
+            if i - digit_start >= 4:
+                _digit_run_dates(password, digit_start, i, matches)
+            digit_start = i + 1
+        elif not prev.isdigit():
+            digit_start = i
+
+    for m in DATE_SEPARATED.finditer(password):
+        log_guesses = _date_log10(_separated_year(m), True)
+        if log_guesses is not None:
+            matches.append((m.start(), m.end(), "date", log_guesses))
+    return matches
+
+def _keyboard_log10(length: int, turns: int) -> float:
+    guesses = 0.0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, j - 1) * KEYBOARD_STARTS * KEYBOARD_DEGREE ** j
+    return math.log10(max(guesses, 1))
+
+class StrengthResult:
+    def __init__(self, score: int, guesses_log10: float, sequence: List[Match]):
+        self.score = score
+        self.guesses_log10 = guesses_log10
+        # The matches that make up the cheapest cover, in order
+        self.sequence = sequence
+
+def estimate(password: str) -> StrengthResult:
+    n = len(password)
+    ending: Dict[int, List[Match]] = {}
+    for match in find_matches(password):
+        ending.setdefault(match[1], []).append(match)
+
+    # best[j]: fewest log10 guesses to produce password[:j]
+    best = [0.0] * (n + 1)
+    choice: List[Optional[Match]] = [None] * (n + 1)
+    min_match = math.log10(MIN_MATCH_GUESSES)
+    for j in range(1, n + 1):
+        best[j] = best[j - 1] + BRUTEFORCE_LOG10
+        for match in ending.get(j, ()):
+            cost = best[match[0]] + max(match[3], min_match)
+            if cost < best[j]:
+                best[j], choice[j] = cost, match
+
+    sequence: List[Match] = []
+    j = n
+    while j > 0:
+        if choice[j] is None:
+            j -= 1
+        else:
+            sequence.append(choice[j])
+            j = choice[j][0]
+    score = sum(1 for threshold in SCORE_THRESHOLDS if best[n] >= threshold)
+    return StrengthResult(score, best[n], sequence[::-1])
+
+class StrengthRule:
+    """PasswordPolicy rule: rejects passwords scoring below `min_score` (0-4)."""
+    def __init__(self, min_score: int):
+        self.min_score = min_score
+
+    def check(self, password: str) -> None:
+        result = estimate(password)
+        if result.score < self.min_score:
+            patterns = sorted({m[2] for m in result.sequence})
+            hint = f" It contains a guessable {', '.join(patterns)} pattern." if patterns else ""
+            raise WeakPasswordError(
+                f"Password is too easy to guess (strength {result.score}/4, "
+                f"minimum {self.min_score}).{hint}"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the strength estimator's lexicon.")
+    parser.add_argument("output")
+    parser.add_argument("lists", nargs="+", help="word lists, one word per line, most common first")
+    args = parser.parse_args()
+
+    lists = []
+    for path in args.lists:
+        with open(path, encoding="utf-8") as f:
+            lists.append(f.read().split())
+    count = build_lexicon(lists, args.output)
+    print(f"{count} words written to {args.output}")
+
+if __name__ == "__main__":
+    main()
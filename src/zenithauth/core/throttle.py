@@ -0,0 +1,261 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from zenithauth.core.background import PeriodicFlusher
+from zenithauth.core.exceptions import LoginThrottledError
+from zenithauth.core.scripts import RedisScript
+from zenithauth.core.sketch import HeavyHitterSketch
+
+BLOCKLIST_PREFIX = "blocklist:"
+
+def _ip_tag(ip: str) -> str:
+    return f"{{ip:{ip}}}"
+
+def _account_tag(account: str) -> str:
+    return f"{{acct:{account}}}"
+
+# (redis key, local pre-check key) pairs, and the same plus GCRA interval/tolerance
+Locks = List[Tuple[str, str]]
+Limits = List[Tuple[str, str, float, float]]
+
+# Keys are hash-tagged per principal ({ip:<ip>} / {acct:<account>}), so each
+# principal's keys share a cluster slot.
+# KEYS: first the ARGV[2] lock keys (lockout / blocklist: any live TTL blocks),
+# then the GCRA keys. ARGV[1] now (ms), then per GCRA key its emission interval
+# and burst tolerance (ms).
+# GCRA: each key stores its theoretical arrival time (TAT). A request is
+# allowed if TAT + interval - tolerance <= now. Every lock and limit is
+# checked before any TAT is advanced, so a rejected call costs nothing.
+# Returns {allowed, retry_after_ms, index of the key that blocked (1-based)}.
+THROTTLE_SCRIPT = RedisScript("""
+local locks = tonumber(ARGV[2])
+for i = 1, locks do
+    local ttl = redis.call('PTTL', KEYS[i])
+    if ttl > 0 then
+        return {0, ttl, i}
+    end
+end
+local now = tonumber(ARGV[1])
+local tats = {}
+for i = locks + 1, #KEYS do
+    local arg = 3 + (i - locks - 1) * 2
+    local tat = tonumber(redis.call('GET', KEYS[i]) or now)
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + tonumber(ARGV[arg])
+    local wait = new_tat - tonumber(ARGV[arg + 1]) - now
+    if wait > 0 then
+        return {0, math.ceil(wait), i}
+    end
+    tats[i] = new_tat
+end
+for i, tat in pairs(tats) do
+    redis.call('SET', KEYS[i], tat, 'PX', math.ceil(tat - now))
+end
+return {1, 0, 0}
+""")
+
+# KEYS[1] login_failures:{acct:<account>}   KEYS[2] lockout:{acct:<account>}
+# ARGV[1] threshold, ARGV[2] base lock (ms), ARGV[3] max lock (ms), ARGV[4] failure window (s)
+# Returns the lock duration in ms (0 = not locked). The lock doubles per failure past the threshold.
+FAILURE_SCRIPT = RedisScript("""
+local failures = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+local threshold = tonumber(ARGV[1])
+if failures < threshold then
+    return 0
+end
+local lock = math.min(tonumber(ARGV[2]) * 2 ^ (failures - threshold), tonumber(ARGV[3]))
+redis.call('SET', KEYS[2], 1, 'PX', math.ceil(lock))
+return math.ceil(lock)
+""")
+
+class LoginThrottle:
+    """
+    Login attempt limiter, checked before any repository lookup or hashing.
+
+    - GCRA per client IP and per account (`rate` attempts per minute with
+      `burst` allowed at once), both decided atomically in one script call.
+      On Redis Cluster (`cluster=True`) the IP and the account live in
+      different slots, so they are checked in two calls, IP first; an IP
+      slot may then be spent on an attempt the account limit rejects.
+    - Lockout: after `lockout_threshold` failures within `failure_window`
+      seconds, the account is locked for lockout_base seconds. The lock
+      doubles with each further failure, up to lockout_max.
+    - Blocklist: IPs and accounts flagged by FailedLoginMonitor are refused
+      in the same script call until their entry expires.
+    - Local pre-check: a rejection is remembered in-process until its
+      retry-after passes, so blocked clients are refused without a Redis
+      round trip.
+    """
+    def __init__(
+        self,
+        client,
+        ip_rate: float = 30,
+        ip_burst: int = 10,
+        account_rate: float = 10,
+        account_burst: int = 5,
+        lockout_threshold: int = 5,
+        lockout_base: float = 30,
+        lockout_max: float = 3600,
+        failure_window: int = 3600,
+        local_size: int = 100_000,
+        cluster: bool = False,
+    ):
+        self.client = client
+        self.cluster = cluster
+        self._ip = (60_000 / ip_rate, 60_000 / ip_rate * ip_burst) if ip_rate else (0, 0)
+        self._account = (60_000 / account_rate, 60_000 / account_rate * account_burst)
+        self.lockout_threshold = lockout_threshold
+        self.lockout_base = lockout_base
+        self.lockout_max = lockout_max
+        self.failure_window = failure_window
+        self.local_size = local_size
+        self._blocked: "OrderedDict[str, float]" = OrderedDict()
+        self.local_rejections = 0
+
+    def _precheck(self, key: str):
+        until = self._blocked.get(key)
+        if until is None:
+            return
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            del self._blocked[key]
+            return
+        self.local_rejections += 1
+        raise LoginThrottledError("Too many attempts; try again later.", retry_after=remaining)
+
+    def _block(self, key: str, seconds: float):
+        self._blocked[key] = time.monotonic() + seconds
+        self._blocked.move_to_end(key)
+        while len(self._blocked) > self.local_size:
+            self._blocked.popitem(last=False)
+
+    async def check(self, account: str, ip: Optional[str] = None):
+        """Consumes one attempt or raises LoginThrottledError."""
+        account = account.lower()
+        ip_key, account_key = f"ip:{ip}", f"acct:{account}"
+        if ip:
+            self._precheck(ip_key)
+        self._precheck(account_key)
+
+        tag = _account_tag(account)
+        locks: Locks = [(f"lockout:{tag}", account_key), (f"{BLOCKLIST_PREFIX}{tag}", account_key)]
+        limits: Limits = [(f"throttle:{tag}", account_key, *self._account)]
+        if ip:
+            ip_locks: Locks = [(f"{BLOCKLIST_PREFIX}{_ip_tag(ip)}", ip_key)]
+            ip_limits: Limits = [(f"throttle:{_ip_tag(ip)}", ip_key, *self._ip)] if self._ip[0] else []
+            if self.cluster:
+                await self._consume(ip_locks, ip_limits)
+            else:
+                locks, limits = ip_locks + locks, ip_limits + limits
+        await self._consume(locks, limits)
+
+    async def _consume(self, locks: Locks, limits: Limits):
+        keys = [key for key, _ in locks] + [limit[0] for limit in limits]
+        args: List = [int(time.time() * 1000), len(locks)]
+        for _, _, interval, tolerance in limits:
+            args += [interval, tolerance]
+        allowed, retry_ms, index = await THROTTLE_SCRIPT(self.client, keys=keys, args=args)
+        if allowed:
+            return
+        retry_after = int(retry_ms) / 1000
+        local_keys = [local for _, local in locks] + [limit[1] for limit in limits]
+        self._block(local_keys[int(index) - 1], retry_after)
+        raise LoginThrottledError("Too many attempts; try again later.", retry_after=retry_after)
+
+    async def record_failure(self, account: str) -> float:
+        """Counts a failed attempt; returns the lockout it triggered (seconds, 0 if none)."""
+        account = account.lower()
+        lock_ms = await FAILURE_SCRIPT(
+            self.client,
+            keys=(f"login_failures:{_account_tag(account)}", f"lockout:{_account_tag(account)}"),
+            args=(
+                self.lockout_threshold,
+                int(self.lockout_base * 1000),
+                int(self.lockout_max * 1000),
+                self.failure_window,
+            ),
+        )
+        if lock_ms:
+            self._block(f"acct:{account}", int(lock_ms) / 1000)
+        return int(lock_ms) / 1000
+
+    async def record_success(self, account: str):
+        account = account.lower()
+        tag = _account_tag(account)
+        await self.client.delete(f"login_failures:{tag}", f"lockout:{tag}")
+        self._blocked.pop(f"acct:{account}", None)
+
+class FailedLoginMonitor(PeriodicFlusher):
+    """
+    Detects credential-stuffing sources from failed logins at constant memory.
+
+    Failures are counted per IP and per account in two sliding-window
+    HeavyHitterSketch instances, so no per-key state is kept. A key whose
+    windowed count reaches its threshold is flagged once; the background
+    flush pushes only flagged keys to the shared Redis blocklist (SET EX),
+    which LoginThrottle checks on every attempt.
+    """
+    def __init__(
+        self,
+        client,
+        ip_threshold: int = 100,
+        account_threshold: int = 20,
+        window_seconds: float = 300.0,
+        block_seconds: int = 900,
+        top_k: int = 50,
+        flush_interval: float = 1.0,
+    ):
+        super().__init__(flush_interval)
+        self.client = client
+        self.ip_threshold = ip_threshold
+        self.account_threshold = account_threshold
+        self.block_seconds = block_seconds
+        self.ips = HeavyHitterSketch(k=top_k, window_seconds=window_seconds / 5, windows=5)
+        self.accounts = HeavyHitterSketch(k=top_k, window_seconds=window_seconds / 5, windows=5)
+        # key -> local expiry, so a flagged key is pushed once per block period
+        self._flagged: Dict[str, float] = {}
+        self._pending: List[str] = []
+
+    def record(self, account: str, ip: Optional[str] = None, now: Optional[float] = None):
+        now = now if now is not None else time.time()
+        account = account.lower()
+        if self.accounts.add(account, now=now) >= self.account_threshold:
+            self._flag(f"acct:{account}", now)
+        if ip and self.ips.add(ip, now=now) >= self.ip_threshold:
+            self._flag(f"ip:{ip}", now)
+
+    def _flag(self, key: str, now: float):
+        if self._flagged.get(key, 0) > now:
+            return
+        self._flagged[key] = now + self.block_seconds
+        self._pending.append(key)
+        self.ensure_started()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            await self._push(pending)
+        except Exception:
+            # Keep them: _flagged would otherwise suppress re-flagging for block_seconds
+            self._pending = pending + self._pending
+            raise
+        now = time.time()
+        self._flagged = {key: until for key, until in self._flagged.items() if until > now}
+
+    async def _push(self, pending: List[str]):
+        pipe = self.client.pipeline(transaction=False)
+        for key in pending:
+            kind, _, value = key.partition(":")
+            tag = _ip_tag(value) if kind == "ip" else _account_tag(value)
+            pipe.set(f"{BLOCKLIST_PREFIX}{tag}", 1, ex=self.block_seconds)
+        await pipe.execute()
+
+    def top(self, n: int = 10) -> Dict[str, List[Tuple[str, int]]]:
+        """Heaviest failing IPs and accounts over the window, for dashboards."""
+        return {"ips": self.ips.top(n), "accounts": self.accounts.top(n)}
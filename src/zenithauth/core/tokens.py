@@ -1,44 +1,166 @@
 from datetime import datetime, timedelta, timezone
+import hashlib
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from jose import jwt, JWTError
 from zenithauth.config import ZenithSettings  # Import central settings
 from zenithauth.core.exceptions import TokenExpiredError, ZenithAuthError
+from zenithauth.core.opaque import ACCESS_PREFIX, REFRESH_PREFIX, OpaqueTokenStore, is_opaque
+from zenithauth.core.paseto import PasetoV4Local, PasetoV4Public
 
 class TokenPair:
-    def __init__(self, access_token: str, refresh_token: str):
+    def __init__(self, access_token: str, refresh_token: str, family_id: Optional[str] = None):
         self.access_token = access_token
         self.refresh_token = refresh_token
         self.token_type = "bearer"
+        # Shared by every token of one login lineage; revoking it kills the session
+        self.family_id = family_id
 
 class TokenManager:
-    def __init__(self, settings: ZenithSettings):
+    def __init__(self, settings: ZenithSettings, opaque: Optional[OpaqueTokenStore] = None):
         self.settings = settings
+        # Set to enable reference tokens (TOKEN_FORMAT="opaque")
+        self.opaque = opaque
+        self._paseto = None
 
-    def create_token(self, subject: str, expires_delta: timedelta, scopes: List[str] = []) -> str:
-        expire = datetime.now(timezone.utc) + expires_delta
-        to_encode = {
+    @property
+    def paseto(self):
+        """The PASETO v4 engine; keys are parsed once and cached here."""
+        if self._paseto is None:
+            if self.settings.PASETO_KEY:
+                key = bytes.fromhex(self.settings.PASETO_KEY)
+            else:
+                key = hashlib.blake2b(
+                    self.settings.SECRET_KEY.encode(), digest_size=32, person=b"zenith-paseto"
+                ).digest()
+            if self.settings.PASETO_PURPOSE == "local":
+                self._paseto = PasetoV4Local(key)
+            elif self.settings.PASETO_PURPOSE == "public":
+                self._paseto = PasetoV4Public(private_key=key)
+            else:
+                raise ZenithAuthError(f"Unknown PASETO purpose: {self.settings.PASETO_PURPOSE}")
+        return self._paseto
+
+    def _encode(self, claims: Dict[str, Any]) -> str:
+        if self.settings.TOKEN_FORMAT == "paseto":
+            return self.paseto.encode(claims)
+        return jwt.encode(claims, self.settings.SECRET_KEY, algorithm=self.settings.ALGORITHM)
+
+    def build_claims(
+        self,
+        subject: str,
+        expires_delta: timedelta,
+        scopes: List[str] = [],
+        family_id: Optional[str] = None,
+        extra_claims: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        claims = {
             "sub": str(subject),
-            "exp": expire,
-            "iat": datetime.now(timezone.utc),
+            "exp": int((now + expires_delta).timestamp()),
+            "iat": int(now.timestamp()),
             "jti": str(uuid.uuid4()),
             "scopes": scopes
         }
-        return jwt.encode(to_encode, self.settings.SECRET_KEY, algorithm=self.settings.ALGORITHM)
+        if family_id:
+            claims["fid"] = family_id
+        if extra_claims:
+            claims.update(extra_claims)
+        return claims
+
+    def create_token(
+        self,
+        subject: str,
+        expires_delta: timedelta,
+        scopes: List[str] = [],
+        family_id: Optional[str] = None,
+        extra_claims: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        return self._encode(self.build_claims(subject, expires_delta, scopes, family_id, extra_claims))
 
-    def generate_auth_tokens(self, user_id: str, scopes: List[str] = []) -> TokenPair:
-        access = self.create_token(
+    def _pair_claims(
+        self,
+        user_id: str,
+        scopes: List[str],
+        family_id: str,
+        roles_version: Optional[int],
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        if roles_version is None:
+            roles_version = int(datetime.now(timezone.utc).timestamp())
+        access = self.build_claims(
             subject=user_id, 
             expires_delta=timedelta(minutes=self.settings.ACCESS_TOKEN_EXPIRE_MINUTES),
-            scopes=scopes
+            scopes=scopes,
+            family_id=family_id,
+            extra_claims={"typ": "access"}
         )
-        refresh = self.create_token(
+        refresh = self.build_claims(
             subject=user_id, 
-            expires_delta=timedelta(days=self.settings.REFRESH_TOKEN_EXPIRE_DAYS)
+            expires_delta=timedelta(days=self.settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            family_id=family_id,
+            extra_claims={"typ": "refresh", "roles": list(scopes), "rv": roles_version}
+        )
+        return access, refresh
+
+    def generate_auth_tokens(
+        self,
+        user_id: str,
+        scopes: List[str] = [],
+        family_id: Optional[str] = None,
+        roles_version: Optional[int] = None,
+    ) -> TokenPair:
+        """
+        Mints an access/refresh pair; both carry the same `fid` family ID.
+        The refresh token carries the roles (as `roles`, not `scopes`, so it
+        grants nothing by itself) and `rv`, the time those roles were read,
+        so a refresh can re-issue access tokens without a repository fetch.
+        """
+        family_id = family_id or str(uuid.uuid4())
+        access, refresh = self._pair_claims(user_id, scopes, family_id, roles_version)
+        return TokenPair(
+            access_token=self._encode(access),
+            refresh_token=self._encode(refresh),
+            family_id=family_id,
         )
-        return TokenPair(access_token=access, refresh_token=refresh)
+
+    async def generate_opaque_tokens(
+        self,
+        user_id: str,
+        scopes: List[str] = [],
+        family_id: Optional[str] = None,
+        roles_version: Optional[int] = None,
+    ) -> TokenPair:
+        """Same claims as `generate_auth_tokens`, handed out as reference handles."""
+        if self.opaque is None:
+            raise ZenithAuthError("Opaque tokens are not enabled.")
+        family_id = family_id or str(uuid.uuid4())
+        access, refresh = self._pair_claims(user_id, scopes, family_id, roles_version)
+        access_handle, refresh_handle = await self.opaque.issue_many(
+            [(ACCESS_PREFIX, access), (REFRESH_PREFIX, refresh)]
+        )
+        return TokenPair(access_token=access_handle, refresh_token=refresh_handle, family_id=family_id)
+
+    async def resolve(self, token: str) -> Dict[str, Any]:
+        """Claims of either token format: JWTs are decoded, handles introspected."""
+        if not is_opaque(token):
+            return self.decode_token(token)
+        if self.opaque is None:
+            raise ZenithAuthError("Invalid token.")
+        payload = await self.opaque.introspect(token)
+        if payload is None:
+            raise ZenithAuthError("Invalid token.")
+        if payload["exp"] <= datetime.now(timezone.utc).timestamp():
+            raise TokenExpiredError("Token has expired.")
+        return payload
 
     def decode_token(self, token: str) -> Dict[str, Any]:
+        if token.startswith("v4."):
+            if self.settings.TOKEN_FORMAT != "paseto":
+                raise ZenithAuthError("Invalid token.")
+            payload = self.paseto.decode(token)
+            if payload.get("exp", 0) <= datetime.now(timezone.utc).timestamp():
+                raise TokenExpiredError("Token has expired.")
+            return payload
         try:
             return jwt.decode(
                 token, 
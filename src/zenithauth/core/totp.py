@@ -0,0 +1,78 @@
+import base64
+import hashlib
+import hmac
+import struct
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+COUNTER = struct.Struct(">Q")
+
+class TOTPVerifier:
+    """
+    RFC 6238 TOTP verification (SHA-1, the authenticator-app default).
+
+    Decoded secrets are kept in an LRU as ready-keyed HMAC objects, so a
+    verification costs one `copy()` + one compression per counter instead
+    of a base32 decode and full HMAC setup. All counters in the ±window are
+    computed and compared every time, with no early exit, so timing does not
+    reveal which step (if any) matched.
+    """
+    def __init__(self, digits: int = 6, interval: int = 30, window: int = 1, cache_size: int = 10_000):
+        self.digits = digits
+        self.interval = interval
+        self.window = window
+        self.cache_size = cache_size
+        self._modulus = 10 ** digits
+        self._format = b"%0" + str(digits).encode() + b"d"
+        self._keys: "OrderedDict[str, hmac.HMAC]" = OrderedDict()
+
+    def _key(self, secret: str) -> hmac.HMAC:
+        mac = self._keys.get(secret)
+        if mac is not None:
+            self._keys.move_to_end(secret)
+            return mac
+        # Same padding rules as pyotp: secrets are usually stored unpadded
+        padded = secret + "=" * (-len(secret) % 8)
+        mac = hmac.new(base64.b32decode(padded, casefold=True), digestmod=hashlib.sha1)
+        self._keys[secret] = mac
+        if len(self._keys) > self.cache_size:
+            self._keys.popitem(last=False)
+        return mac
+
+    def _code(self, mac: hmac.HMAC, counter: int) -> bytes:
+        h = mac.copy()
+        h.update(COUNTER.pack(counter))
+        digest = h.digest()
+        offset = digest[-1] & 0x0F
+        value = (int.from_bytes(digest[offset:offset + 4], "big") & 0x7FFFFFFF) % self._modulus
+        return self._format % value
+
+    def now(self, secret: str, for_time: Optional[float] = None) -> str:
+        """The current code for `secret` (mainly for tests and tooling)."""
+        counter = int((time.time() if for_time is None else for_time) // self.interval)
+        return self._code(self._key(secret), counter).decode()
+
+    def _check(self, secret: str, code: str, counter: int) -> bool:
+        try:
+            candidate = code.encode("ascii")
+        except (AttributeError, UnicodeEncodeError):
+            return False
+        if len(candidate) != self.digits:
+            return False
+        mac = self._key(secret)
+        matched = False
+        for step in range(counter - self.window, counter + self.window + 1):
+            matched |= hmac.compare_digest(self._code(mac, step), candidate)
+        return matched
+
+    def verify(self, secret: str, code: str, for_time: Optional[float] = None) -> bool:
+        counter = int((time.time() if for_time is None else for_time) // self.interval)
+        return self._check(secret, code, counter)
+
+    def verify_many(
+        self, items: Iterable[Tuple[str, str]], for_time: Optional[float] = None
+    ) -> List[bool]:
+        """Verifies (secret, code) pairs against one shared timestamp."""
+        counter = int((time.time() if for_time is None else for_time) // self.interval)
+        return [self._check(secret, code, counter) for secret, code in items]
@@ -1,19 +1,41 @@
+import asyncio
+import hashlib
 from datetime import timedelta, datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 from zenithauth.config import ZenithSettings
 from zenithauth.core.security import SecurityHandler
+from zenithauth.core.policy import PasswordPolicy
+from zenithauth.core.breach import BreachedPasswordRule
+from zenithauth.core.strength import StrengthRule
 from zenithauth.core.tokens import TokenManager, TokenPair
-from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.opaque import OpaqueTokenStore, is_opaque
+from zenithauth.core.cookies import CookieSessionCodec
+from zenithauth.core.revocation import RevocationStore, Consistency
+from zenithauth.core.filestore import FileRevocationStore
+from zenithauth.core.sessions import SessionRegistry
+from zenithauth.core.activity import ActivityTracker
+from zenithauth.core.analytics import ActiveUserCounter
 from zenithauth.core.authorizer import Authorizer
+from zenithauth.core.admission import HashScheduler
+from zenithauth.core.throttle import LoginThrottle, FailedLoginMonitor
+from zenithauth.core.hashers import HashRegistry, scheme_of
+from zenithauth.core.bulk_import import BulkImporter, ImportReport
+from zenithauth.core.bloom import UserFilter
 from zenithauth.core.mfa import MFAHandler, InvalidMFACodeError
+from zenithauth.core.context import get_auth_context
+from zenithauth.core.scripts import AuthStatus
+from zenithauth.core.singleflight import SingleFlight
 from zenithauth.core.logger import logger
 from zenithauth.core.exceptions import (
     InvalidCredentialsError, 
     ZenithAuthError, 
     RevokedTokenError,
-    InsufficientPermissionsError
+    InsufficientPermissionsError,
+    RateLimitedError,
+    RefreshTokenReuseError
 )
+from zenithauth.core.identity import UserInDB
 from zenithauth.protocols.user_repo import UserRepositoryProtocol
 
 class ZenithAuth:
@@ -31,31 +53,170 @@ class ZenithAuth:
         self.repository = repository
         
         # Core Sub-systems
-        self.security = SecurityHandler()
+        self.security = SecurityHandler(
+            policy=self._build_policy(),
+            time_cost=self.settings.ARGON2_TIME_COST,
+            memory_cost=self.settings.ARGON2_MEMORY_COST,
+            parallelism=self.settings.ARGON2_PARALLELISM,
+        )
+        # Bounds concurrent Argon2 work by memory; excess logins queue or are shed
+        self.hashing = HashScheduler(
+            memory_budget_kib=self.settings.HASH_MEMORY_BUDGET_MIB * 1024,
+            memory_cost_kib=self.security.ph.memory_cost,
+            max_queue=self.settings.HASH_QUEUE_SIZE,
+            max_per_key=self.settings.HASH_QUEUE_PER_CLIENT,
+            queue_timeout=self.settings.HASH_QUEUE_TIMEOUT_SECONDS,
+        )
         self.tokens = TokenManager(self.settings)
-        self.revocation = RevocationStore(self.settings.REDIS_URL)
+        if self.settings.REVOCATION_BACKEND == "file":
+            self.revocation = FileRevocationStore(self.settings.REVOCATION_FILE_PATH)
+        else:
+            self.revocation = RevocationStore.from_settings(self.settings)
+        if self.settings.TOKEN_FORMAT == "opaque":
+            if not isinstance(self.revocation, RevocationStore):
+                raise ZenithAuthError("Opaque tokens require the Redis revocation backend.")
+            self.tokens.opaque = OpaqueTokenStore(
+                self.revocation.client,
+                cache_ttl=self.settings.OPAQUE_CACHE_TTL_SECONDS,
+                cache_size=self.settings.OPAQUE_CACHE_SIZE,
+            )
+        self.cookies = CookieSessionCodec(
+            hashlib.blake2b(
+                self.settings.SECRET_KEY.encode(), digest_size=32, person=b"zenith-cookie"
+            ).digest(),
+            roles=self.settings.COOKIE_ROLES,
+            max_age=self.settings.COOKIE_MAX_AGE_SECONDS,
+        )
+        self.sessions: Optional[SessionRegistry] = None
+        if self.settings.TRACK_SESSIONS:
+            if not isinstance(self.revocation, RevocationStore):
+                raise ZenithAuthError("Session tracking requires the Redis revocation backend.")
+            self.sessions = SessionRegistry(
+                self.revocation.client, max_sessions=self.settings.MAX_SESSIONS_PER_USER
+            )
+        self.activity: Optional[ActivityTracker] = None
+        if self.settings.TRACK_ACTIVITY:
+            if not isinstance(self.revocation, RevocationStore):
+                raise ZenithAuthError("Activity tracking requires the Redis revocation backend.")
+            self.activity = ActivityTracker(
+                self.revocation.client,
+                flush_interval=self.settings.ACTIVITY_FLUSH_SECONDS,
+                max_buffer=self.settings.ACTIVITY_BUFFER_SIZE,
+                session_ttl=self._refresh_lifetime_seconds(),
+            )
+        self.analytics: Optional[ActiveUserCounter] = None
+        if self.settings.TRACK_ACTIVE_USERS:
+            if not isinstance(self.revocation, RevocationStore):
+                raise ZenithAuthError("Active-user analytics require the Redis revocation backend.")
+            self.analytics = ActiveUserCounter(
+                self.revocation.client,
+                bucket_seconds=self.settings.ANALYTICS_BUCKET_SECONDS,
+                retention_seconds=self.settings.ANALYTICS_RETENTION_DAYS * 24 * 3600,
+                flush_interval=self.settings.ANALYTICS_FLUSH_SECONDS,
+            )
+        self.throttle: Optional[LoginThrottle] = None
+        if self.settings.LOGIN_THROTTLE:
+            if not isinstance(self.revocation, RevocationStore):
+                raise ZenithAuthError("Login throttling requires the Redis revocation backend.")
+            self.throttle = LoginThrottle(
+                self.revocation.client,
+                ip_rate=self.settings.LOGIN_RATE_PER_IP,
+                ip_burst=self.settings.LOGIN_BURST_PER_IP,
+                account_rate=self.settings.LOGIN_RATE_PER_ACCOUNT,
+                account_burst=self.settings.LOGIN_BURST_PER_ACCOUNT,
+                lockout_threshold=self.settings.LOCKOUT_THRESHOLD,
+                lockout_base=self.settings.LOCKOUT_BASE_SECONDS,
+                lockout_max=self.settings.LOCKOUT_MAX_SECONDS,
+                cluster=self.revocation.router.cluster,
+            )
+        self.failed_logins: Optional[FailedLoginMonitor] = None
+        if self.settings.FAILED_LOGIN_MONITOR:
+            if self.throttle is None:
+                raise ZenithAuthError("Failed-login monitoring requires LOGIN_THROTTLE.")
+            self.failed_logins = FailedLoginMonitor(
+                self.revocation.client,
+                ip_threshold=self.settings.FAILED_LOGIN_IP_THRESHOLD,
+                account_threshold=self.settings.FAILED_LOGIN_ACCOUNT_THRESHOLD,
+                window_seconds=self.settings.FAILED_LOGIN_WINDOW_SECONDS,
+                block_seconds=self.settings.BLOCKLIST_SECONDS,
+            )
+        self.user_filter: Optional[UserFilter] = None
+        if self.settings.USER_FILTER:
+            # Without the file's journal, a user saved by another worker would be turned away
+            if not self.settings.USER_FILTER_PATH:
+                raise ZenithAuthError("The user filter requires USER_FILTER_PATH.")
+            # Warm-starts from USER_FILTER_PATH; otherwise inactive until build_user_filter()
+            self.user_filter = UserFilter(
+                capacity=self.settings.USER_FILTER_CAPACITY,
+                error_rate=self.settings.USER_FILTER_ERROR_RATE,
+                path=self.settings.USER_FILTER_PATH,
+            )
         self.authorizer = Authorizer()
         self.mfa = MFAHandler(issuer_name=self.settings.ALGORITHM) # Using algorithm as placeholder or add APP_NAME to config
+        # Coalesces identical concurrent token verifications and user fetches
+        self._flights = SingleFlight()
+        # Fire-and-forget work (e.g. rehash-on-login), awaited by close()
+        self._background: set = set()
         
         logger.info("ZenithAuth Manager initialized.")
 
+    def _build_policy(self) -> PasswordPolicy:
+        rules = []
+        if self.settings.PASSWORD_MIN_STRENGTH:
+            rules.append(StrengthRule(self.settings.PASSWORD_MIN_STRENGTH))
+        if self.settings.BREACHED_PASSWORDS_PATH:
+            rules.append(BreachedPasswordRule(self.settings.BREACHED_PASSWORDS_PATH))
+        return PasswordPolicy(
+            min_length=self.settings.MIN_PASSWORD_LENGTH,
+            require_non_alpha=self.settings.REQUIRE_NON_ALPHA,
+            rules=rules,
+        )
+
     # --- AUTHENTICATION FLOW ---
 
-    async def authenticate(self, email: str, password: str) -> dict:
+    async def authenticate(
+        self, email: str, password: str, client_key: Optional[str] = None
+    ) -> dict:
         """
         Step 1: Verify credentials.
         Returns a dict indicating if MFA is required or providing tokens.
+        :param client_key: Client identifier (e.g. IP) for throttling and fair
+            queuing of hashing; defaults to the email. Raises AuthOverloadedError
+            when shed and LoginThrottledError when throttled.
         """
         if not self.repository:
             raise ZenithAuthError("Repository not configured.")
 
-        user = await self.repository.get_by_email(email)
-        if not user:
-            logger.warning(f"Login failed: User {email} not found.")
-            raise InvalidCredentialsError("Invalid email or password.")
+        # Throttle before any lookup or hashing, so floods cost one script call
+        if self.throttle is not None:
+            await self.throttle.check(email, ip=client_key)
+        try:
+            if self.user_filter is not None and not self.user_filter.might_exist(email):
+                user = None
+            else:
+                user = await self._flights.do(
+                    ("user_email", email), lambda: self.repository.get_by_email(email)
+                )
+            if not user:
+                logger.warning(f"Login failed: User {email} not found.")
+                # Same Argon2 work as a real check, so timing does not reveal unknown accounts
+                await self.hashing.run(client_key or email, self.security.dummy_verify, password)
+                raise InvalidCredentialsError("Invalid email or password.")
 
-        # Verify password (Argon2id)
-        self.security.verify_password(user.hashed_password, password)
+            # Verify password (Argon2id) within the hashing memory budget
+            await self.hashing.run(
+                client_key or email, self.security.verify_password, user.hashed_password, password
+            )
+        except InvalidCredentialsError:
+            if self.failed_logins is not None:
+                self.failed_logins.record(email, ip=client_key)
+            if self.throttle is not None:
+                await self.throttle.record_failure(email)
+            raise
+        if self.throttle is not None:
+            await self.throttle.record_success(email)
+        if self.security.needs_rehash(user.hashed_password):
+            self._spawn(self._rehash(user, password, client_key or email))
 
         # Check for MFA
         if user.mfa_enabled:
@@ -64,7 +225,8 @@ class ZenithAuth:
             mfa_ticket = self.tokens.create_token(
                 subject=user.id,
                 expires_delta=timedelta(minutes=5),
-                scopes=["mfa_pending"]
+                scopes=["mfa_pending"],
+                extra_claims={"typ": "mfa"}
             )
             return {
                 "mfa_required": True,
@@ -73,60 +235,413 @@ class ZenithAuth:
             }
 
         # No MFA: Issue full tokens
-        tokens = self.tokens.generate_auth_tokens(user.id, scopes=user.roles)
+        tokens = await self._issue_tokens(user.id, user.roles)
         logger.info(f"User {email} logged in successfully.")
         return {
             "mfa_required": False,
             "tokens": tokens
         }
 
-    async def verify_mfa_and_login(self, user_id: str, code: str) -> TokenPair:
+    async def _rehash(self, user: UserInDB, password: str, client_key: str):
+        """Upgrades a hash made with outdated Argon2 parameters; never fails the login."""
+        try:
+            # Concurrent logins of the same user share one upgrade
+            await self._flights.do(
+                ("rehash", user.id), lambda: self._upgrade_hash(user, password, client_key)
+            )
+        except Exception as e:
+            logger.warning(f"Password rehash skipped for user {user.id}: {e}")
+
+    async def _upgrade_hash(self, user: UserInDB, password: str, client_key: str):
+        new_hash = await self.hashing.run(client_key, self.security.rehash, password)
+        # Re-read so changes saved since the login (password, MFA, roles) are kept
+        current = await self.repository.get_by_id(user.id)
+        if current is None or current.hashed_password != user.hashed_password:
+            logger.info(f"Password rehash skipped for user {user.id}: changed since login.")
+            return
+        await self.repository.save_user(current.model_copy(update={"hashed_password": new_hash}))
+        logger.info(f"Password hash upgraded for user: {user.id}")
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def verify_mfa_and_login(
+        self, user_id: str, code: str, client_key: Optional[str] = None
+    ) -> TokenPair:
         """
         Step 2: Verify TOTP code after a successful password check.
+        TOTP attempts share the login throttle, keyed by `mfa:<user_id>`.
         """
-        user = await self.repository.get_by_id(user_id)
+        account = f"mfa:{user_id}"
+        if self.throttle is not None:
+            await self.throttle.check(account, ip=client_key)
+        user = await self._flights.do(
+            ("user_id", user_id), lambda: self.repository.get_by_id(user_id)
+        )
         if not user or not user.mfa_secret:
             raise ZenithAuthError("MFA is not configured for this user.")
 
         if not self.mfa.verify_code(user.mfa_secret, code):
             logger.warning(f"Invalid MFA code provided for user: {user_id}")
+            if self.throttle is not None:
+                await self.throttle.record_failure(account)
             raise InvalidMFACodeError("The 6-digit code is incorrect or expired.")
+        if self.throttle is not None:
+            await self.throttle.record_success(account)
 
         logger.info(f"MFA verified for user: {user_id}")
-        return self.tokens.generate_auth_tokens(user.id, scopes=user.roles)
+        return await self._issue_tokens(user.id, user.roles)
+
+    async def _issue_tokens(self, user_id: str, roles: List[str]) -> TokenPair:
+        """Mints a new token family and registers it as a session (if tracking)."""
+        tokens = await self._mint(user_id, roles)
+        if self.sessions is not None:
+            evicted = await self.sessions.register(
+                user_id, tokens.family_id, self._refresh_expiry()
+            )
+            for family_id in evicted:
+                await self.revocation.revoke_family(
+                    family_id, ttl=self._refresh_lifetime_seconds()
+                )
+                logger.info(f"Session limit reached, evicted session: FID {family_id}")
+        if self.analytics is not None:
+            self.analytics.record("users", user_id)
+            self.analytics.record("sessions", tokens.family_id)
+        return tokens
+
+    async def refresh(self, refresh_token: str) -> TokenPair:
+        """
+        Rotates a refresh token without touching the repository.
+        Roles ride along inside the refresh token; a role change (see
+        `revoke_roles`) makes the carried roles stale and forces a login.
+        Presenting an already-rotated refresh token revokes its whole family.
+        """
+        payload = await self.tokens.resolve(refresh_token)
+        if payload.get("typ") != "refresh":
+            raise ZenithAuthError("Not a refresh token.")
+
+        state = await self.revocation.consume_refresh(payload)
+        if state.reused:
+            logger.warning(f"Refresh token reuse detected: FID {payload.get('fid')}")
+            if payload.get("fid"):
+                await self.revocation.revoke_family(
+                    payload["fid"], ttl=self._refresh_lifetime_seconds()
+                )
+            raise RefreshTokenReuseError("Refresh token was already used.")
+        if state.revoked or state.stale_epoch:
+            raise RevokedTokenError("Token has been revoked.")
+        if state.stale_roles:
+            raise RevokedTokenError("Roles have changed; please log in again.")
+
+        tokens = await self._mint(
+            payload["sub"],
+            payload.get("roles", []),
+            family_id=payload.get("fid"),
+            roles_version=payload.get("rv"),
+        )
+        if self.sessions is not None and tokens.family_id:
+            await self.sessions.touch(payload["sub"], tokens.family_id, self._refresh_expiry())
+        return tokens
+
+    async def _mint(
+        self,
+        user_id: str,
+        roles: List[str],
+        family_id: Optional[str] = None,
+        roles_version: Optional[int] = None,
+    ) -> TokenPair:
+        if self.settings.TOKEN_FORMAT == "opaque":
+            return await self.tokens.generate_opaque_tokens(
+                user_id, scopes=roles, family_id=family_id, roles_version=roles_version
+            )
+        return self.tokens.generate_auth_tokens(
+            user_id, scopes=roles, family_id=family_id, roles_version=roles_version
+        )
 
     # --- AUTHORIZATION & GUARDS ---
 
-    async def authorize(self, token: str) -> Dict[str, Any]:
+    async def authorize(
+        self, token: str, consistency: Optional[Consistency] = None
+    ) -> Dict[str, Any]:
         """
         Validates token signature, expiration, and Redis revocation.
         This is the primary 'Guard' for protected routes.
+        :param consistency: strict (default), Consistency.bounded(seconds) or stateless.
+        Inside a request context, repeat calls for the same token are memoized.
         """
-        payload = self.tokens.decode_token(token)
-        
-        # Check Redis Blacklist
-        if await self.revocation.is_revoked(payload["jti"]):
+        level = Consistency.parse(consistency)
+        ctx = get_auth_context()
+        if ctx is not None:
+            cached = ctx.get(token, level)
+            # The context also memoizes cookies, which are not bearer credentials
+            if cached is not None and cached.get("typ") == "access":
+                return cached
+
+        if self.settings.AUTHORIZE_RATE_LIMIT:
+            # Every request must be counted, so rate-limited verifications are not shared
+            payload = await self._verify(token, level)
+        else:
+            payload = await self._flights.do(
+                ("authorize", token, level), lambda: self._verify(token, level)
+            )
+
+        if ctx is not None:
+            ctx.remember(token, payload, level)
+        if self.activity is not None:
+            self.activity.record(payload["sub"], payload.get("fid") or payload["jti"])
+        if self.analytics is not None and self.settings.ACTIVE_USERS_ON_AUTHORIZE:
+            self.analytics.record("active_users", payload["sub"])
+        return payload
+
+    async def _verify(self, token: str, level: Consistency) -> Dict[str, Any]:
+        """Decode (or introspect) + revocation check; shared by concurrent callers of authorize."""
+        payload = await self.tokens.resolve(token)
+        # Refresh tokens and MFA tickets are not bearer credentials
+        if payload.get("typ") != "access":
+            raise ZenithAuthError("Not an access token.")
+        await self._check_revocation(payload, level)
+        return payload
+
+    async def _check_revocation(self, payload: Dict[str, Any], level: Consistency):
+        # Check Redis Blacklist, user epoch and rate limit in one round trip
+        status = await self.revocation.check(
+            payload,
+            level,
+            rate_limit=self.settings.AUTHORIZE_RATE_LIMIT,
+            rate_window=self.settings.AUTHORIZE_RATE_WINDOW_SECONDS,
+        )
+        if status == AuthStatus.RATE_LIMITED:
+            raise RateLimitedError("Too many requests.")
+        if status != AuthStatus.OK:
             logger.warning(f"Revoked token usage attempt: JTI {payload.get('jti')}")
             raise RevokedTokenError("Token has been revoked.")
-            
-        return payload
 
-    async def authorize_role(self, token: str, required_role: str) -> Dict[str, Any]:
+    async def authorize_role(
+        self, token: str, required_role: str, consistency: Optional[Consistency] = None
+    ) -> Dict[str, Any]:
         """Verify token and ensure user has a specific role."""
-        payload = await self.authorize(token)
+        payload = await self.authorize(token, consistency)
         if not self.authorizer.has_role(payload, required_role):
             raise InsufficientPermissionsError(f"Required role: {required_role}")
         return payload
 
     async def logout(self, token: str):
-        """Immediately invalidates a token by adding its JTI to Redis."""
-        payload = self.tokens.decode_token(token)
+        """
+        Immediately invalidates the session behind a token: its whole token
+        family (access + refresh + anything refreshed from them) in one write.
+        """
+        payload = await self.tokens.resolve(token)
+        ctx = get_auth_context()
+        if ctx is not None:
+            ctx.forget(token)
+        if is_opaque(token):
+            await self.tokens.opaque.revoke(token)
+        if payload.get("fid"):
+            await self.revocation.revoke_family(
+                payload["fid"], ttl=self._refresh_lifetime_seconds()
+            )
+            if self.sessions is not None:
+                await self.sessions.remove(payload["sub"], payload["fid"])
+            logger.info(f"Token family revoked (Logged Out): FID {payload['fid']}")
+            return
         await self.revocation.revoke(
             jti=payload["jti"], 
             expires_at=payload["exp"]
         )
         logger.info(f"Token revoked (Logged Out): JTI {payload.get('jti')}")
 
+    # --- COOKIE SESSIONS ---
+
+    async def issue_cookie(self, user_id: str, roles: List[str]) -> str:
+        """Starts a browser session; returns the signed cookie value."""
+        cookie = self.cookies.encode(user_id, roles)
+        session = self.cookies.decode(cookie)
+        if self.sessions is not None:
+            evicted = await self.sessions.register(
+                user_id, session.session_id, session.issued_at + self.cookies.max_age
+            )
+            ttl = max(self._refresh_lifetime_seconds(), self.cookies.max_age)
+            for session_id in evicted:
+                await self.revocation.revoke_family(session_id, ttl=ttl)
+        return cookie
+
+    async def authorize_cookie(
+        self, cookie: str, consistency: Optional[Consistency] = None
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Verifies a session cookie against the same revocation records as tokens
+        (the session ID is the family). Returns the claims and, once the
+        cookie is past half its lifetime, a re-signed cookie to send back.
+        Inside a request context, repeat calls for the same cookie are
+        memoized (the re-signed cookie is only returned the first time).
+        """
+        level = Consistency.parse(consistency)
+        ctx = get_auth_context()
+        if ctx is not None:
+            cached = ctx.get(cookie, level)
+            if cached is not None and cached.get("typ") == "cookie":
+                return cached, None
+        session = self.cookies.decode(cookie)
+        payload = self.cookies.claims(session)
+        await self._check_revocation(payload, level)
+        if ctx is not None:
+            ctx.remember(cookie, payload, level)
+        if not self.cookies.needs_reissue(session):
+            return payload, None
+        fresh = self.cookies.reissue(session)
+        if self.sessions is not None:
+            expires_at = datetime.now(timezone.utc).timestamp() + self.cookies.max_age
+            await self.sessions.touch(session.user_id, session.session_id, expires_at)
+        return payload, fresh
+
+    async def logout_cookie(self, cookie: str):
+        session = self.cookies.decode(cookie)
+        ctx = get_auth_context()
+        if ctx is not None:
+            ctx.forget(cookie)
+        # Re-issued cookies share the session ID, so one family record covers them all
+        await self.revocation.revoke_family(session.session_id, ttl=self.cookies.max_age)
+        if self.sessions is not None:
+            await self.sessions.remove(session.user_id, session.session_id)
+
+    async def logout_all(self, user_id: str):
+        """Invalidates every token issued to a user so far (bumps the user epoch)."""
+        await self.revocation.revoke_user(user_id, ttl=self._refresh_lifetime_seconds())
+        if self.sessions is not None:
+            await self.sessions.clear(user_id)
+        logger.info(f"All sessions revoked for user: {user_id}")
+
+    async def list_sessions(self, user_id: str) -> List[Dict[str, Any]]:
+        """Active sessions (token families) of a user, oldest first."""
+        if self.sessions is None:
+            raise ZenithAuthError("Session tracking is not enabled.")
+        return await self.sessions.list_sessions(user_id)
+
+    async def revoke_session(self, user_id: str, session_id: str):
+        """Signs out one device: revokes the session's token family."""
+        await self.revocation.revoke_family(session_id, ttl=self._refresh_lifetime_seconds())
+        if self.sessions is not None:
+            await self.sessions.remove(user_id, session_id)
+
+    async def revoke_roles(self, user_id: str):
+        """Call after changing a user's roles so refreshes stop carrying the old ones."""
+        await self.revocation.revoke_roles(user_id, ttl=self._refresh_lifetime_seconds())
+        logger.info(f"Carried roles invalidated for user: {user_id}")
+
+    def _refresh_lifetime_seconds(self) -> int:
+        return int(timedelta(days=self.settings.REFRESH_TOKEN_EXPIRE_DAYS).total_seconds())
+
+    def _refresh_expiry(self) -> float:
+        return datetime.now(timezone.utc).timestamp() + self._refresh_lifetime_seconds()
+
+    async def close(self):
+        """Flushes write-behind buffers and stops background tasks."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self.activity is not None:
+            await self.activity.stop()
+        if self.analytics is not None:
+            await self.analytics.stop()
+        if self.failed_logins is not None:
+            await self.failed_logins.stop()
+        if self.user_filter is not None:
+            self.user_filter.save()
+        if isinstance(self.revocation, FileRevocationStore):
+            await self.revocation.stop()
+            self.revocation.close()
+        self.hashing.shutdown()
+
+    async def save_user(self, user: UserInDB) -> UserInDB:
+        """
+        Saves through the repository, keeping the user filter in sync.
+        With USER_FILTER on, every new user must be created here: a user
+        written straight to the repository cannot log in until the next
+        `build_user_filter()`.
+        """
+        if not self.repository:
+            raise ZenithAuthError("Repository not configured.")
+        if self.user_filter is not None:
+            # Added first: a login racing the save must not be turned away
+            self.user_filter.add(user.email)
+        return await self.repository.save_user(user)
+
+    async def build_user_filter(self, batch_size: int = 1000) -> Dict[str, Any]:
+        """(Re)builds the user filter from a repository scan and persists it. Returns its stats."""
+        if self.user_filter is None:
+            raise ZenithAuthError("The user filter is not enabled.")
+        if not self.repository:
+            raise ZenithAuthError("Repository not configured.")
+        await self.user_filter.build(self.repository.iter_users(batch_size=batch_size))
+        stats = self.user_filter.stats()
+        logger.info(
+            f"User filter built: {stats['items']} users, "
+            f"false-positive rate {stats['false_positive_rate']:.4%}."
+        )
+        return stats
+
+    def failed_login_top(self, n: int = 10) -> Dict[str, List[Tuple[str, int]]]:
+        """Heaviest failing IPs and accounts over the monitor window (for dashboards)."""
+        if self.failed_logins is None:
+            raise ZenithAuthError("Failed-login monitoring is not enabled.")
+        return self.failed_logins.top(n)
+
+    async def count_active_users(self, window_seconds: int = 3600, metric: str = "users") -> int:
+        """
+        Approximate distinct users over the trailing window.
+        metric: "users" (logins), "sessions" (new sessions) or "active_users"
+        (authorized requests, needs ACTIVE_USERS_ON_AUTHORIZE).
+        """
+        if self.analytics is None:
+            raise ZenithAuthError("Active-user analytics are not enabled.")
+        await self.analytics.flush()
+        return await self.analytics.count(metric, window_seconds)
+
+    async def import_users(
+        self,
+        path: str,
+        checkpoint_path: Optional[str] = None,
+        batch_size: int = 1000,
+        workers: Optional[int] = None,
+        ordered: bool = True,
+    ) -> ImportReport:
+        """
+        Bulk-imports users from a .csv or .jsonl file (see BulkImporter).
+        An active user filter is rebuilt afterwards.
+        """
+        if not self.repository:
+            raise ZenithAuthError("Repository not configured.")
+        importer = BulkImporter(
+            self.repository,
+            self.security,
+            batch_size=batch_size,
+            workers=workers,
+            ordered=ordered,
+            checkpoint_path=checkpoint_path,
+        )
+        report = await importer.run(path)
+        if self.user_filter is not None and self.user_filter.ready and report.imported:
+            # Imported rows bypass save_user
+            await self.build_user_filter(batch_size)
+        return report
+
+    async def hash_format_report(self, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Counts stored password hashes by format, streaming users through the
+        repository. "argon2id_outdated" are Argon2id hashes with old parameters;
+        every non-"argon2id" entry is upgraded on that user's next login.
+        """
+        if not self.repository:
+            raise ZenithAuthError("Repository not configured.")
+        counts: Dict[str, int] = {}
+        async for user in self.repository.iter_users(batch_size=batch_size):
+            scheme = scheme_of(user.hashed_password) or "unknown"
+            if scheme == HashRegistry.CURRENT and self.security.needs_rehash(user.hashed_password):
+                scheme = "argon2id_outdated"
+            counts[scheme] = counts.get(scheme, 0) + 1
+        return counts
+
     # --- MFA ENROLLMENT ---
 
     async def mfa_enroll_setup(self, user_id: str, email: str) -> dict:
@@ -1,4 +1,4 @@
-from typing import Protocol, Optional, Any
+from typing import Protocol, Optional, Any, AsyncIterator, List
 from zenithauth.core.identity import UserInDB
 
 class UserRepositoryProtocol(Protocol):
@@ -13,4 +13,18 @@ class UserRepositoryProtocol(Protocol):
         ...
 
     async def save_user(self, user: UserInDB) -> UserInDB:
-        ...
\ No newline at end of file
+        ...
+
+    async def save_users(self, users: List[UserInDB]) -> None:
+        """
+        Upserts many users in one round trip (e.g. executemany / COPY).
+        Used by bulk import; must be idempotent so resumed imports are safe.
+        """
+        ...
+
+    def iter_users(self, batch_size: int = 1000) -> AsyncIterator[UserInDB]:
+        """
+        Streams every user (e.g. keyset pagination, `batch_size` rows per query).
+        Used by maintenance jobs such as the legacy-hash report.
+        """
+        ...
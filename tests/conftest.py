@@ -0,0 +1,7 @@
+import pytest
+import fakeredis
+
+@pytest.fixture
+def fake_redis():
+    """In-process Redis stand-in (with Lua support) for script-level tests."""
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
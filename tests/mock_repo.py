@@ -1,4 +1,4 @@
-from typing import Optional, Dict
+from typing import AsyncIterator, Optional, Dict, List
 from zenithauth.core.identity import UserInDB
 from zenithauth.protocols.user_repo import UserRepositoryProtocol
 
@@ -17,4 +17,12 @@ class MockUserRepository(UserRepositoryProtocol):
 
     async def save_user(self, user: UserInDB) -> UserInDB:
         self.users[user.id] = user
-        return user
\ No newline at end of file
+        return user
+
+    async def save_users(self, users: List[UserInDB]) -> None:
+        for user in users:
+            self.users[user.id] = user
+
+    async def iter_users(self, batch_size: int = 1000) -> AsyncIterator[UserInDB]:
+        for user in list(self.users.values()):
+            yield user
@@ -0,0 +1,51 @@
+import pytest
+from zenithauth.core.activity import ActivityTracker
+
+@pytest.mark.asyncio
+async def test_hits_coalesce_into_one_flush(fake_redis):
+    tracker = ActivityTracker(fake_redis, flush_interval=60)
+    for ts in range(100):
+        tracker.record("u1", "s1", timestamp=1000.0 + ts)
+    tracker.record("u1", "s2", timestamp=500.0)
+    await tracker.stop()
+
+    assert await tracker.last_seen("u1") == 1099.0
+    assert await tracker.sessions_last_seen("u1") == {"s1": 1099.0, "s2": 500.0}
+    stats = tracker.stats()
+    assert stats["hits"] == 101 and stats["writes"] == 2
+    assert stats["writes_saved"] == 99
+
+@pytest.mark.asyncio
+async def test_full_buffer_drops_new_keys(fake_redis):
+    tracker = ActivityTracker(fake_redis, flush_interval=60, max_buffer=2)
+    tracker.record("u1", "s1")
+    tracker.record("u2", "s1")
+    tracker.record("u3", "s1")
+    tracker.record("u1", "s1")  # existing keys still update
+    assert tracker.stats()["dropped"] == 1
+    await tracker.stop()
+    assert await tracker.last_seen("u3") is None
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_hits_up_to_the_buffer_limit(fake_redis):
+    tracker = ActivityTracker(fake_redis, flush_interval=60, max_buffer=2)
+    tracker.record("u1", "s1", timestamp=100.0)
+    tracker.record("u2", "s1", timestamp=100.0)
+    push = tracker._push
+
+    async def broken(pending):
+        # Hits keep arriving while the write is in flight
+        tracker.record("u1", "s1", timestamp=200.0)
+        tracker.record("u3", "s1", timestamp=200.0)
+        raise ConnectionError("down")
+
+    tracker._push = broken
+    with pytest.raises(ConnectionError):
+        await tracker.flush()
+    assert tracker.stats()["dropped"] == 1 and tracker.stats()["buffered"] == 2
+
+    tracker._push = push
+    await tracker.stop()
+    assert await tracker.last_seen("u1") == 200.0
+    assert await tracker.last_seen("u3") == 200.0
+    assert await tracker.last_seen("u2") is None
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+import pytest
+from zenithauth.core.admission import HashScheduler
+from zenithauth.core.exceptions import AuthOverloadedError
+
+def scheduler(slots=1, **kwargs):
+    return HashScheduler(memory_budget_kib=slots * 65536, memory_cost_kib=65536, **kwargs)
+
+@pytest.mark.asyncio
+async def test_memory_budget_caps_concurrency():
+    sched = scheduler(slots=2)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return "ok"
+
+    results = await asyncio.gather(*(sched.run(f"ip{i}", work) for i in range(6)))
+    assert results == ["ok"] * 6 and peak[0] == 2
+    stats = sched.snapshot()
+    assert stats["admitted"] == 6 and stats["queue_depth"] == 0 and stats["peak_depth"] == 4
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_immediately():
+    sched = scheduler(max_queue=2)
+    gate = threading.Event()
+    blocker = asyncio.ensure_future(sched.run("a", gate.wait))
+    await asyncio.sleep(0.01)
+    queued = [asyncio.ensure_future(sched.run(k, lambda: None)) for k in ("b", "c")]
+    await asyncio.sleep(0)
+    with pytest.raises(AuthOverloadedError):
+        await sched.run("d", lambda: None)
+    gate.set()
+    await asyncio.gather(blocker, *queued)
+    assert sched.shed == 1 and sched.admitted == 3
+
+@pytest.mark.asyncio
+async def test_round_robin_and_per_key_cap():
+    sched = scheduler(max_per_key=2)
+    gate = threading.Event()
+    order = []
+    blocker = asyncio.ensure_future(sched.run("x", gate.wait))
+    await asyncio.sleep(0.01)
+    jobs = [asyncio.ensure_future(sched.run(k, order.append, f"{k}{i}"))
+            for i, k in enumerate(["noisy", "noisy"])]
+    await asyncio.sleep(0)
+    with pytest.raises(AuthOverloadedError):
+        await sched.run("noisy", order.append, "noisy-shed")
+    jobs.append(asyncio.ensure_future(sched.run("quiet", order.append, "quiet")))
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *jobs)
+    assert order == ["noisy0", "quiet", "noisy1"]
+
+@pytest.mark.asyncio
+async def test_queue_deadline():
+    sched = scheduler(queue_timeout=0.05)
+    gate = threading.Event()
+    blocker = asyncio.ensure_future(sched.run("a", gate.wait))
+    await asyncio.sleep(0.01)
+    with pytest.raises(AuthOverloadedError, match="Timed out"):
+        await sched.run("b", lambda: None)
+    assert sched.timeouts == 1 and sched.queue_depth == 0
+    gate.set()
+    await blocker
+    # The slot is free again
+    assert await sched.run("c", lambda: 42) == 42
@@ -0,0 +1,30 @@
+import time
+import pytest
+from zenithauth.core.analytics import ActiveUserCounter
+
+@pytest.mark.asyncio
+async def test_distinct_counts_over_windows(fake_redis):
+    counter = ActiveUserCounter(fake_redis, bucket_seconds=60)
+    now = int(time.time()) - 7200
+    base = now - now % 60
+    for i in range(500):
+        counter.record("users", f"u{i}", timestamp=base + 10)
+        counter.record("users", f"u{i}", timestamp=base + 20)  # pre-aggregated away
+    for i in range(250, 1000):
+        counter.record("users", f"u{i}", timestamp=base + 3600)
+    await counter.flush()
+
+    first = await counter.count_between("users", base, base + 59)
+    assert abs(first - 500) <= 25
+    both = await counter.count("users", window_seconds=3600, end=base + 3600)
+    assert abs(both - 1000) <= 50
+    assert await counter.count_between("users", base + 600, base + 1200) == 0
+
+@pytest.mark.asyncio
+async def test_buckets_expire_after_retention(fake_redis):
+    counter = ActiveUserCounter(fake_redis, bucket_seconds=60, retention_seconds=3600)
+    counter.record("sessions", "s1")
+    await counter.stop()
+    keys = await fake_redis.keys("hll:{sessions}:*")
+    assert len(keys) == 1
+    assert 0 < await fake_redis.ttl(keys[0]) <= 3660
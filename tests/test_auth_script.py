@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime, timezone
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.routing import ReplicaRouter
+from zenithauth.core.scripts import AuthStatus, AUTH_CHECK_SCRIPT
+
+def payload(jti="j1", sub="u1", iat=None, fid=None):
+    if iat is None:
+        iat = int(datetime.now(timezone.utc).timestamp())
+    claims = {"jti": jti, "sub": sub, "iat": iat}
+    if fid:
+        claims["fid"] = fid
+    return claims
+
+@pytest.mark.asyncio
+async def test_script_loaded_once_then_evalsha(fake_redis):
+    store = RevocationStore("redis://unused", client=fake_redis)
+    assert await store.check(payload()) == AuthStatus.OK
+    assert (await fake_redis.script_exists(AUTH_CHECK_SCRIPT.sha)) == [True]
+
+@pytest.mark.asyncio
+async def test_revoked_jti(fake_redis):
+    store = RevocationStore("redis://unused", client=fake_redis)
+    await store.revoke("j1", int(datetime.now(timezone.utc).timestamp()) + 60)
+    assert await store.check(payload()) == AuthStatus.REVOKED
+
+@pytest.mark.asyncio
+async def test_user_epoch_rejects_older_tokens(fake_redis):
+    store = RevocationStore("redis://unused", client=fake_redis)
+    old = payload(iat=int(datetime.now(timezone.utc).timestamp()) - 10)
+    await store.revoke_user("u1", ttl=60)
+    assert await store.check(old) == AuthStatus.STALE_EPOCH
+
+    fresh = payload(jti="j2", iat=int(datetime.now(timezone.utc).timestamp()) + 1)
+    assert await store.check(fresh) == AuthStatus.OK
+
+@pytest.mark.asyncio
+async def test_rate_limit_counter(fake_redis):
+    store = RevocationStore("redis://unused", client=fake_redis)
+    results = [await store.check(payload(), rate_limit=2, rate_window=60) for _ in range(3)]
+    assert results == [AuthStatus.OK, AuthStatus.OK, AuthStatus.RATE_LIMITED]
+    assert 0 < await fake_redis.ttl("ratelimit:u1") <= 60
+
+class ClusterStylePipeline:
+    """Mimics redis-py's ClusterPipeline: multi-key EXISTS yields one reply per key."""
+    def __init__(self, pipe):
+        self._pipe = pipe
+
+    def exists(self, *keys):
+        for key in keys:
+            self._pipe.exists(key)
+
+    def __getattr__(self, name):
+        return getattr(self._pipe, name)
+
+class ClusterStyleClient:
+    def __init__(self, client):
+        self._client = client
+
+    def pipeline(self, transaction=False):
+        return ClusterStylePipeline(self._client.pipeline(transaction=transaction))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+@pytest.mark.asyncio
+async def test_cluster_fallback_checks_family_tokens(fake_redis):
+    router = ReplicaRouter(ClusterStyleClient(fake_redis))
+    router.cluster = True
+    store = RevocationStore("redis://unused", router=router)
+    now = int(datetime.now(timezone.utc).timestamp())
+    assert await store.check(payload(iat=now, fid="f1")) == AuthStatus.OK
+    await store.revoke_family("f1", ttl=60)
+    store._revoked_families.clear()
+    assert await store.check(payload(jti="j2", iat=now, fid="f1")) == AuthStatus.REVOKED
+
+@pytest.mark.asyncio
+async def test_consume_refresh_on_cluster_pipeline(fake_redis):
+    store = RevocationStore("redis://unused", client=ClusterStyleClient(fake_redis))
+    refresh = {**payload(jti="r1", fid="f1"), "exp": payload()["iat"] + 60, "rv": 0}
+    state = await store.consume_refresh(refresh)
+    assert not (state.reused or state.revoked)
+    await store.revoke_family("f1", ttl=60)
+    assert (await store.consume_refresh({**refresh, "jti": "r2"})).revoked
@@ -0,0 +1,149 @@
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.bloom import BloomFilter, UserFilter
+from zenithauth.core.identity import UserInDB
+from zenithauth.core.exceptions import InvalidCredentialsError, ZenithAuthError
+from .mock_repo import MockUserRepository
+
+def test_no_false_negatives_and_rate_near_target():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    bloom.update(f"user{i}@example.com" for i in range(5000))
+    assert all(f"user{i}@example.com" in bloom for i in range(5000))
+    false_hits = sum(f"other{i}@example.com" in bloom for i in range(20000)) / 20000
+    assert false_hits < 0.02
+    assert 0.005 < bloom.false_positive_rate() < 0.015
+
+def test_save_and_load_round_trip(tmp_path):
+    bloom = BloomFilter(capacity=100)
+    bloom.update(["a@example.com", "b@example.com"])
+    bloom.save(str(tmp_path / "users.bloom"))
+    loaded = BloomFilter.load(str(tmp_path / "users.bloom"))
+    assert "a@example.com" in loaded and loaded.items == 2
+    assert loaded.false_positive_rate() == bloom.false_positive_rate()
+
+async def setup(tmp_path):
+    settings = ZenithSettings(
+        ZENITH_SECRET_KEY="test-key", USER_FILTER=True, USER_FILTER_CAPACITY=1000,
+        USER_FILTER_PATH=str(tmp_path / "users.bloom"),
+        ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=8192, ARGON2_PARALLELISM=1,
+    )
+    repo = MockUserRepository()
+    auth = ZenithAuth(settings=settings, repository=repo)
+    hashed = auth.security.hash_password("correct-horse-9!")
+    await repo.save_user(UserInDB(id="u1", email="a@example.com", hashed_password=hashed))
+    return settings, repo, auth, hashed
+
+class CountingRepository(MockUserRepository):
+    def __init__(self, users):
+        super().__init__()
+        self.users = users
+        self.lookups = 0
+
+    async def get_by_email(self, email):
+        self.lookups += 1
+        return await super().get_by_email(email)
+
+@pytest.mark.asyncio
+async def test_unknown_email_skips_lookup_but_still_hashes(tmp_path):
+    settings, repo, auth, hashed = await setup(tmp_path)
+    stats = await auth.build_user_filter()
+    assert stats["items"] == 1
+    auth.repository = counting = CountingRepository(repo.users)
+
+    admitted = auth.hashing.admitted
+    with pytest.raises(InvalidCredentialsError):
+        await auth.authenticate("nobody@example.com", "whatever-password")
+    assert counting.lookups == 0 and auth.hashing.admitted == admitted + 1
+    assert auth.user_filter.negatives == 1
+
+    # Users saved through the manager are visible immediately
+    await auth.save_user(UserInDB(id="u2", email="New@example.com", hashed_password=hashed))
+    result = await auth.authenticate("New@example.com", "correct-horse-9!")
+    assert result["mfa_required"] is False and counting.lookups == 1
+    await auth.close()
+
+@pytest.mark.asyncio
+async def test_filter_warm_starts_from_disk(tmp_path):
+    settings, repo, auth, _ = await setup(tmp_path)
+    assert not auth.user_filter.ready
+    await auth.build_user_filter()
+    await auth.close()
+
+    restarted = ZenithAuth(settings=settings, repository=repo)
+    assert restarted.user_filter.ready
+    assert restarted.user_filter.might_exist("A@example.com")
+    assert not restarted.user_filter.might_exist("b@example.com")
+    await restarted.close()
+
+@pytest.mark.asyncio
+async def test_user_saved_before_a_crash_can_log_in(tmp_path):
+    settings, repo, auth, hashed = await setup(tmp_path)
+    await auth.build_user_filter()
+    await auth.save_user(UserInDB(id="u2", email="b@example.com", hashed_password=hashed))
+
+    # No close(): the filter file on disk predates u2
+    restarted = ZenithAuth(settings=settings, repository=repo)
+    assert restarted.user_filter.ready
+    result = await restarted.authenticate("b@example.com", "correct-horse-9!")
+    assert result["mfa_required"] is False
+    await restarted.close()
+
+@pytest.mark.asyncio
+async def test_users_saved_by_another_worker_can_log_in(tmp_path):
+    settings, repo, auth, hashed = await setup(tmp_path)
+    await auth.build_user_filter()
+    other = ZenithAuth(settings=settings, repository=repo)
+    assert not other.user_filter.might_exist("b@example.com")
+
+    await auth.save_user(UserInDB(id="u2", email="b@example.com", hashed_password=hashed))
+    result = await other.authenticate("b@example.com", "correct-horse-9!")
+    assert result["mfa_required"] is False
+    await auth.close()
+    await other.close()
+
+@pytest.mark.asyncio
+async def test_filter_without_its_journal_is_not_trusted(tmp_path):
+    path = str(tmp_path / "users.bloom")
+    user_filter = UserFilter(capacity=100, path=path)
+    user_filter.add("a@example.com")
+
+    async def scan():
+        yield UserInDB(id="u1", email="a@example.com", hashed_password="x")
+
+    await user_filter.build(scan())
+    (tmp_path / "users.bloom.journal").unlink()
+
+    restarted = UserFilter(capacity=100, path=path)
+    assert not restarted.ready
+    assert restarted.might_exist("b@example.com")
+
+def test_filter_requires_a_shared_path():
+    settings = ZenithSettings(ZENITH_SECRET_KEY="test-key", USER_FILTER=True)
+    with pytest.raises(ZenithAuthError, match="USER_FILTER_PATH"):
+        ZenithAuth(settings=settings, repository=MockUserRepository())
+
+@pytest.mark.asyncio
+async def test_users_must_be_saved_through_the_manager(tmp_path):
+    settings, repo, auth, hashed = await setup(tmp_path)
+    await auth.build_user_filter()
+    # Written around auth.save_user: unknown to the filter until a rebuild
+    await repo.save_user(UserInDB(id="u2", email="b@example.com", hashed_password=hashed))
+    with pytest.raises(InvalidCredentialsError):
+        await auth.authenticate("b@example.com", "correct-horse-9!")
+
+    await auth.build_user_filter()
+    result = await auth.authenticate("b@example.com", "correct-horse-9!")
+    assert result["mfa_required"] is False
+    await auth.close()
+
+@pytest.mark.asyncio
+async def test_users_saved_during_rebuild_are_kept():
+    user_filter = UserFilter(capacity=100)
+
+    async def scan():
+        yield UserInDB(id="u1", email="a@example.com", hashed_password="x")
+        user_filter.add("late@example.com")
+
+    await user_filter.build(scan())
+    assert user_filter.might_exist("late@example.com")
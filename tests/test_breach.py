@@ -0,0 +1,55 @@
+import hashlib
+import io
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.breach import BreachIndex, build_from_passwords, build_index, read_hibp
+from zenithauth.core.policy import WeakPasswordError
+from zenithauth.core.exceptions import ZenithAuthError
+
+BREACHED = ["password123!", "qwerty-123456", "letmein-2020"] + [f"leaked-{i}" for i in range(5000)]
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = str(tmp_path / "breached.idx")
+    build_from_passwords(BREACHED, path)
+    return path
+
+def test_lookup_hits_and_misses(index_path):
+    index = BreachIndex(index_path)
+    assert index.count == len(BREACHED)
+    assert all(index.contains_password(p) for p in BREACHED)
+    assert not index.contains_password("correct-horse-battery-staple-7!")
+    assert not index.contains_password("leaked-5000")
+
+def test_hibp_dump_format(tmp_path):
+    digests = sorted(hashlib.sha1(p.encode()).hexdigest().upper() for p in ("a1!", "b2@", "c3#"))
+    dump = io.StringIO("".join(f"{d}:{n}\r\n" for d, n in zip(digests, (1, 5, 9))))
+    path = str(tmp_path / "hibp.idx")
+    assert build_index(read_hibp(dump, min_count=2), path, digest_size=20, prefix_bits=8) == 2
+    index = BreachIndex(path)
+    assert bytes.fromhex(digests[0]) not in index
+    assert bytes.fromhex(digests[2]) in index
+
+def test_unsorted_input_is_rejected(tmp_path):
+    with pytest.raises(ZenithAuthError, match="sorted"):
+        build_index([b"\xff" * 20, b"\x00" * 20], str(tmp_path / "bad.idx"))
+
+@pytest.mark.parametrize("digest_size", [2, 3])
+def test_digests_shorter_than_the_prefix_are_rejected(tmp_path, digest_size):
+    with pytest.raises(ZenithAuthError, match="parameters"):
+        build_from_passwords(BREACHED, str(tmp_path / "short.idx"), digest_size=digest_size)
+
+def test_shortest_digest_still_finds_breached_passwords(tmp_path):
+    path = str(tmp_path / "short.idx")
+    build_from_passwords(BREACHED, path, digest_size=4)
+    index = BreachIndex(path)
+    assert all(index.contains_password(p) for p in BREACHED)
+
+def test_policy_rule_via_settings(index_path):
+    auth = ZenithAuth(settings=ZenithSettings(
+        ZENITH_SECRET_KEY="test-key", BREACHED_PASSWORDS_PATH=index_path
+    ))
+    with pytest.raises(WeakPasswordError, match="breach"):
+        auth.security.policy.validate("qwerty-123456")
+    assert auth.security.policy.validate("correct-horse-battery-staple-7!")
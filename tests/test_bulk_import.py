@@ -0,0 +1,122 @@
+import json
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.bulk_import import BulkImporter
+from .mock_repo import MockUserRepository
+
+def fast_auth(repo=None):
+    settings = ZenithSettings(
+        ZENITH_SECRET_KEY="test-key",
+        ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=8192, ARGON2_PARALLELISM=1,
+    )
+    return ZenithAuth(settings=settings, repository=repo or MockUserRepository())
+
+def write_jsonl(path, rows):
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n")
+    return str(path)
+
+@pytest.mark.asyncio
+async def test_csv_import_reports_bad_rows(tmp_path):
+    source = tmp_path / "users.csv"
+    source.write_text(
+        "id,email,password,roles\n"
+        "u1,a@example.com,correct-horse-9!,admin;reader\n"
+        "u2,not-an-email,correct-horse-9!,\n"
+        "u3,c@example.com,short,\n"
+        "u4,d@example.com,correct-horse-9!,\n"
+    )
+    auth = fast_auth()
+    report = await auth.import_users(str(source), workers=2, batch_size=2)
+
+    assert report.imported == 2
+    assert [(e.line, e.email) for e in report.errors] == [(3, "not-an-email"), (4, "c@example.com")]
+    users = auth.repository.users
+    assert users["u1"].roles == ["admin", "reader"]
+    assert auth.security.verify_password(users["u4"].hashed_password, "correct-horse-9!")
+
+@pytest.mark.asyncio
+async def test_malformed_jsonl_lines_are_row_errors(tmp_path):
+    source = tmp_path / "users.jsonl"
+    source.write_text(
+        json.dumps({"id": "u1", "email": "a@example.com", "password": "correct-horse-9!"}) + "\n"
+        '{"id": "u2", "email": \n'
+        '["not", "an", "object"]\n'
+        + json.dumps({"id": "u4", "email": "d@example.com", "password": "correct-horse-9!"}) + "\n"
+    )
+    auth = fast_auth()
+    report = await auth.import_users(str(source), workers=1)
+
+    assert report.imported == 2 and sorted(auth.repository.users) == ["u1", "u4"]
+    assert [e.line for e in report.errors] == [2, 3]
+    assert report.errors[0].reason.startswith("Invalid JSON")
+    assert report.errors[1].reason == "Row is not a JSON object."
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered", [True, False])
+async def test_ordering_and_prehashed_rows(tmp_path, ordered):
+    rows = [{"id": f"u{i}", "email": f"u{i}@example.com", "password": "correct-horse-9!"} for i in range(7)]
+    rows.insert(3, {"id": "legacy", "email": "l@example.com", "hashed_password": "pbkdf2_sha256$1$s$x"})
+    auth = fast_auth()
+    report = await auth.import_users(write_jsonl(tmp_path / "u.jsonl", rows), workers=3, ordered=ordered)
+
+    assert report.imported == 8 and not report.errors
+    assert auth.repository.users["legacy"].hashed_password == "pbkdf2_sha256$1$s$x"
+    if ordered:
+        assert list(auth.repository.users) == [r["id"] for r in rows]
+
+class FlakyRepository(MockUserRepository):
+    def __init__(self, fail_after: int):
+        super().__init__()
+        self.fail_after = fail_after
+
+    async def save_users(self, users):
+        if len(self.users) >= self.fail_after:
+            raise ConnectionError("database went away")
+        await super().save_users(users)
+
+@pytest.mark.asyncio
+async def test_interrupted_import_resumes_from_checkpoint(tmp_path):
+    rows = [{"id": f"u{i}", "email": f"u{i}@example.com", "password": "correct-horse-9!"} for i in range(10)]
+    source = write_jsonl(tmp_path / "u.jsonl", rows)
+    checkpoint = str(tmp_path / "import.ckpt")
+
+    repo = FlakyRepository(fail_after=4)
+    auth = fast_auth(repo)
+    with pytest.raises(ConnectionError):
+        await auth.import_users(source, checkpoint_path=checkpoint, batch_size=4, workers=1)
+    assert len(repo.users) == 4
+
+    repo.fail_after = 100
+    report = await BulkImporter(
+        repo, auth.security, batch_size=4, workers=1, checkpoint_path=checkpoint
+    ).run(source)
+    assert report.skipped == 4 and report.imported == 6
+    assert len(repo.users) == 10
+
+@pytest.mark.asyncio
+async def test_resumed_import_does_not_duplicate_rows_without_ids(tmp_path):
+    rows = [{"email": f"u{i}@example.com", "password": "correct-horse-9!"} for i in range(4)]
+    source = write_jsonl(tmp_path / "u.jsonl", rows)
+    checkpoint = str(tmp_path / "import.ckpt")
+
+    class LostCheckpoint(Exception):
+        pass
+
+    auth = fast_auth()
+    importer = BulkImporter(auth.repository, auth.security, batch_size=2, workers=1, checkpoint_path=checkpoint)
+    real_save = importer._save_checkpoint
+
+    def crash_after_first_write(path, position):
+        # Dies between save_users and the checkpoint write
+        raise LostCheckpoint()
+
+    importer._save_checkpoint = crash_after_first_write
+    with pytest.raises(LostCheckpoint):
+        await importer.run(source)
+    assert len(auth.repository.users) == 2
+
+    importer._save_checkpoint = real_save
+    report = await importer.run(source)
+    assert report.skipped == 0 and report.imported == 4
+    assert sorted(u.email for u in auth.repository.users.values()) == [r["email"] for r in rows]
@@ -0,0 +1,55 @@
+import pytest
+from zenithauth.core.revocation import RevocationStore, Consistency, STRICT, STATELESS
+
+class CountingClient:
+    def __init__(self):
+        self.keys = set()
+        self.calls = 0
+
+    async def exists(self, key):
+        self.calls += 1
+        return int(key in self.keys)
+
+    async def setex(self, key, ttl, value):
+        self.keys.add(key)
+
+def make_store():
+    return RevocationStore("redis://localhost:6379/0", client=CountingClient())
+
+@pytest.mark.asyncio
+async def test_strict_always_hits_store():
+    store = make_store()
+    for _ in range(3):
+        assert await store.is_revoked("a", STRICT) is False
+    assert store.client.calls == 3
+
+@pytest.mark.asyncio
+async def test_bounded_reuses_local_answer():
+    store = make_store()
+    level = Consistency.bounded(30)
+    for _ in range(5):
+        assert await store.is_revoked("a", level) is False
+    assert store.client.calls == 1
+    assert store.metrics.snapshot()["bounded"] == {"checks": 5, "store_calls": 1, "saved": 4}
+
+@pytest.mark.asyncio
+async def test_bounded_expires_stale_answers():
+    store = make_store()
+    await store.is_revoked("a", Consistency.bounded(0))
+    store.client.keys.add("revoked:a")
+    assert await store.is_revoked("a", Consistency.bounded(0)) is True
+    assert store.client.calls == 2
+
+@pytest.mark.asyncio
+async def test_stateless_never_hits_store():
+    store = make_store()
+    store.client.keys.add("revoked:a")
+    assert await store.is_revoked("a", STATELESS) is False
+    assert store.client.calls == 0
+    assert store.metrics.snapshot()["stateless"]["saved"] == 1
+
+def test_satisfies_ordering():
+    assert STRICT.satisfies(Consistency.bounded(5))
+    assert Consistency.bounded(5).satisfies(Consistency.bounded(30))
+    assert not Consistency.bounded(30).satisfies(Consistency.bounded(5))
+    assert not STATELESS.satisfies(STRICT)
@@ -0,0 +1,54 @@
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.context import auth_context, current_principal
+from zenithauth.core.exceptions import ZenithAuthError
+
+def make_counting_auth():
+    settings = ZenithSettings(ZENITH_SECRET_KEY="test-key")
+    auth = ZenithAuth(settings=settings)
+    calls = []
+
+    async def check(payload, consistency=None, **kwargs):
+        calls.append(payload["jti"])
+        return 0
+
+    auth.revocation.check = check
+    return auth, calls
+
+@pytest.mark.asyncio
+async def test_authorize_memoized_within_context():
+    auth, calls = make_counting_auth()
+    tokens = auth.tokens.generate_auth_tokens(user_id="42", scopes=["admin"])
+
+    with auth_context():
+        await auth.authorize(tokens.access_token)
+        await auth.authorize_role(tokens.access_token, "admin")
+        assert current_principal()["sub"] == "42"
+
+    assert len(calls) == 1
+    assert current_principal() is None
+
+@pytest.mark.asyncio
+async def test_cookie_memoized_within_context():
+    auth, calls = make_counting_auth()
+    cookie = auth.cookies.encode("42", [])
+
+    with auth_context():
+        await auth.authorize_cookie(cookie)
+        payload, fresh = await auth.authorize_cookie(cookie)
+        assert payload["sub"] == "42" and fresh is None
+        # A memoized cookie is still not a bearer token
+        with pytest.raises(ZenithAuthError):
+            await auth.authorize(cookie)
+
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_authorize_without_context_always_checks():
+    auth, calls = make_counting_auth()
+    tokens = auth.tokens.generate_auth_tokens(user_id="42")
+
+    await auth.authorize(tokens.access_token)
+    await auth.authorize(tokens.access_token)
+    assert len(calls) == 2
@@ -0,0 +1,88 @@
+import sys
+import time
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.cookies import CookieSessionCodec
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.exceptions import RevokedTokenError, TokenExpiredError, ZenithAuthError
+
+@pytest.fixture
+def codec():
+    return CookieSessionCodec(b"k" * 32, roles=["reader", "admin"], max_age=3600)
+
+def test_roundtrip_is_compact(codec):
+    cookie = codec.encode("user-42", ["admin"])
+    session = codec.decode(cookie)
+    assert session.user_id == "user-42" and session.roles == ["admin"]
+    assert len(cookie) < 80
+
+def test_tampering_and_foreign_keys_are_rejected(codec):
+    cookie = codec.encode("user-42", ["reader"])
+    flipped = cookie[:10] + ("A" if cookie[10] != "A" else "B") + cookie[11:]
+    with pytest.raises(ZenithAuthError):
+        codec.decode(flipped)
+    other = CookieSessionCodec(b"x" * 32, roles=["reader"], max_age=3600)
+    with pytest.raises(ZenithAuthError):
+        other.decode(cookie)
+
+def test_unknown_role_is_refused(codec):
+    with pytest.raises(ZenithAuthError):
+        codec.encode("user-42", ["root"])
+
+def test_expiry_and_half_life_reissue(codec):
+    now = int(time.time())
+    young = codec.decode(codec.encode("u", [], issued_at=now - 60))
+    old = codec.decode(codec.encode("u", [], issued_at=now - 2000))
+    assert not codec.needs_reissue(young)
+    assert codec.needs_reissue(old)
+    assert codec.decode(codec.reissue(old)).session_id == old.session_id
+    with pytest.raises(TokenExpiredError):
+        codec.decode(codec.encode("u", [], issued_at=now - 3600))
+
+@pytest.fixture
+def auth(fake_redis):
+    manager = ZenithAuth(settings=ZenithSettings(
+        ZENITH_SECRET_KEY="test-key", COOKIE_ROLES=["reader", "admin"], COOKIE_SECURE=False
+    ))
+    manager.revocation = RevocationStore("redis://unused", client=fake_redis)
+    return manager
+
+@pytest.mark.asyncio
+async def test_cookie_shares_revocation_semantics(auth):
+    cookie = await auth.issue_cookie("42", ["admin"])
+    payload, fresh = await auth.authorize_cookie(cookie)
+    assert auth.authorizer.has_role(payload, "admin") and fresh is None
+
+    await auth.logout_cookie(cookie)
+    with pytest.raises(RevokedTokenError):
+        await auth.authorize_cookie(cookie)
+
+    # Issued in an earlier second; same-second sessions stay valid (iat == epoch)
+    other = auth.cookies.encode("42", [], issued_at=int(time.time()) - 1)
+    await auth.logout_all("42")
+    with pytest.raises(RevokedTokenError):
+        await auth.authorize_cookie(other)
+
+def test_fastapi_cookie_dependency(auth):
+    pytest.importorskip("fastapi")
+    sys.path.insert(0, ".")
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+    from integrations.fastapi import ZenithAuthFastAPI
+
+    zenith = ZenithAuthFastAPI(auth)
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user: dict = Depends(zenith.cookie_session())):
+        return {"sub": user["sub"]}
+
+    client = TestClient(app)
+    assert client.get("/me").status_code == 401
+
+    old = auth.cookies.encode("42", ["reader"], issued_at=int(time.time()) - 30000)
+    client.cookies.set("zenith_session", old)
+    response = client.get("/me")
+    assert response.json() == {"sub": "42"}
+    assert response.cookies.get("zenith_session") not in (None, old)
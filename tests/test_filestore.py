@@ -0,0 +1,86 @@
+import os
+import time
+import pytest
+from zenithauth.core.filestore import RECORD, FileRevocationStore, _digest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+
+@pytest.mark.asyncio
+async def test_survives_restart_without_full_replay(tmp_path):
+    path = str(tmp_path / "rev")
+    store = FileRevocationStore(path)
+    await store.revoke("j1", int(time.time()) + 300)
+    store.close()
+
+    reopened = FileRevocationStore(path)
+    assert await reopened.is_revoked("j1") is True
+    # The index already covers the whole log, so nothing was replayed
+    assert reopened._header()[6] == os.path.getsize(f"{path}.1.log")
+
+@pytest.mark.asyncio
+async def test_replays_only_unindexed_tail(tmp_path):
+    path = str(tmp_path / "rev")
+    store = FileRevocationStore(path)
+    await store.revoke("j1", int(time.time()) + 300)
+    # Simulate a crash after the log append but before the index update
+    store._set_header(0, 0)
+    store.close()
+
+    assert await FileRevocationStore(path).is_revoked("j1") is True
+
+@pytest.mark.asyncio
+async def test_torn_trailing_record_is_truncated(tmp_path):
+    path = str(tmp_path / "rev")
+    store = FileRevocationStore(path)
+    await store.revoke("j1", int(time.time()) + 300)
+    store.close()
+    with open(f"{path}.1.log", "ab") as log:
+        log.write(b"torn")  # crash in the middle of an append
+
+    reopened = FileRevocationStore(path)
+    await reopened.revoke("j2", int(time.time()) + 300)
+    reopened.close()
+    # The new record follows the last whole one, where the index offset points
+    with open(f"{path}.1.log", "rb") as log:
+        records = list(RECORD.iter_unpack(log.read()))
+    assert [r[0] for r in records] == [_digest("jti:j1"), _digest("jti:j2")]
+
+@pytest.mark.asyncio
+async def test_compaction_starts_on_first_use_and_stops_on_close(tmp_path):
+    settings = ZenithSettings(
+        ZENITH_SECRET_KEY="test-key", REVOCATION_BACKEND="file",
+        REVOCATION_FILE_PATH=str(tmp_path / "rev"),
+    )
+    auth = ZenithAuth(settings=settings)
+    assert auth.revocation._compactor is None
+    tokens = auth.tokens.generate_auth_tokens(user_id="u1")
+    await auth.authorize(tokens.access_token)
+    task = auth.revocation._compactor
+    assert task is not None and not task.done()
+    await auth.close()
+    assert task.done() and auth.revocation._mm is None
+
+@pytest.mark.asyncio
+async def test_readers_see_writes_and_compaction(tmp_path):
+    path = str(tmp_path / "rev")
+    writer = FileRevocationStore(path)
+    reader = FileRevocationStore(path, readonly=True)
+
+    await writer.revoke("gone", int(time.time()) + 1)
+    await writer.revoke("kept", int(time.time()) + 300)
+    assert await reader.is_revoked("kept") is True
+
+    time.sleep(1.1)
+    assert writer.compact() == 1
+    assert not os.path.exists(f"{path}.1.log")
+    # The reader re-maps the new generation transparently
+    await writer.revoke("new", int(time.time()) + 300)
+    assert await reader.is_revoked("new") is True
+    assert await reader.is_revoked("kept") is True
+
+@pytest.mark.asyncio
+async def test_index_grows(tmp_path):
+    store = FileRevocationStore(str(tmp_path / "rev"), initial_capacity=1024)
+    await store.revoke_many([(f"j{i}", int(time.time()) + 300) for i in range(2000)])
+    assert store._header()[3] >= 4096
+    assert all((await store.is_revoked_many([f"j{i}" for i in range(2000)])).values())
@@ -0,0 +1,69 @@
+import asyncio
+import base64
+import hashlib
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.hashers import scheme_of
+from zenithauth.core.identity import UserInDB
+from zenithauth.core.exceptions import InvalidCredentialsError
+from .mock_repo import MockUserRepository
+
+PASSWORD = "correct-horse-9!"
+
+def pbkdf2_hash(password, salt="saltsalt", iterations=1000):
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations)
+    return f"pbkdf2_sha256${iterations}${salt}${base64.b64encode(dk).decode()}"
+
+def scrypt_hash(password, salt="saltsalt", n=1024, r=8, p=1):
+    dk = hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=r, p=p, dklen=64)
+    return f"scrypt${n}${salt}${r}${p}${base64.b64encode(dk).decode()}"
+
+def fast_auth():
+    settings = ZenithSettings(
+        ZENITH_SECRET_KEY="test-key",
+        ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=8192, ARGON2_PARALLELISM=1,
+    )
+    return ZenithAuth(settings=settings, repository=MockUserRepository())
+
+def test_scheme_detection():
+    assert scheme_of("$argon2id$v=19$m=65536,t=3,p=4$abc$def") == "argon2id"
+    assert scheme_of("$2b$12$abcdefghijklmnopqrstuv") == "2b"
+    assert scheme_of(pbkdf2_hash("x")) == "pbkdf2_sha256"
+    assert scheme_of(scrypt_hash("x")) == "scrypt"
+    assert scheme_of("plaintext") == ""
+
+@pytest.mark.parametrize("make", [pbkdf2_hash, scrypt_hash])
+def test_legacy_formats_verify(make):
+    security = fast_auth().security
+    assert security.verify_password(make(PASSWORD), PASSWORD)
+    with pytest.raises(InvalidCredentialsError):
+        security.verify_password(make(PASSWORD), "wrong-password-1!")
+    assert security.needs_rehash(make(PASSWORD))
+
+def test_bcrypt_verifies():
+    bcrypt = pytest.importorskip("bcrypt")
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode()
+    assert fast_auth().security.verify_password(hashed, PASSWORD)
+
+def test_unknown_or_malformed_hash_is_a_failed_login():
+    security = fast_auth().security
+    for hashed in ("plaintext", "md5$abc", "pbkdf2_sha256$broken"):
+        with pytest.raises(InvalidCredentialsError):
+            security.verify_password(hashed, PASSWORD)
+
+@pytest.mark.asyncio
+async def test_login_upgrades_legacy_hash_and_report_tracks_it():
+    auth = fast_auth()
+    repo = auth.repository
+    await repo.save_user(UserInDB(id="u1", email="a@example.com", hashed_password=pbkdf2_hash(PASSWORD)))
+    await repo.save_user(UserInDB(id="u2", email="b@example.com", hashed_password=scrypt_hash(PASSWORD)))
+    await repo.save_user(UserInDB(
+        id="u3", email="c@example.com", hashed_password=auth.security.rehash(PASSWORD)
+    ))
+    assert await auth.hash_format_report() == {"pbkdf2_sha256": 1, "scrypt": 1, "argon2id": 1}
+
+    await auth.authenticate("a@example.com", PASSWORD)
+    await asyncio.gather(*auth._background)
+    assert scheme_of(repo.users["u1"].hashed_password) == "argon2id"
+    assert await auth.hash_format_report() == {"argon2id": 2, "scrypt": 1}
@@ -22,4 +22,22 @@ def test_qr_generation():
     qr_b64 = handler.generate_qr_base64(uri)
     
     assert isinstance(qr_b64, str)
-    assert len(qr_b64) > 100 # Should be a substantial string
\ No newline at end of file
+    assert len(qr_b64) > 100 # Should be a substantial string
+
+def test_verifier_matches_pyotp_across_the_window():
+    handler = MFAHandler()
+    secret = handler.generate_secret()
+    totp = pyotp.TOTP(secret)
+    now = 1_700_000_000
+    for offset in (-60, -30, 0, 30, 60):
+        code = totp.at(now + offset)
+        expected = totp.verify(code, for_time=now, valid_window=1)
+        assert handler.verifier.verify(secret, code, for_time=now) is expected
+    assert handler.verifier.now(secret, for_time=now) == totp.at(now)
+
+def test_verify_many_and_malformed_codes():
+    handler = MFAHandler()
+    secrets = [handler.generate_secret() for _ in range(3)]
+    items = [(s, pyotp.TOTP(s).now()) for s in secrets]
+    items += [(secrets[0], "12345"), (secrets[0], "１２３４５６"), (secrets[0], None)]
+    assert handler.verify_many(items) == [True, True, True, False, False, False]
@@ -0,0 +1,66 @@
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.opaque import OpaqueTokenStore, is_opaque
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.exceptions import RevokedTokenError, ZenithAuthError
+
+@pytest.fixture
+def auth(fake_redis):
+    manager = ZenithAuth(settings=ZenithSettings(ZENITH_SECRET_KEY="test-key", TOKEN_FORMAT="opaque"))
+    manager.revocation = RevocationStore("redis://unused", client=fake_redis)
+    manager.tokens.opaque = OpaqueTokenStore(fake_redis)
+    return manager
+
+@pytest.mark.asyncio
+async def test_opaque_tokens_carry_no_claims(auth, fake_redis):
+    tokens = await auth._issue_tokens("42", ["admin"])
+    assert is_opaque(tokens.access_token) and tokens.access_token.startswith("zat_")
+    assert tokens.refresh_token.startswith("zrt_")
+    # The raw handle is never stored as a key
+    assert not await fake_redis.exists(tokens.access_token)
+
+    payload = await auth.authorize(tokens.access_token)
+    assert payload["sub"] == "42" and payload["scopes"] == ["admin"]
+
+@pytest.mark.asyncio
+async def test_authorize_accepts_both_formats(auth):
+    jwt_pair = auth.tokens.generate_auth_tokens("7")
+    opaque_pair = await auth._issue_tokens("8", [])
+    assert (await auth.authorize(jwt_pair.access_token))["sub"] == "7"
+    assert (await auth.authorize(opaque_pair.access_token))["sub"] == "8"
+
+@pytest.mark.asyncio
+async def test_refresh_handle_is_not_a_bearer_credential(auth):
+    first = await auth._issue_tokens("42", [])
+    await auth.refresh(first.refresh_token)
+    with pytest.raises(ZenithAuthError, match="Not an access token"):
+        await auth.authorize(first.refresh_token)
+
+@pytest.mark.asyncio
+async def test_refresh_and_logout(auth):
+    first = await auth._issue_tokens("42", ["admin"])
+    second = await auth.refresh(first.refresh_token)
+    assert is_opaque(second.access_token) and second.family_id == first.family_id
+
+    await auth.logout(second.access_token)
+    with pytest.raises(ZenithAuthError):
+        await auth.authorize(second.access_token)
+    with pytest.raises(RevokedTokenError):
+        await auth.refresh(second.refresh_token)
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_mget(fake_redis):
+    import asyncio
+    store = OpaqueTokenStore(fake_redis)
+    claims = [{"sub": str(i), "exp": 2**40} for i in range(20)]
+    handles = await store.issue_many([("zat_", c) for c in claims])
+    fresh = OpaqueTokenStore(fake_redis)
+
+    results = await asyncio.gather(*(fresh.introspect(h) for h in handles + ["zat_unknown"]))
+    assert [r["sub"] for r in results[:-1]] == [str(i) for i in range(20)]
+    assert results[-1] is None
+    assert fresh.batches == 1
+
+    await fresh.introspect_many(handles)  # served from the local cache
+    assert fresh.batches == 1
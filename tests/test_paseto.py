@@ -0,0 +1,84 @@
+import time
+from datetime import timedelta
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.paseto import PasetoV4Local, PasetoV4Public, hchacha20, pae, xchacha20
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.exceptions import RevokedTokenError, TokenExpiredError, ZenithAuthError
+
+def test_hchacha20_vector():
+    # draft-irtf-cfrg-xchacha, section 2.2.1
+    key = bytes(range(32))
+    nonce = bytes.fromhex("000000090000004a0000000031415927")
+    assert hchacha20(key, nonce).hex() == (
+        "82413b4227b27bfed30e42508a877d73a0f9e4d58a74a853c12ec41326d3ecdc"
+    )
+
+def test_pae_encoding():
+    assert pae() == b"\x00" * 8
+    assert pae(b"") == b"\x01" + b"\x00" * 15
+    assert pae(b"test") == b"\x01" + b"\x00" * 7 + b"\x04" + b"\x00" * 7 + b"test"
+
+@pytest.mark.parametrize("engine", [PasetoV4Local(bytes(32)), PasetoV4Public(bytes(32))])
+def test_roundtrip_and_tamper(engine):
+    claims = {"sub": "42", "exp": 2_000_000_000, "iat": 1_700_000_000, "scopes": ["admin"]}
+    token = engine.encode(claims)
+    assert token.startswith(engine.HEADER)
+    assert engine.decode(token) == claims
+
+    tampered = token[:-4] + ("AAAA" if token[-4:] != "AAAA" else "BBBB")
+    with pytest.raises(ZenithAuthError):
+        engine.decode(tampered)
+    with pytest.raises(ZenithAuthError):
+        engine.decode(token + ".footer")
+
+def test_local_tokens_hide_claims():
+    token = PasetoV4Local(bytes(32)).encode({"sub": "secret-subject"})
+    assert b"secret-subject" not in token.encode()
+    with pytest.raises(ZenithAuthError):
+        PasetoV4Local(b"\x01" * 32).decode(token)
+
+def test_verify_only_public_engine():
+    signer = PasetoV4Public(private_key=b"\x07" * 32)
+    verifier = PasetoV4Public(public_key=signer.public_key)
+    assert verifier.decode(signer.encode({"sub": "1"})) == {"sub": "1"}
+    with pytest.raises(ZenithAuthError):
+        verifier.encode({"sub": "1"})
+
+def test_xchacha20_is_an_involution():
+    key, nonce = b"\x02" * 32, b"\x03" * 24
+    assert xchacha20(key, nonce, xchacha20(key, nonce, b"hello")) == b"hello"
+
+@pytest.fixture(params=["public", "local"])
+def auth(request, fake_redis):
+    manager = ZenithAuth(settings=ZenithSettings(
+        ZENITH_SECRET_KEY="test-key", TOKEN_FORMAT="paseto", PASETO_PURPOSE=request.param
+    ))
+    manager.revocation = RevocationStore("redis://unused", client=fake_redis)
+    return manager
+
+@pytest.mark.asyncio
+async def test_manager_flows_with_paseto(auth):
+    tokens = auth.tokens.generate_auth_tokens("42", scopes=["admin"])
+    assert tokens.access_token.startswith("v4.")
+
+    payload = await auth.authorize_role(tokens.access_token, "admin")
+    assert payload["sub"] == "42" and isinstance(payload["exp"], int)
+
+    rotated = await auth.refresh(tokens.refresh_token)
+    await auth.logout(rotated.access_token)
+    with pytest.raises(RevokedTokenError):
+        await auth.authorize(tokens.access_token)
+
+def test_expired_paseto_token(auth):
+    claims = auth.tokens.build_claims("42", expires_delta=timedelta(0))
+    claims["exp"] = int(time.time()) - 1
+    with pytest.raises(TokenExpiredError):
+        auth.tokens.decode_token(auth.tokens.paseto.encode(claims))
+
+def test_paseto_rejected_when_not_configured():
+    tokens = ZenithAuth(settings=ZenithSettings(ZENITH_SECRET_KEY="test-key")).tokens
+    token = PasetoV4Public(bytes(32)).encode({"sub": "1"})
+    with pytest.raises(ZenithAuthError):
+        tokens.decode_token(token)
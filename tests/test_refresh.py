@@ -0,0 +1,70 @@
+import time
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.exceptions import (
+    RefreshTokenReuseError, RevokedTokenError, ZenithAuthError
+)
+
+@pytest.fixture
+def auth(fake_redis):
+    manager = ZenithAuth(settings=ZenithSettings(ZENITH_SECRET_KEY="test-key"))
+    manager.revocation = RevocationStore("redis://unused", client=fake_redis)
+    return manager
+
+@pytest.mark.asyncio
+async def test_rotation_carries_roles_and_family(auth):
+    first = auth.tokens.generate_auth_tokens(user_id="42", scopes=["admin"])
+    second = await auth.refresh(first.refresh_token)
+
+    access = await auth.authorize(second.access_token)
+    assert access["scopes"] == ["admin"]
+    assert second.family_id == first.family_id
+    assert second.refresh_token != first.refresh_token
+
+@pytest.mark.asyncio
+async def test_reuse_revokes_family(auth):
+    first = auth.tokens.generate_auth_tokens(user_id="42")
+    second = await auth.refresh(first.refresh_token)
+
+    with pytest.raises(RefreshTokenReuseError):
+        await auth.refresh(first.refresh_token)
+    with pytest.raises(RevokedTokenError):
+        await auth.authorize(second.access_token)
+    with pytest.raises(RevokedTokenError):
+        await auth.refresh(second.refresh_token)
+
+@pytest.mark.asyncio
+async def test_role_change_forces_login(auth):
+    read_before = int(time.time()) - 1
+    tokens = auth.tokens.generate_auth_tokens(
+        user_id="42", scopes=["admin"], roles_version=read_before
+    )
+    await auth.revoke_roles("42")
+    with pytest.raises(RevokedTokenError, match="Roles have changed"):
+        await auth.refresh(tokens.refresh_token)
+
+@pytest.mark.asyncio
+async def test_login_right_after_role_change_can_refresh(auth):
+    await auth.revoke_roles("42")
+    tokens = auth.tokens.generate_auth_tokens(user_id="42", scopes=["reader"])
+    assert (await auth.refresh(tokens.refresh_token)).family_id == tokens.family_id
+
+@pytest.mark.asyncio
+async def test_access_token_cannot_refresh(auth):
+    tokens = auth.tokens.generate_auth_tokens(user_id="42")
+    with pytest.raises(ZenithAuthError, match="Not a refresh token"):
+        await auth.refresh(tokens.access_token)
+
+@pytest.mark.asyncio
+async def test_refresh_token_is_not_a_bearer_credential(auth):
+    first = auth.tokens.generate_auth_tokens(user_id="42")
+    await auth.refresh(first.refresh_token)
+    with pytest.raises(ZenithAuthError, match="Not an access token"):
+        await auth.authorize(first.refresh_token)
+
+def test_refresh_token_grants_no_scopes(auth):
+    tokens = auth.tokens.generate_auth_tokens(user_id="42", scopes=["admin"])
+    payload = auth.tokens.decode_token(tokens.refresh_token)
+    assert payload["scopes"] == [] and payload["roles"] == ["admin"]
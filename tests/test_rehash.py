@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from argon2 import PasswordHasher
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.calibration import MIN_MEMORY_KIB, calibrate
+from zenithauth.core.identity import UserInDB
+from zenithauth.core.exceptions import InvalidCredentialsError
+from .mock_repo import MockUserRepository
+
+PASSWORD = "correct-horse-9!"
+
+async def setup():
+    settings = ZenithSettings(
+        ZENITH_SECRET_KEY="test-key",
+        ARGON2_TIME_COST=2, ARGON2_MEMORY_COST=16384, ARGON2_PARALLELISM=1,
+    )
+    repo = MockUserRepository()
+    auth = ZenithAuth(settings=settings, repository=repo)
+    legacy = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1).hash(PASSWORD)
+    await repo.save_user(UserInDB(id="u1", email="a@example.com", hashed_password=legacy))
+    return auth, repo, legacy
+
+@pytest.mark.asyncio
+async def test_outdated_hash_is_upgraded_after_login():
+    auth, repo, legacy = await setup()
+    await auth.authenticate("a@example.com", PASSWORD)
+    await asyncio.gather(*auth._background)
+
+    upgraded = repo.users["u1"].hashed_password
+    assert upgraded != legacy and "m=16384,t=2,p=1" in upgraded
+    assert not auth.security.needs_rehash(upgraded)
+    # Still the same password
+    await auth.authenticate("a@example.com", PASSWORD)
+    assert not auth._background
+
+@pytest.mark.asyncio
+async def test_failed_login_does_not_rehash():
+    auth, repo, legacy = await setup()
+    with pytest.raises(InvalidCredentialsError):
+        await auth.authenticate("a@example.com", "wrong-password-1!")
+    await auth.close()
+    assert repo.users["u1"].hashed_password == legacy
+
+@pytest.mark.asyncio
+async def test_concurrent_logins_rehash_once():
+    auth, repo, legacy = await setup()
+    saves = []
+    save_user = repo.save_user
+
+    async def counting_save(user):
+        saves.append(user.id)
+        return await save_user(user)
+
+    repo.save_user = counting_save
+    await asyncio.gather(*(auth.authenticate("a@example.com", PASSWORD) for _ in range(3)))
+    await asyncio.gather(*auth._background)
+    assert saves == ["u1"]
+
+@pytest.mark.asyncio
+async def test_rehash_keeps_changes_saved_since_login():
+    auth, repo, legacy = await setup()
+    await auth.authenticate("a@example.com", PASSWORD)
+    # Saved while the rehash is still hashing
+    await repo.save_user(repo.users["u1"].model_copy(update={"roles": ["admin"]}))
+    await asyncio.gather(*auth._background)
+    user = repo.users["u1"]
+    assert user.roles == ["admin"] and user.hashed_password != legacy
+
+    # A password change in the meantime is never overwritten
+    await repo.save_user(user.model_copy(update={"hashed_password": legacy}))
+    await auth.authenticate("a@example.com", PASSWORD)
+    changed = auth.security.rehash("another-password-1!")
+    await repo.save_user(repo.users["u1"].model_copy(update={"hashed_password": changed}))
+    await asyncio.gather(*auth._background)
+    assert repo.users["u1"].hashed_password == changed
+
+def test_calibration_stays_within_target():
+    result = calibrate(target_ms=1000, memory_budget_mib=19, parallelism=1, max_time_cost=2)
+    assert result["ARGON2_MEMORY_COST"] == MIN_MEMORY_KIB
+    assert 1 <= result["ARGON2_TIME_COST"] <= 2
+    assert result["measured_ms"] <= 1000
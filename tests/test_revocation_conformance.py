@@ -0,0 +1,80 @@
+import time
+import pytest
+from zenithauth.core.revocation import RevocationStore, STATELESS
+from zenithauth.core.filestore import FileRevocationStore
+from zenithauth.core.scripts import AuthStatus
+
+@pytest.fixture(params=["redis", "file"])
+def store(request, fake_redis, tmp_path):
+    """Every revocation backend must pass the same behavioural contract."""
+    if request.param == "redis":
+        yield RevocationStore("redis://unused", client=fake_redis)
+    else:
+        file_store = FileRevocationStore(str(tmp_path / "revocations"))
+        yield file_store
+        file_store.close()
+
+def later(seconds=300):
+    return int(time.time()) + seconds
+
+@pytest.mark.asyncio
+async def test_revoke_and_lookup(store):
+    assert await store.is_revoked("j1") is False
+    await store.revoke("j1", later())
+    assert await store.is_revoked("j1") is True
+    assert await store.is_revoked("j2") is False
+
+@pytest.mark.asyncio
+async def test_already_expired_token_is_not_stored(store):
+    await store.revoke("old", int(time.time()) - 5)
+    assert await store.is_revoked("old") is False
+
+@pytest.mark.asyncio
+async def test_batch_operations(store):
+    await store.revoke_many([("a", later()), ("b", later())])
+    assert await store.is_revoked_many(["a", "b", "c"]) == {"a": True, "b": True, "c": False}
+
+@pytest.mark.asyncio
+async def test_check_statuses(store):
+    now = int(time.time())
+    await store.revoke("j1", later())
+    assert await store.check({"jti": "j1", "sub": "u", "iat": now}) == AuthStatus.REVOKED
+
+    await store.revoke_user("u", ttl=60)
+    assert await store.check({"jti": "j2", "sub": "u", "iat": now - 10}) == AuthStatus.STALE_EPOCH
+    assert await store.check({"jti": "j3", "sub": "u", "iat": now + 1}) == AuthStatus.OK
+
+@pytest.mark.asyncio
+async def test_token_minted_in_the_epoch_second_is_valid(store):
+    await store.revoke_user("u", ttl=60)
+    now = int(time.time())
+    assert await store.check({"jti": "j1", "sub": "u", "iat": now}) == AuthStatus.OK
+
+@pytest.mark.asyncio
+async def test_rate_limit(store):
+    payload = {"jti": "j1", "sub": "u", "iat": int(time.time())}
+    statuses = [await store.check(payload, rate_limit=1) for _ in range(2)]
+    assert statuses == [AuthStatus.OK, AuthStatus.RATE_LIMITED]
+
+@pytest.mark.asyncio
+async def test_stateless_skips_lookup(store):
+    await store.revoke("j1", later())
+    assert await store.is_revoked("j1", STATELESS) is False
+    assert store.metrics.snapshot()["stateless"]["store_calls"] == 0
+
+@pytest.mark.asyncio
+async def test_family_revocation(store):
+    now = int(time.time())
+    await store.revoke_family("f1", ttl=60)
+    assert await store.check({"jti": "a", "sub": "u", "iat": now, "fid": "f1"}) == AuthStatus.REVOKED
+    assert await store.check({"jti": "b", "sub": "u", "iat": now, "fid": "f2"}) == AuthStatus.OK
+
+@pytest.mark.asyncio
+async def test_consume_refresh_detects_reuse(store):
+    payload = {"jti": "r1", "sub": "u", "iat": int(time.time()), "exp": later(), "fid": "f1", "rv": 0}
+    first = await store.consume_refresh(payload)
+    assert not (first.reused or first.revoked or first.stale_epoch or first.stale_roles)
+    assert (await store.consume_refresh(payload)).reused
+
+    await store.revoke_roles("u", ttl=60)
+    assert (await store.consume_refresh({**payload, "jti": "r2"})).stale_roles
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+import fakeredis
+from zenithauth.core.routing import ReplicaRouter
+from zenithauth.core.revocation import RevocationStore, bounded
+from zenithauth.core.scripts import AuthStatus
+
+class SlowClient:
+    """Wraps a client and delays every command, to emulate a lagging replica."""
+    def __init__(self, client, delay):
+        self._client = client
+        self.delay = delay
+        self.calls = 0
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        async def slow(*args, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            return await method(*args, **kwargs)
+        return slow
+
+def node():
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+@pytest.mark.asyncio
+async def test_writes_go_to_primary_bounded_reads_to_replica():
+    primary, replica = node(), node()
+    store = RevocationStore("redis://unused", router=ReplicaRouter(primary, [replica]))
+    await store.revoke("j1", 2**31)
+    assert await primary.exists("revoked:j1") == 1
+    # Revoked by another process; the replica has not caught up yet
+    await primary.set("revoked:j2", "true")
+    assert await store.is_revoked("j2", bounded(5)) is False
+    await replica.set("revoked:j3", "true")
+    assert await store.is_revoked("j3", bounded(5)) is True
+
+@pytest.mark.asyncio
+async def test_strict_reads_see_the_primary():
+    primary, replica = node(), node()
+    store = RevocationStore("redis://unused", router=ReplicaRouter(primary, [replica]))
+    await primary.set("revoked:j1", "true")
+    assert await store.is_revoked("j1") is True
+    assert await store.check({"jti": "j1", "sub": "u", "iat": 0}) == AuthStatus.REVOKED
+    assert await store.is_revoked_many(["j1"]) == {"j1": True}
+    assert store.router.replicas[0].samples == 0
+
+@pytest.mark.asyncio
+async def test_ewma_prefers_faster_replica():
+    slow, fast = SlowClient(node(), 0.02), SlowClient(node(), 0.0)
+    router = ReplicaRouter(node(), [slow, fast])
+    for _ in range(10):
+        await router.read(lambda c: c.exists("k"))
+    assert fast.calls >= 8
+    assert router.ranked()[0].client is fast
+
+@pytest.mark.asyncio
+async def test_hedged_read_uses_second_replica():
+    slow, fast = SlowClient(node(), 0.5), SlowClient(node(), 0.0)
+    router = ReplicaRouter(node(), [slow, fast], hedge_after=0.01)
+    # Make the slow replica look best so it is tried first
+    router.replicas[0].observe(0.0)
+    router.replicas[1].observe(0.1)
+    assert await asyncio.wait_for(router.read(lambda c: c.exists("k")), 0.3) == 0
+    assert router.hedged == 1
+
+@pytest.mark.asyncio
+async def test_failed_replica_falls_back_to_primary():
+    class Broken:
+        async def exists(self, key):
+            raise ConnectionError("down")
+
+    primary = node()
+    await primary.set("k", "1")
+    router = ReplicaRouter(primary, [Broken()])
+    assert await router.read(lambda c: c.exists("k")) == 1
+    assert router.fallbacks == 1
+    assert router.replicas[0].ewma == ReplicaRouter.ERROR_PENALTY
@@ -0,0 +1,66 @@
+import time
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.identity import UserInDB
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.sessions import SessionRegistry
+from zenithauth.core.exceptions import RevokedTokenError
+from .mock_repo import MockUserRepository
+
+@pytest.mark.asyncio
+async def test_register_trims_expired_and_evicts_oldest(fake_redis):
+    registry = SessionRegistry(fake_redis, max_sessions=2)
+    now = time.time()
+    await fake_redis.zadd("sessions:u", {"expired": now - 1})
+
+    assert await registry.register("u", "s1", now + 100) == []
+    assert await registry.register("u", "s2", now + 200) == []
+    assert await registry.register("u", "s3", now + 300) == ["s1"]
+    assert [s["session_id"] for s in await registry.list_sessions("u")] == ["s2", "s3"]
+    assert 0 < await fake_redis.ttl("sessions:u") <= 301
+
+@pytest.mark.asyncio
+async def test_scan_pages_through_all_users(fake_redis):
+    registry = SessionRegistry(fake_redis)
+    for i in range(25):
+        await registry.register(f"user{i}", "s", time.time() + 100)
+
+    seen, cursor = {}, 0
+    while True:
+        cursor, page = await registry.scan_sessions(cursor, count=10)
+        seen.update(page)
+        if cursor == 0:
+            break
+    assert len(seen) == 25
+
+@pytest.mark.asyncio
+async def test_login_over_limit_revokes_oldest_session(fake_redis):
+    settings = ZenithSettings(
+        ZENITH_SECRET_KEY="test-key", TRACK_SESSIONS=True, MAX_SESSIONS_PER_USER=1
+    )
+    repo = MockUserRepository()
+    auth = ZenithAuth(settings=settings, repository=repo)
+    auth.revocation = RevocationStore("redis://unused", client=fake_redis)
+    auth.sessions.client = fake_redis
+    await repo.save_user(UserInDB(
+        id="u1", email="a@example.com",
+        hashed_password=auth.security.hash_password("correct-horse-9!"),
+    ))
+
+    first = (await auth.authenticate("a@example.com", "correct-horse-9!"))["tokens"]
+    second = (await auth.authenticate("a@example.com", "correct-horse-9!"))["tokens"]
+
+    with pytest.raises(RevokedTokenError):
+        await auth.authorize(first.access_token)
+    assert (await auth.authorize(second.access_token))["sub"] == "u1"
+    assert [s["session_id"] for s in await auth.list_sessions("u1")] == [second.family_id]
+
+@pytest.mark.asyncio
+async def test_login_right_after_logout_all_succeeds(fake_redis):
+    auth = ZenithAuth(settings=ZenithSettings(ZENITH_SECRET_KEY="test-key"))
+    auth.revocation = RevocationStore("redis://unused", client=fake_redis)
+    await auth.logout_all("u1")
+    fresh = await auth._issue_tokens("u1", [])
+    assert (await auth.authorize(fresh.access_token))["sub"] == "u1"
+    assert (await auth.refresh(fresh.refresh_token)).access_token
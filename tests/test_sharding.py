@@ -0,0 +1,103 @@
+import pytest
+import fakeredis
+from zenithauth.core.sharding import HashRing
+from zenithauth.core.routing import ReplicaRouter
+from zenithauth.core.revocation import RevocationStore
+
+def shard():
+    return ReplicaRouter(
+        fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    )
+
+def test_ring_is_stable_and_balanced():
+    ring = HashRing(["a", "b", "c"])
+    keys = [f"jti-{i}" for i in range(3000)]
+    owners = {k: ring.node_for(k) for k in keys}
+    counts = {n: list(owners.values()).count(n) for n in ring.nodes}
+    assert all(700 < c < 1300 for c in counts.values())
+
+    ring.add("d")
+    moved = [k for k in keys if ring.node_for(k) != owners[k]]
+    # Only keys that now belong to the new node move
+    assert all(ring.node_for(k) == "d" for k in moved)
+    assert 450 < len(moved) < 1050
+
+@pytest.mark.asyncio
+async def test_batch_operations_route_per_shard():
+    store = RevocationStore("unused", shards={"n1": shard(), "n2": shard()})
+    jtis = [f"j{i}" for i in range(50)]
+    await store.revoke_many([(j, 2**31) for j in jtis[:25]])
+
+    result = await store.is_revoked_many(jtis)
+    assert [result[j] for j in jtis] == [True] * 25 + [False] * 25
+    for node, router in store.shards.items():
+        for key in await router.primary.keys("revoked:*"):
+            assert store.ring.node_for(key[len("revoked:"):]) == node
+
+@pytest.mark.asyncio
+async def test_add_shard_migrates_owned_keys():
+    store = RevocationStore("unused", shards={"n1": shard(), "n2": shard()})
+    jtis = [f"j{i}" for i in range(200)]
+    await store.revoke_many([(j, 2**31) for j in jtis])
+    await store.revoke_user("u1", ttl=60)
+
+    new = shard()
+    moved = await store.add_shard("n3", router=new, concurrency=2)
+    assert moved == len(await new.primary.keys("revoked:*")) > 0
+    assert await new.primary.exists("user_epoch:u1") == 1
+    migrated = (await new.primary.keys("revoked:*"))[0]
+    assert await new.primary.ttl(migrated) > 0
+
+    fresh = RevocationStore("unused", shards=store.shards)
+    assert all((await fresh.is_revoked_many(jtis)).values())
+
+@pytest.mark.asyncio
+async def test_old_ring_keeps_seeing_moved_revocations():
+    shards = {"n1": shard(), "n2": shard()}
+    store = RevocationStore("unused", shards=shards)
+    old_ring = RevocationStore("unused", shards=shards)
+    jtis = [f"j{i}" for i in range(200)]
+    await store.revoke_many([(j, 2**31) for j in jtis])
+
+    await store.add_shard("n3", router=shard())
+    old_ring._local.clear()
+    assert all((await old_ring.is_revoked_many(jtis)).values())
+
+@pytest.mark.asyncio
+async def test_writes_during_and_after_migration_reach_the_new_shard():
+    shards = {"n1": shard(), "n2": shard()}
+    store = RevocationStore("unused", shards=shards)
+    old_ring = RevocationStore("unused", shards=shards)
+    await store.revoke_user("u1", ttl=60)
+    new = shard()
+
+    rebalance = store._rebalance
+
+    async def revoke_mid_copy(*args):
+        # Another process, still on the old ring, revokes during the copy
+        if not await new.primary.exists("revoked_family:f1"):
+            await old_ring.revoke_family("f1", ttl=60)
+            await old_ring.client.set("user_epoch:u1", 2**31, ex=60)
+        return await rebalance(*args)
+
+    store._rebalance = revoke_mid_copy
+    await store.add_shard("n3", router=new)
+    assert await new.primary.exists("revoked_family:f1") == 1
+    assert int(await new.primary.get("user_epoch:u1")) == 2**31
+
+    # After the rollout, rebalance() copies what old-ring processes wrote
+    jtis = [f"late{i}" for i in range(100)]
+    await old_ring.revoke_many([(j, 2**31) for j in jtis])
+    await old_ring.revoke_family("f2", ttl=60)
+    assert await store.rebalance() > 0
+    fresh = RevocationStore("unused", shards=store.shards)
+    assert all((await fresh.is_revoked_many(jtis)).values())
+    assert await new.primary.exists("revoked_family:f2") == 1
+
+@pytest.mark.asyncio
+async def test_rebalance_keeps_newer_epochs():
+    store = RevocationStore("unused", shards={"n1": shard(), "n2": shard()})
+    await store.shards["n1"].primary.set("user_epoch:u1", 100, ex=60)
+    await store.shards["n2"].primary.set("user_epoch:u1", 200, ex=60)
+    await store.rebalance()
+    assert await store.shards["n2"].primary.get("user_epoch:u1") == "200"
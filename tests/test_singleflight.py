@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from zenithauth.core.singleflight import SingleFlight
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    results = await asyncio.gather(*(flights.do("k", work) for _ in range(50)))
+    assert results == ["done"] * 50
+    assert len(calls) == 1
+    assert flights.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_exception_is_shared():
+    flights = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("nope")
+
+    results = await asyncio.gather(
+        flights.do("k", boom), flights.do("k", boom), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_work_alive():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 7
+
+    first = asyncio.create_task(flights.do("k", work))
+    second = asyncio.create_task(flights.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == 7
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+@pytest.mark.asyncio
+async def test_work_cancelled_when_all_waiters_leave():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flights.do("k", work))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flights.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_authorize_fan_out_hits_store_once():
+    auth = ZenithAuth(settings=ZenithSettings(ZENITH_SECRET_KEY="test-key"))
+    calls = []
+
+    async def check(payload, consistency=None, **kwargs):
+        calls.append(payload["jti"])
+        await asyncio.sleep(0.01)
+        return 0
+
+    auth.revocation.check = check
+    token = auth.tokens.generate_auth_tokens(user_id="42").access_token
+    payloads = await asyncio.gather(*(auth.authorize(token) for _ in range(50)))
+    assert {p["sub"] for p in payloads} == {"42"}
+    assert len(calls) == 1
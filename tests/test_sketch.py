@@ -0,0 +1,77 @@
+import random
+import pytest
+from zenithauth.core.sketch import HeavyHitterSketch
+from zenithauth.core.throttle import FailedLoginMonitor, LoginThrottle
+from zenithauth.core.exceptions import LoginThrottledError
+
+def test_estimates_never_undercount_and_top_k_finds_heavy_hitters():
+    sketch = HeavyHitterSketch(width=256, depth=4, k=5)
+    now = 1000.0
+    for i in range(2000):
+        sketch.add(f"10.0.{i % 250}.{i % 7}", now=now)
+    for ip, hits in (("6.6.6.6", 300), ("7.7.7.7", 150)):
+        for _ in range(hits):
+            sketch.add(ip, now=now)
+    assert sketch.estimate("6.6.6.6") >= 300 and sketch.estimate("7.7.7.7") >= 150
+    top = sketch.top(2, now=now)
+    assert [key for key, _ in top] == ["6.6.6.6", "7.7.7.7"]
+    assert sketch.estimate("6.6.6.6") < 350
+
+def test_counts_slide_out_of_the_window():
+    sketch = HeavyHitterSketch(window_seconds=10, windows=3)
+    for _ in range(5):
+        sketch.add("a", now=0)
+    sketch.add("a", now=15)
+    assert sketch.estimate("a") == 6
+    sketch.add("b", now=35)  # the slot holding t=0 has aged out
+    assert sketch.estimate("a") == 1
+    assert sketch.top(now=100) == []
+
+def test_expiring_slots_never_undercount():
+    sketch = HeavyHitterSketch(width=64, depth=4, window_seconds=10, windows=3)
+    rng = random.Random(7)
+    seen = {}
+    for step in range(200):
+        now = step * 0.5
+        for _ in range(20):
+            key = f"k{rng.randrange(300)}"
+            sketch.add(key, now=now)
+            seen.setdefault(key, []).append(now)
+    window_start = (int(99.5 // 10) - 2) * 10
+    for key, times in seen.items():
+        assert sketch.estimate(key) >= sum(1 for t in times if t >= window_start)
+
+@pytest.mark.asyncio
+async def test_monitor_blocklists_only_flagged_keys(fake_redis):
+    monitor = FailedLoginMonitor(fake_redis, ip_threshold=20, account_threshold=5)
+    for i in range(25):
+        monitor.record(f"user{i}@example.com", ip="6.6.6.6")
+    for _ in range(5):
+        monitor.record("Victim@example.com", ip=f"10.0.0.{_}")
+    await monitor.flush()
+    keys = sorted(await fake_redis.keys("blocklist:*"))
+    assert keys == ["blocklist:{acct:victim@example.com}", "blocklist:{ip:6.6.6.6}"]
+    assert monitor.top(1)["ips"] == [("6.6.6.6", 25)]
+
+    throttle = LoginThrottle(fake_redis)
+    with pytest.raises(LoginThrottledError):
+        await throttle.check("someone@example.com", ip="6.6.6.6")
+    with pytest.raises(LoginThrottledError):
+        await throttle.check("victim@example.com", ip="1.1.1.1")
+    await throttle.check("someone@example.com", ip="1.1.1.1")
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_flagged_keys(fake_redis):
+    monitor = FailedLoginMonitor(fake_redis, account_threshold=1)
+    monitor.record("a@example.com")
+    push = monitor._push
+
+    async def broken(pending):
+        raise ConnectionError("down")
+
+    monitor._push = broken
+    with pytest.raises(ConnectionError):
+        await monitor.flush()
+    monitor._push = push
+    await monitor.flush()
+    assert await fake_redis.exists("blocklist:{acct:a@example.com}") == 1
@@ -0,0 +1,61 @@
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.policy import PasswordPolicy, WeakPasswordError
+from zenithauth.core.strength import Lexicon, StrengthRule, build_lexicon, estimate
+
+def patterns(password):
+    return [m[2] for m in estimate(password).sequence]
+
+@pytest.mark.parametrize("password, pattern", [
+    ("Password", "dictionary"),
+    ("p@ssw0rd", "dictionary"),
+    ("drowssap", "dictionary"),
+    ("hjkl;'", "keyboard"),
+    ("abcdefgh", "sequence"),
+    ("97531", "sequence"),
+    ("zzzzzzzz", "repeat"),
+    ("15031987", "date"),
+    ("2020-03-15", "date"),
+])
+def test_matchers(password, pattern):
+    assert patterns(password) == [pattern]
+
+@pytest.mark.parametrize("password", ["Tr0ub4dour&3", "Jennifer1987", "Smith1990"])
+def test_english_words_and_names_are_weak(password):
+    assert estimate(password).score <= 2
+    assert patterns(password)[0] == "dictionary"
+
+def test_lexicon_keeps_the_best_rank(tmp_path):
+    path = str(tmp_path / "lexicon.idx")
+    assert build_lexicon([["dragon", "Monkey"], ["sun", "monkey", "drag"]], path) == 4
+    lexicon = Lexicon(path)
+    span = (0, lexicon.count)
+    for depth, ch in enumerate("monkey"):
+        span = lexicon.narrow(*span, depth, ch)
+    assert lexicon.rank(span[0], 6) == 2
+    span = (0, lexicon.count)
+    for depth, ch in enumerate("drag"):
+        span = lexicon.narrow(*span, depth, ch)
+    assert lexicon.rank(span[0], 4) == 3 and span[1] - span[0] == 2
+    assert lexicon.narrow(*span, 4, "x") is None
+
+def test_scores_are_ordered():
+    assert estimate("Password1234").score <= 1
+    assert estimate("dragonmonkey2019").score <= 2
+    assert estimate("kX9$vQ2!mZ7p").score == 4
+    assert estimate("").score == 0
+
+def test_rule_rejects_password1234_that_the_basic_policy_accepts():
+    assert PasswordPolicy(min_length=12).validate("Password1234")
+    policy = PasswordPolicy(min_length=12, rules=[StrengthRule(3)])
+    with pytest.raises(WeakPasswordError, match="too easy to guess"):
+        policy.validate("Password1234")
+    assert policy.validate("correct-horse-battery-staple-7!")
+
+def test_threshold_comes_from_settings():
+    off = ZenithAuth(settings=ZenithSettings(ZENITH_SECRET_KEY="test-key"))
+    assert off.security.policy.validate("Password1234")
+    on = ZenithAuth(settings=ZenithSettings(ZENITH_SECRET_KEY="test-key", PASSWORD_MIN_STRENGTH=3))
+    with pytest.raises(WeakPasswordError):
+        on.security.policy.validate("Password1234")
@@ -0,0 +1,100 @@
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.throttle import LoginThrottle
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.identity import UserInDB
+from zenithauth.core.exceptions import InvalidCredentialsError, LoginThrottledError
+from .mock_repo import MockUserRepository
+
+@pytest.mark.asyncio
+async def test_gcra_allows_burst_then_limits_per_ip(fake_redis):
+    throttle = LoginThrottle(fake_redis, ip_rate=60, ip_burst=3, account_rate=600, account_burst=100)
+    for i in range(3):
+        await throttle.check(f"user{i}@example.com", ip="1.2.3.4")
+    with pytest.raises(LoginThrottledError) as exc:
+        await throttle.check("other@example.com", ip="1.2.3.4")
+    assert 0 < exc.value.retry_after <= 1.0
+    # Another IP is unaffected
+    await throttle.check("other@example.com", ip="5.6.7.8")
+
+@pytest.mark.asyncio
+async def test_blocked_client_is_rejected_locally(fake_redis):
+    throttle = LoginThrottle(fake_redis, ip_rate=1, ip_burst=1, account_rate=600, account_burst=100)
+    await throttle.check("a@example.com", ip="1.2.3.4")
+    with pytest.raises(LoginThrottledError):
+        await throttle.check("a@example.com", ip="1.2.3.4")
+    assert throttle.local_rejections == 0
+    with pytest.raises(LoginThrottledError):
+        await throttle.check("b@example.com", ip="1.2.3.4")
+    assert throttle.local_rejections == 1
+
+@pytest.mark.asyncio
+async def test_rejected_attempt_does_not_consume_the_other_limit(fake_redis):
+    throttle = LoginThrottle(fake_redis, ip_rate=600, ip_burst=1, account_rate=600, account_burst=2)
+    await throttle.check("a@example.com", ip="1.1.1.1")
+    with pytest.raises(LoginThrottledError):
+        await throttle.check("a@example.com", ip="1.1.1.1")
+    # The IP rejection left the account's budget untouched
+    await throttle.check("a@example.com", ip="2.2.2.2")
+
+@pytest.mark.asyncio
+async def test_lockout_backs_off_exponentially(fake_redis):
+    throttle = LoginThrottle(fake_redis, lockout_threshold=3, lockout_base=10, lockout_max=35)
+    locks = [await throttle.record_failure("A@example.com") for _ in range(5)]
+    assert locks == [0, 0, 10, 20, 35]
+    assert 30_000 < await fake_redis.pttl("lockout:{acct:a@example.com}") <= 35_000
+    with pytest.raises(LoginThrottledError):
+        await throttle.check("a@example.com")
+
+    await throttle.record_success("a@example.com")
+    await throttle.check("a@example.com")
+    assert await fake_redis.exists("login_failures:{acct:a@example.com}") == 0
+
+@pytest.mark.asyncio
+async def test_authenticate_locks_out_before_hashing(fake_redis):
+    settings = ZenithSettings(
+        ZENITH_SECRET_KEY="test-key", LOGIN_THROTTLE=True,
+        LOCKOUT_THRESHOLD=2, ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=8192, ARGON2_PARALLELISM=1,
+    )
+    repo = MockUserRepository()
+    auth = ZenithAuth(settings=settings, repository=repo)
+    auth.revocation = RevocationStore("redis://unused", client=fake_redis)
+    auth.throttle.client = fake_redis
+    hashed = auth.security.hash_password("correct-horse-9!")
+    await repo.save_user(UserInDB(id="u1", email="a@example.com", hashed_password=hashed))
+
+    for _ in range(2):
+        with pytest.raises(InvalidCredentialsError):
+            await auth.authenticate("a@example.com", "wrong-password", client_key="1.2.3.4")
+    admitted = auth.hashing.admitted
+    with pytest.raises(LoginThrottledError):
+        await auth.authenticate("a@example.com", "correct-horse-9!", client_key="1.2.3.4")
+    assert auth.hashing.admitted == admitted
+    await auth.close()
+
+class SingleSlotClient:
+    """Rejects scripts whose keys span hash tags, like a Redis Cluster client."""
+    def __init__(self, client):
+        self._client = client
+
+    async def evalsha(self, sha, numkeys, *keys_and_args):
+        tags = {key[key.index("{"):key.index("}") + 1] for key in keys_and_args[:numkeys]}
+        assert len(tags) == 1, f"CROSSSLOT {tags}"
+        return await self._client.evalsha(sha, numkeys, *keys_and_args)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+@pytest.mark.asyncio
+async def test_cluster_mode_keeps_each_call_in_one_slot(fake_redis):
+    throttle = LoginThrottle(
+        SingleSlotClient(fake_redis), ip_rate=60, ip_burst=1, lockout_threshold=1, cluster=True
+    )
+    await throttle.check("a@example.com", ip="1.2.3.4")
+    with pytest.raises(LoginThrottledError):
+        await throttle.check("b@example.com", ip="1.2.3.4")
+    assert await throttle.record_failure("c@example.com") > 0
+    with pytest.raises(LoginThrottledError):
+        await LoginThrottle(SingleSlotClient(fake_redis), cluster=True).check("c@example.com", ip="5.6.7.8")
+    await throttle.record_success("c@example.com")
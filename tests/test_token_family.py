@@ -0,0 +1,32 @@
+import pytest
+from zenithauth.manager import ZenithAuth
+from zenithauth.config import ZenithSettings
+from zenithauth.core.revocation import RevocationStore
+from zenithauth.core.exceptions import RevokedTokenError
+
+@pytest.fixture
+def auth(fake_redis):
+    manager = ZenithAuth(settings=ZenithSettings(ZENITH_SECRET_KEY="test-key"))
+    manager.revocation = RevocationStore("redis://unused", client=fake_redis)
+    return manager
+
+def test_pair_shares_family_id(auth):
+    tokens = auth.tokens.generate_auth_tokens(user_id="42")
+    access = auth.tokens.decode_token(tokens.access_token)
+    refresh = auth.tokens.decode_token(tokens.refresh_token)
+    assert access["fid"] == refresh["fid"] == tokens.family_id
+    assert access["jti"] != refresh["jti"]
+
+@pytest.mark.asyncio
+async def test_logout_revokes_whole_family_with_one_record(auth, fake_redis):
+    tokens = auth.tokens.generate_auth_tokens(user_id="42")
+    other = auth.tokens.generate_auth_tokens(user_id="42")
+
+    await auth.logout(tokens.access_token)
+    assert await fake_redis.keys("revoked*") == [f"revoked_family:{tokens.family_id}"]
+
+    # A fresh store (no local state) still rejects the paired refresh token
+    auth.revocation = RevocationStore("redis://unused", client=fake_redis)
+    with pytest.raises(RevokedTokenError):
+        await auth.refresh(tokens.refresh_token)
+    assert (await auth.authorize(other.access_token))["sub"] == "42"